@@ -0,0 +1,409 @@
+"""
+HTTP/JSON service exposing the person and sport controllers
+Requests are handled by a fixed pool of worker threads sharing the controllers (and so the database
+connection pool and the cache). Connections are kept alive (HTTP/1.1) and large responses are gzipped.
+An idle kept alive connection holds its worker, it is closed as soon as another connection waits for one.
+"""
+
+import gzip
+import json
+import logging
+import re
+import select
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+from model.instrumentation import METRICS
+from model.serializer import to_json
+from exceptions import Error, InvalidData, ResourceNotFound
+
+# Responses smaller than this are not worth compressing
+GZIP_MIN_SIZE = 1024
+# Largest page of the list and search endpoints, bigger limits are capped
+MAX_LIMIT = 500
+# Idle kept alive connections check this often whether other connections wait for a worker (seconds)
+IDLE_POLL_INTERVAL = 0.05
+
+
+class HTTPError(Exception):
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Request:
+
+    def __init__(self, params, query, body):
+        self.params = params
+        self._query = query
+        self._body = body
+
+    def arg(self, name, default=None, type=str):
+        values = self._query.get(name)
+        if not values:
+            return default
+        try:
+            return type(values[0])
+        except ValueError:
+            raise HTTPError(400, "Invalid parameter %s" % name)
+
+    def limit(self, default):
+        """
+        `limit` parameter of the paged endpoints, at least 1 (SQLite reads LIMIT -1 as no limit) and capped
+        """
+        limit = self.arg("limit", default, int)
+        if limit < 1:
+            raise HTTPError(400, "Invalid parameter limit")
+        return min(limit, MAX_LIMIT)
+
+    def json(self):
+        if not self._body:
+            raise HTTPError(400, "Missing JSON body")
+        try:
+            return json.loads(self._body)
+        except ValueError:
+            raise HTTPError(400, "Invalid JSON body")
+
+
+class Router:
+
+    def __init__(self):
+        self._routes = []
+
+    def add(self, method, path, handler):
+        """
+        path: "/people/{person_id}" like pattern, parameters match a path segment
+        """
+        pattern = re.compile("^%s$" % re.sub(r"\{(\w+)\}", r"(?P<\1>[^/]+)", path))
+        self._routes.append((method, pattern, handler))
+
+    def resolve(self, method, path):
+        allowed = False
+        for route_method, pattern, handler in self._routes:
+            match = pattern.match(path)
+            if match is None:
+                continue
+            if route_method == method:
+                return handler, match.groupdict()
+            allowed = True
+        if allowed:
+            raise HTTPError(405, "Method not allowed")
+        raise HTTPError(404, "Not found")
+
+
+class Created:
+    """
+    Handler result sent with a 201 status
+    """
+
+    def __init__(self, payload):
+        self.payload = payload
+
+
+class PlainText(str):
+    """
+    Handler result sent as text/plain instead of JSON
+    """
+
+
+class Api:
+    """
+    Routes of the service, each handler takes a Request and returns the response payload
+    """
+
+    def __init__(self, person_controller, sport_controller, metrics=METRICS):
+        self._person_controller = person_controller
+        self._sport_controller = sport_controller
+        self._metrics = metrics
+
+    def router(self):
+        router = Router()
+        router.add("GET", "/health", lambda request: {"status": "ok"})
+        router.add("GET", "/metrics", lambda request: PlainText(self._metrics.to_prometheus()))
+
+        router.add("GET", "/people", self.list_people)
+        router.add("GET", "/people/count", self.count_people)
+        router.add("GET", "/people/search", self.search_people)
+        router.add("GET", "/people/{person_id}", self.get_person)
+        router.add("DELETE", "/people/{person_id}", self.delete_person)
+        router.add("PATCH", "/people/{person_id}", self.update_person)
+        router.add("POST", "/members", self.create_member)
+        router.add("PATCH", "/members/{person_id}", self.update_member)
+        router.add("POST", "/coaches", self.create_coach)
+        router.add("PATCH", "/coaches/{person_id}", self.update_coach)
+        router.add("POST", "/people/{person_id}/sports", self.add_sport_person)
+        router.add("PUT", "/people/{person_id}/sports", self.set_sports)
+        router.add("DELETE", "/people/{person_id}/sports/{sport_id}", self.delete_sport_person)
+
+        router.add("GET", "/sports", self.list_sports)
+        router.add("POST", "/sports", self.create_sport)
+        router.add("GET", "/sports/stats", self.get_sport_stats)
+        router.add("GET", "/sports/search", self.search_sports)
+        router.add("GET", "/sports/{sport_id}", self.get_sport)
+        router.add("PATCH", "/sports/{sport_id}", self.update_sport)
+        router.add("DELETE", "/sports/{sport_id}", self.delete_sport)
+        router.add("GET", "/sports/{sport_id}/roster", self.get_roster)
+        router.add("POST", "/sports/{sport_id}/people", self.assign_sport)
+        return router
+
+    # People
+
+    def list_people(self, request):
+        """
+        Page of {id, firstname, lastname, type}, sorted by name
+        Keyset paging: pass the last item as after_firstname, after_lastname and after_id
+        """
+        after = None
+        if request.arg("after_id") is not None:
+            after = (request.arg("after_firstname", ""), request.arg("after_lastname", ""), request.arg("after_id"))
+        people = self._person_controller.list_people_summaries(person_type=request.arg("type"), after=after,
+                                                               limit=request.limit(50),
+                                                               offset=request.arg("offset", 0, int))
+        return [person._asdict() for person in people]
+
+    def count_people(self, request):
+        return {"count": self._person_controller.count_people(person_type=request.arg("type"))}
+
+    def search_people(self, request):
+        text = request.arg("q", "")
+        limit = request.limit(20)
+        if request.arg("fulltext", 0, int):
+            return self._person_controller.search(text, limit=limit, person_type=request.arg("type"))
+        return self._person_controller.search_people(text, limit=limit, person_type=request.arg("type"))
+
+    def get_person(self, request):
+        return self._person_controller.get_person(request.params["person_id"])
+
+    def delete_person(self, request):
+        self._person_controller.delete_person(request.params["person_id"])
+
+    def update_person(self, request):
+        return self._person_controller.update_person(request.params["person_id"], request.json())
+
+    def create_member(self, request):
+        return Created(self._person_controller.create_member(request.json()))
+
+    def update_member(self, request):
+        return self._person_controller.update_member(request.params["person_id"], request.json())
+
+    def create_coach(self, request):
+        return Created(self._person_controller.create_coach(request.json()))
+
+    def update_coach(self, request):
+        return self._person_controller.update_coach(request.params["person_id"], request.json())
+
+    def add_sport_person(self, request):
+        data = request.json()
+        if not isinstance(data, dict) or "sport_id" not in data:
+            raise InvalidData("Missing value sport_id")
+        return self._person_controller.add_sport_person(request.params["person_id"], data["sport_id"],
+                                                        data.get("level"))
+
+    def set_sports(self, request):
+        sports = request.json()
+        if not isinstance(sports, dict):
+            raise InvalidData("Expected {sport_id: level}")
+        return self._person_controller.set_sports(request.params["person_id"], sports)
+
+    def delete_sport_person(self, request):
+        return self._person_controller.delete_sport_person(request.params["person_id"], request.params["sport_id"])
+
+    # Sports
+
+    def list_sports(self, request):
+        return [sport._asdict() for sport in self._sport_controller.list_sport_summaries()]
+
+    def create_sport(self, request):
+        return Created(self._sport_controller.create_sport(request.json()))
+
+    def get_sport_stats(self, request):
+        return self._sport_controller.get_sport_stats()
+
+    def search_sports(self, request):
+        text = request.arg("q", "")
+        limit = request.limit(20)
+        if request.arg("fulltext", 0, int):
+            return self._sport_controller.search(text, limit=limit)
+        return self._sport_controller.search_sports(text, limit=limit)
+
+    def get_sport(self, request):
+        return self._sport_controller.get_sport(request.params["sport_id"])
+
+    def update_sport(self, request):
+        return self._sport_controller.update_sport(request.params["sport_id"], request.json())
+
+    def delete_sport(self, request):
+        self._sport_controller.delete_sport(request.params["sport_id"])
+
+    def get_roster(self, request):
+        return self._sport_controller.get_roster(request.params["sport_id"], level=request.arg("level"),
+                                                 page=request.arg("page", 1, int),
+                                                 page_size=request.arg("page_size", 50, int))
+
+    def assign_sport(self, request):
+        assignments = request.json()
+        if not isinstance(assignments, list) or not all(isinstance(item, list) and len(item) == 2
+                                                        for item in assignments):
+            raise InvalidData("Expected [[person_id, level], ...]")
+        return self._person_controller.assign_sport(request.params["sport_id"],
+                                                    [tuple(item) for item in assignments])
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Socket timeout while reading a request (seconds)
+    timeout = 15
+    # Idle kept alive connections give their worker back after this delay (seconds)
+    keep_alive_timeout = 5
+
+    def handle(self):
+        self.close_connection = True
+        self.handle_one_request()
+        while not self.close_connection and self._wait_request():
+            self.handle_one_request()
+
+    def _wait_request(self):
+        """
+        Wait for the next request of the connection, False to close it: idle for keep_alive_timeout,
+        closed by the client, or other connections waiting for a worker
+        """
+        deadline = time.monotonic() + self.keep_alive_timeout
+        # Non blocking peek: requests already buffered by rfile are not seen by select
+        self.connection.settimeout(0)
+        try:
+            while not self.server.saturated():
+                if self.rfile.peek(1):
+                    return True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                readable, _, _ = select.select([self.connection], [], [], min(remaining, IDLE_POLL_INTERVAL))
+                if readable:
+                    # Nothing to read once readable: closed by the client
+                    return len(self.rfile.peek(1)) > 0
+            return False
+        except OSError:
+            return False
+        finally:
+            self.connection.settimeout(self.timeout)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def do_PATCH(self):
+        self._dispatch("PATCH")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def _dispatch(self, method):
+        url = urlsplit(self.path)
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            # The end of the body is unknown: the connection cannot be reused
+            self._send(400, {"error": "Invalid Content-Length"}, close=True)
+            return
+        # Always consume the body, the connection is reused for the next request
+        body = self.rfile.read(length)
+        try:
+            handler, params = self.server.router.resolve(method, url.path)
+            payload = handler(Request(params, parse_qs(url.query), body))
+            status = 200
+            if isinstance(payload, Created):
+                status, payload = 201, payload.payload
+            elif payload is None:
+                status = 204
+        except HTTPError as e:
+            status, payload = e.status, {"error": e.message}
+        except ResourceNotFound as e:
+            status, payload = 404, {"error": str(e)}
+        except (InvalidData, Error) as e:
+            status, payload = 400, {"error": str(e)}
+        except Exception as e:
+            logging.exception("Unexpected error on %s %s" % (method, self.path))
+            status, payload = 500, {"error": "Internal error (%s)" % type(e).__name__}
+        self._send(status, payload)
+
+    def _send(self, status, payload, close=False):
+        self.send_response(status)
+        if close or self.server.saturated():
+            # Give the worker back to the waiting connections
+            self.send_header("Connection", "close")
+        if status == 204:
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if isinstance(payload, PlainText):
+            body, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            body = to_json(payload)
+            content_type = "application/json"
+        self.send_header("Content-Type", content_type)
+        if len(body) >= GZIP_MIN_SIZE and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, compresslevel=5)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.debug("%s - %s" % (self.address_string(), format % args))
+
+
+class PooledHTTPServer(HTTPServer):
+    """
+    HTTP server handling connections with a fixed pool of threads (instead of a thread per connection)
+    """
+
+    def __init__(self, address, router, workers=8):
+        super().__init__(address, RequestHandler)
+        self.router = router
+        self._workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="http-worker")
+        # Accepted connections not closed yet, handled or waiting for a worker
+        self._connections = 0
+        self._connections_lock = threading.Lock()
+
+    def saturated(self):
+        """
+        True when accepted connections wait for a worker
+        """
+        return self._connections > self._workers
+
+    def process_request(self, request, client_address):
+        with self._connections_lock:
+            self._connections += 1
+        self._executor.submit(self._process_request, request, client_address)
+
+    def _process_request(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            with self._connections_lock:
+                self._connections -= 1
+
+    def server_close(self):
+        super().server_close()
+        self._executor.shutdown(wait=True)
+
+
+def make_server(person_controller, sport_controller, host="127.0.0.1", port=8080, workers=8):
+    return PooledHTTPServer((host, port), Api(person_controller, sport_controller).router(), workers=workers)
@@ -0,0 +1,41 @@
+"""
+Compare two result files of benchmarks.run
+usage: python -m benchmarks.compare before.json after.json --threshold 1.2
+"""
+
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path) as file:
+        report = json.load(file)
+    return {(result["name"], result["scale"]): result for result in report["results"]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=1.2, help="slowdown ratio reported as a regression")
+    args = parser.parse_args(argv)
+
+    before, after = load(args.before), load(args.after)
+    regressions = 0
+    print("%-20s %8s %12s %12s %8s" % ("benchmark", "scale", "before (ms)", "after (ms)", "ratio"))
+    for key in sorted(set(before) & set(after)):
+        old, new = before[key].get("median"), after[key].get("median")
+        if old is None or new is None:
+            print("%-20s %8d %12s %12s %8s" % (key[0], key[1], "-" if old is None else "%.3f" % (old * 1000),
+                                               "-" if new is None else "%.3f" % (new * 1000), "n/a"))
+            continue
+        ratio = new / old if old > 0 else float("inf")
+        flag = " REGRESSION" if ratio > args.threshold else ""
+        regressions += 1 if flag else 0
+        print("%-20s %8d %12.3f %12.3f %8.2f%s" % (key[0], key[1], old * 1000, new * 1000, ratio, flag))
+    return 1 if regressions > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
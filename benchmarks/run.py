@@ -0,0 +1,236 @@
+"""
+Benchmark suite for controllers, DAOs and serialization
+usage: python -m benchmarks.run --scales 1000,10000 --output results.json
+Compare two result files with: python -m benchmarks.compare before.json after.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import sqlalchemy
+
+from model.database import DatabaseEngine, PERFORMANCE_PROFILE
+from model.dao.person_dao import PersonDAO
+from model.dao.loading_plan import FULL
+from model.serializer import PEOPLE
+from controller.person_controller import PersonController
+from controller.sport_controller import SportController
+from benchmarks.seed import seed
+
+
+class Context:
+    """
+    Everything a benchmark needs: controllers on a seeded database and a random generator
+    """
+
+    def __init__(self, database_engine, data, random_seed=0):
+        self.database_engine = database_engine
+        self.person_controller = PersonController(database_engine)
+        self.sport_controller = SportController(database_engine)
+        self.data = data
+        self.random = random.Random(random_seed)
+        self.counter = 0
+
+    def random_person_id(self):
+        return self.random.choice(self.data.person_ids)
+
+    def next_index(self):
+        self.counter += 1
+        return self.counter
+
+
+def bench_list_people(context):
+    context.person_controller.list_people()
+
+
+def bench_list_people_summaries(context):
+    context.person_controller.list_people_summaries(limit=1000)
+
+
+def bench_get_person(context):
+    context.person_controller.get_person(context.random_person_id())
+
+
+def bench_search_person(context):
+    firstname, lastname = context.random.choice(context.data.names)
+    context.person_controller.search_person(firstname, lastname)
+
+
+def bench_create_member(context):
+    index = context.next_index()
+    context.person_controller.create_member({
+        "firstname": "bench%d" % index, "lastname": "member%d" % index, "email": "bench%d@bds.com" % index,
+        "medical_certificate": True,
+        "address": {"street": "1 rue du stade", "postal_code": 53000, "city": "Laval"}})
+
+
+def bench_add_sport_person(context):
+    # Each person gets the benchmark sport once
+    person_id = context.data.person_ids[context.next_index() % len(context.data.person_ids)]
+    context.person_controller.add_sport_person(person_id, context.bench_sport_id, "beginner")
+
+
+def bench_update_member(context):
+    context.person_controller.update_member(context.random_person_id(),
+                                            {"email": "updated%d@bds.com" % context.next_index()})
+
+
+def bench_to_dict(context):
+    # Serialization only: people are loaded before the timer starts
+    for person in context.loaded_people:
+        person.to_dict()
+
+
+def bench_to_dict_json(context):
+    # Whole list the ORM way: instances, to_dict() then json
+    with context.database_engine.new_session() as session:
+        people = PersonDAO(session).get_all(plan=FULL)
+        json.dumps([person.to_dict() for person in people])
+
+
+def bench_serializer_json(context):
+    # Whole list rendered from result rows by the compiled plans
+    with context.database_engine.new_session() as session:
+        rows, sport_rows = PersonDAO(session).get_all_rows(PEOPLE.columns, PEOPLE.sport_columns)
+    PEOPLE.render_json(rows, sport_rows)
+
+
+def bench_update_member_direct(context):
+    context.person_controller.update_member(context.random_person_id(),
+                                            {"email": "updated%d@bds.com" % context.next_index()}, direct=True)
+
+
+def _setup_add_sport_person(context):
+    context.bench_sport_id = context.sport_controller.create_sport({"name": "benchsport", "description": "bench"})['id']
+
+
+def _setup_to_dict(context):
+    context.session = context.database_engine.new_session()
+    context.loaded_people = PersonDAO(context.session).get_page(limit=1000, plan=FULL)
+
+
+def _teardown_to_dict(context):
+    context.session.close()
+
+
+# name, function, repeat factor (heavy benchmarks run less), setup, teardown
+BENCHMARKS = [
+    ("list_people", bench_list_people, 0.1, None, None),
+    ("list_people_summaries_1000", bench_list_people_summaries, 0.1, None, None),
+    ("get_person", bench_get_person, 1, None, None),
+    ("search_person", bench_search_person, 1, None, None),
+    ("create_member", bench_create_member, 1, None, None),
+    ("add_sport_person", bench_add_sport_person, 1, _setup_add_sport_person, None),
+    ("update_member", bench_update_member, 1, None, None),
+    ("update_member_direct", bench_update_member_direct, 1, None, None),
+    ("to_dict_1000", bench_to_dict, 0.1, _setup_to_dict, _teardown_to_dict),
+    ("list_people_to_dict_json", bench_to_dict_json, 0.1, None, None),
+    ("list_people_serializer_json", bench_serializer_json, 0.1, None, None),
+]
+
+
+def measure(context, func, repeat):
+    durations = []
+    errors = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            func(context)
+        except Exception as e:
+            errors.append(str(e))
+            continue
+        durations.append(time.perf_counter() - start)
+    return durations, errors
+
+
+def summarize(name, scale, durations, errors):
+    result = {"name": name, "scale": scale, "iterations": len(durations), "errors": len(errors)}
+    if len(errors) > 0:
+        result["first_error"] = errors[0]
+    if len(durations) > 0:
+        ordered = sorted(durations)
+        mean = statistics.mean(durations)
+        result.update({
+            "mean": mean,
+            "median": statistics.median(durations),
+            "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+            "min": ordered[0],
+            "max": ordered[-1],
+            "ops_per_second": 1 / mean if mean > 0 else None,
+        })
+    return result
+
+
+def run_scale(scale, repeat, selected, directory=None):
+    url = "sqlite:///:memory:" if directory is None else "sqlite:///%s" % os.path.join(directory, "bench%d.db" % scale)
+    database_engine = DatabaseEngine(url=url, profile=PERFORMANCE_PROFILE)
+    database_engine.create_database()
+    data = seed(database_engine, people=scale)
+    results = []
+    for name, func, factor, setup, teardown in BENCHMARKS:
+        if selected and name not in selected:
+            continue
+        context = Context(database_engine, data)
+        if setup is not None:
+            setup(context)
+        with database_engine.count_queries() as counter:
+            durations, errors = measure(context, func, max(1, int(repeat * factor)))
+        if teardown is not None:
+            teardown(context)
+        result = summarize(name, scale, durations, errors)
+        # SQL statements per call
+        result["statements"] = counter.count / max(1, len(durations) + len(errors))
+        print("%s @%d: %s" % (name, scale, "%.3f ms" % (result["mean"] * 1000) if "mean" in result
+                              else "failed (%s)" % result.get("first_error")), file=sys.stderr)
+        results.append(result)
+    database_engine.dispose()
+    return results
+
+
+def metadata():
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"commit": commit, "date": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__, "sqlite": sqlite3.sqlite_version, "platform": platform.platform()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark controllers, DAOs and serialization")
+    parser.add_argument("--scales", default="1000,10000", help="comma separated number of people, e.g. 1000,10000,100000")
+    parser.add_argument("--repeat", type=int, default=100, help="iterations of light benchmarks")
+    parser.add_argument("--only", action="append", help="benchmark name, may be repeated")
+    parser.add_argument("--memory", action="store_true", help="use an in-memory database instead of a file")
+    parser.add_argument("--output", help="JSON result file (stdout by default)")
+    args = parser.parse_args(argv)
+
+    # Keep controller logs out of the measures
+    logging.disable(logging.CRITICAL)
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for scale in [int(scale) for scale in args.scales.split(",")]:
+            results.extend(run_scale(scale, args.repeat, args.only, None if args.memory else directory))
+
+    report = json.dumps({"meta": metadata(), "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(report)
+    else:
+        print(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""
+Synthetic data for benchmarks, inserted with executemany in batches
+"""
+
+import random
+
+from model.mapping.person import Person
+from model.mapping.member import Member
+from model.mapping.address import Address
+from model.mapping.sport import Sport, SportAssociation
+from model.mapping.uuid_type import new_id
+
+LEVELS = ["beginner", "high", "professional"]
+CITIES = ["Laval", "Nantes", "Rennes", "Angers", "Le Mans", "Paris"]
+
+
+class SeedData:
+    """
+    Identifiers of the seeded rows, used to pick benchmark arguments
+    """
+
+    def __init__(self):
+        self.person_ids = []
+        self.names = []
+        self.sport_ids = []
+
+
+def seed(database_engine, people=1000, sports=20, max_sports_per_person=3, batch_size=5000, random_seed=42):
+    generator = random.Random(random_seed)
+    data = SeedData()
+
+    sport_rows = [dict(id=new_id(), name="sport%d" % index, description="Synthetic sport %d" % index)
+                  for index in range(sports)]
+    data.sport_ids = [row['id'] for row in sport_rows]
+    with database_engine.new_session() as session:
+        session.execute(Sport.__table__.insert(), sport_rows)
+
+    for start in range(0, people, batch_size):
+        addresses, persons, members, associations = [], [], [], []
+        for index in range(start, min(start + batch_size, people)):
+            person_id = new_id()
+            address_id = new_id()
+            firstname, lastname = "first%d" % index, "last%d" % generator.randrange(people)
+            addresses.append(dict(id=address_id, street="%d rue du stade" % index, postal_code=53000,
+                                  city=generator.choice(CITIES), country="FRANCE"))
+            persons.append(dict(id=person_id, firstname=firstname, lastname=lastname,
+                                email="%s.%s@bds.com" % (firstname, lastname), person_type='member',
+                                address_id=address_id))
+            members.append(dict(id=person_id, medical_certificate=generator.random() < 0.8))
+            for sport_id in generator.sample(data.sport_ids, generator.randint(0, max_sports_per_person)):
+                associations.append(dict(person_id=person_id, sport_id=sport_id, level=generator.choice(LEVELS)))
+            data.person_ids.append(person_id)
+            data.names.append((firstname, lastname))
+
+        with database_engine.new_session() as session:
+            session.execute(Address.__table__.insert(), addresses)
+            session.execute(Person.__table__.insert(), persons)
+            session.execute(Member.__table__.insert(), members)
+            if len(associations) > 0:
+                session.execute(SportAssociation.__table__.insert(), associations)
+    return data
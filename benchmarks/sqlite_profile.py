@@ -0,0 +1,76 @@
+"""
+Compare SQLite profiles on a database file
+usage: python -m benchmarks.sqlite_profile --transactions 500
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from model.database import DatabaseEngine, DEFAULT_PROFILE, PERFORMANCE_PROFILE
+from model.dao.member_dao import MemberDAO
+from controller.person_controller import PersonController
+
+PROFILES = {"default": DEFAULT_PROFILE, "performance": PERFORMANCE_PROFILE}
+
+
+def _member(index):
+    return dict(firstname="first%d" % index, lastname="last%d" % index, email="member%d@bds.com" % index,
+                medical_certificate=True, address=dict(street="1 rue du stade", postal_code=53000, city="Laval"))
+
+
+def run(profile_name, transactions, readers):
+    with tempfile.TemporaryDirectory() as directory:
+        database_engine = DatabaseEngine(url="sqlite:///%s" % os.path.join(directory, "bench.db"),
+                                         profile=PROFILES[profile_name])
+        database_engine.create_database()
+        person_controller = PersonController(database_engine)
+
+        # Small write transactions: one commit (and fsync) each
+        start = time.perf_counter()
+        for index in range(transactions):
+            with database_engine.new_session() as session:
+                MemberDAO(session).bulk_create([_member(index)])
+        write_time = time.perf_counter() - start
+
+        # Concurrent readers while a writer keeps committing
+        def read(_):
+            return len(person_controller.list_people_page(limit=50))
+
+        def write(offset):
+            for index in range(offset, offset + transactions // 10):
+                with database_engine.new_session() as session:
+                    MemberDAO(session).bulk_create([_member(index)])
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=readers + 1) as pool:
+            writer = pool.submit(write, transactions)
+            list(pool.map(read, range(readers * 20)))
+            writer.result()
+        mixed_time = time.perf_counter() - start
+
+    return {"profile": profile_name, "transactions": transactions,
+            "commits_per_second": transactions / write_time,
+            "mixed_seconds": mixed_time}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare SQLite performance profiles")
+    parser.add_argument("--transactions", type=int, default=500)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--profile", choices=list(PROFILES), action="append")
+    args = parser.parse_args(argv)
+    logging.disable(logging.INFO)
+
+    for profile_name in args.profile or list(PROFILES):
+        print(json.dumps(run(profile_name, args.transactions, args.readers)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+import argparse
+import logging
+import sys
+
+from model.database import DatabaseEngine, PERFORMANCE_PROFILE
+from controller.person_controller import PersonController
+from controller.person_io import guess_format, open_text
+from model.query_plan import check_plans, format_report
+
+
+def import_members(database_engine, args):
+    person_controller = PersonController(database_engine)
+    format = args.format or guess_format(args.path)
+    with open_text(args.path) as file:
+        report = person_controller.import_members_file(file, format=format, chunk_size=args.chunk_size)
+    for error in report["errors"]:
+        print("row %d: %s" % (error["row"], error["error"]))
+    print("%d/%d members imported" % (report["imported"], report["rows"]))
+    return 0 if len(report["errors"]) == 0 else 1
+
+
+def export_people(database_engine, args):
+    person_controller = PersonController(database_engine)
+    count = person_controller.export_people(args.path, format=args.format, compress=args.gzip or None)
+    print("%d people exported" % count)
+    return 0
+
+
+def rebuild_search(database_engine, args):
+    if not database_engine.create_search_index():
+        print("Full-text search not supported by this database")
+        return 1
+    database_engine.rebuild_search_index()
+    print("Search index rebuilt")
+    return 0
+
+
+def migrate(database_engine, args):
+    def progress(name, last_rowid, max_rowid, updated):
+        print("%s: %d/%d rows (%d updated)" % (name, last_rowid, max_rowid, updated), file=sys.stderr)
+
+    if args.status:
+        print("Database version %d" % database_engine.schema_version())
+        return 0
+    version = database_engine.migrate(chunk_size=args.chunk_size, pause=args.pause, progress=progress)
+    print("Database migrated to version %d" % version)
+    return 0
+
+
+def check_query_plans(database_engine, args):
+    # Probes insert a few fixture rows: work on a copy of the database, with its indexes and statistics
+    scratch_engine = database_engine.copy()
+    scratch_engine.create_search_index()
+    results = check_plans(scratch_engine)
+    print(format_report(results))
+    return 1 if any(scanned for _, _, _, scanned in results) else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="BDS App command line tools")
+    parser.add_argument("--database", default="sqlite:///bds.db", help="database url")
+    parser.add_argument("--verbose", action="store_true")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.required = True
+
+    import_parser = subparsers.add_parser("import", help="import members from a CSV or JSON lines file")
+    import_parser.add_argument("path")
+    import_parser.add_argument("--format", choices=["csv", "jsonl"], help="guessed from the extension by default")
+    import_parser.add_argument("--chunk-size", type=int, default=1000)
+    import_parser.set_defaults(func=import_members)
+
+    export_parser = subparsers.add_parser("export", help="export people with addresses and sports")
+    export_parser.add_argument("path")
+    export_parser.add_argument("--format", choices=["csv", "jsonl"], help="guessed from the extension by default")
+    export_parser.add_argument("--gzip", action="store_true", help="compress (default when path ends with .gz)")
+    export_parser.set_defaults(func=export_people)
+
+    rebuild_parser = subparsers.add_parser("rebuild-search", help="rebuild the full-text search index")
+    rebuild_parser.set_defaults(func=rebuild_search)
+
+    migrate_parser = subparsers.add_parser("migrate", help="upgrade the database schema and backfill data")
+    migrate_parser.add_argument("--status", action="store_true", help="only print the database version")
+    migrate_parser.add_argument("--chunk-size", type=int, default=1000, help="rows updated per transaction")
+    migrate_parser.add_argument("--pause", type=float, default=0, help="seconds to wait between two chunks")
+    migrate_parser.set_defaults(func=migrate)
+
+    plans_parser = subparsers.add_parser("check-plans", help="fail if a DAO query does a full table scan")
+    plans_parser.set_defaults(func=check_query_plans)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, stream=sys.stdout)
+
+    database_engine = DatabaseEngine(url=args.database, profile=PERFORMANCE_PROFILE)
+    if args.func is not migrate:
+        database_engine.create_database()
+    return args.func(database_engine, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Async controllers for asyncio applications
+Each call runs the synchronous controller method on an AsyncDatabaseEngine session, so validation,
+error mapping (ResourceNotFound, InvalidData, Error) and cache invalidation are the same.
+"""
+
+from functools import wraps
+
+from controller.cache import NullCache
+from controller.person_controller import PersonController
+from controller.sport_controller import SportController
+
+
+def _async(method):
+    @wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        return await self._database_engine.run_sync(self._call, method, *args, **kwargs)
+    return wrapper
+
+
+class AsyncController:
+    controller_class = None
+
+    def __init__(self, async_database_engine, cache=None):
+        self._database_engine = async_database_engine
+        self._cache = cache if cache is not None else NullCache()
+
+    def _call(self, engine, method, *args, **kwargs):
+        return method(self.controller_class(engine, cache=self._cache), *args, **kwargs)
+
+    def cache_stats(self):
+        return self._cache.stats()
+
+
+class AsyncPersonController(AsyncController):
+    """
+    Async member actions, see PersonController
+    Streaming and file methods (iter_people, import_members_file, export_people) are not provided:
+    they would block the event loop on file I/O or hold a session across awaits.
+    """
+    controller_class = PersonController
+
+    list_people = _async(PersonController.list_people)
+    count_people = _async(PersonController.count_people)
+    list_people_page = _async(PersonController.list_people_page)
+    list_people_summaries = _async(PersonController.list_people_summaries)
+    get_person = _async(PersonController.get_person)
+    get_member = _async(PersonController.get_member)
+    create_person = _async(PersonController.create_person)
+    create_member = _async(PersonController.create_member)
+    create_coach = _async(PersonController.create_coach)
+    import_members = _async(PersonController.import_members)
+    update_person = _async(PersonController.update_person)
+    update_member = _async(PersonController.update_member)
+    update_coach = _async(PersonController.update_coach)
+    add_sport_person = _async(PersonController.add_sport_person)
+    assign_sport = _async(PersonController.assign_sport)
+    set_sports = _async(PersonController.set_sports)
+    delete_sport_person = _async(PersonController.delete_sport_person)
+    remove_sports = _async(PersonController.remove_sports)
+    unassign_sport = _async(PersonController.unassign_sport)
+    delete_person = _async(PersonController.delete_person)
+    search_person = _async(PersonController.search_person)
+    search_people = _async(PersonController.search_people)
+    search = _async(PersonController.search)
+
+
+class AsyncSportController(AsyncController):
+    """
+    Async sport actions, see SportController
+    """
+    controller_class = SportController
+
+    list_sports = _async(SportController.list_sports)
+    list_sport_summaries = _async(SportController.list_sport_summaries)
+    list_sports_page = _async(SportController.list_sports_page)
+    get_sport = _async(SportController.get_sport)
+    get_roster = _async(SportController.get_roster)
+    get_sport_stats = _async(SportController.get_sport_stats)
+    create_sport = _async(SportController.create_sport)
+    update_sport = _async(SportController.update_sport)
+    delete_sport = _async(SportController.delete_sport)
+    search_sport = _async(SportController.search_sport)
+    search_sports = _async(SportController.search_sports)
+    search = _async(SportController.search)
@@ -0,0 +1,143 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Returned by Cache.get when the key is not cached (None may be a cached value)
+MISSING = object()
+
+
+class Cache:
+    """
+    Cache Interface Object
+    Keys are tuples whose first items are used as namespaces to invalidate entries by prefix,
+    e.g. ("person", person_id, person_type) is removed by invalidate("person", person_id)
+    """
+
+    def get(self, key):
+        raise NotImplementedError()
+
+    def set(self, key, value):
+        raise NotImplementedError()
+
+    def invalidate(self, *prefix):
+        raise NotImplementedError()
+
+    def clear(self):
+        raise NotImplementedError()
+
+    def stats(self):
+        raise NotImplementedError()
+
+    def get_or_load(self, key, loader):
+        value = self.get(key)
+        if value is MISSING:
+            value = loader()
+            self.set(key, value)
+        return value
+
+
+class NullCache(Cache):
+    """
+    Cache that never stores anything
+    """
+
+    def get(self, key):
+        return MISSING
+
+    def set(self, key, value):
+        pass
+
+    def invalidate(self, *prefix):
+        pass
+
+    def clear(self):
+        pass
+
+    def stats(self):
+        return {"hits": 0, "misses": 0, "size": 0}
+
+
+class LRUCache(Cache):
+    """
+    In-process cache keeping the `maxsize` most recently used entries for at most `ttl` seconds
+    Cached values are shared between callers and must not be modified
+    """
+
+    def __init__(self, maxsize=1024, ttl=300, clock=time.monotonic):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        # Invalidations of each prefix (() for clear) while loads are running, to detect stale loads
+        self._generations = {}
+        self._loads = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expire_at, value = entry
+                if self._ttl is None or expire_at > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return MISSING
+
+    def set(self, key, value):
+        with self._lock:
+            expire_at = None if self._ttl is None else self._clock() + self._ttl
+            self._entries[key] = (expire_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key, loader):
+        with self._lock:
+            value = self.get(key)
+            if value is not MISSING:
+                return value
+            generation = self._generation(key)
+            self._loads += 1
+        try:
+            value = loader()
+            with self._lock:
+                # Invalidated while loading: the value may be stale, returned but not cached
+                if self._generation(key) == generation:
+                    self.set(key, value)
+        finally:
+            with self._lock:
+                self._loads -= 1
+                if self._loads == 0:
+                    self._generations.clear()
+        return value
+
+    def _generation(self, key):
+        return sum(self._generations.get(key[:size], 0) for size in range(len(key) + 1))
+
+    def _bump(self, prefix):
+        if self._loads > 0:
+            self._generations[prefix] = self._generations.get(prefix, 0) + 1
+
+    def invalidate(self, *prefix):
+        size = len(prefix)
+        with self._lock:
+            self._bump(prefix)
+            for key in [key for key in self._entries if key[:size] == prefix]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._bump(())
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "size": len(self._entries)}
@@ -1,10 +1,18 @@
-import re
 import logging
+from itertools import islice
 
 from model.dao.person_dao_fabric import PersonDAOFabric
 from model.dao.sport_dao import SportDAO
+from model.dao.sport_association_dao import SportAssociationDAO
+from model.dao.loading_plan import FULL
+from controller.cache import NullCache
+from model.instrumentation import instrumented
+from model.read_models import PersonSummary
+from model.serializer import PEOPLE
+from controller.validation import PERSON_SCHEMA, MEMBER_SCHEMA, COACH_SCHEMA, format_errors
+from controller.person_io import read_members, open_text, guess_format, people_from_flat_rows, write_people
 
-from exceptions import Error, InvalidData
+from exceptions import Error, InvalidData, ResourceNotFound
 
 
 class PersonController:
@@ -12,28 +20,85 @@ class PersonController:
     Member actions
     """
 
-    def __init__(self, database_engine):
+    def __init__(self, database_engine, cache=None):
         self._database_engine = database_engine
+        self._cache = cache if cache is not None else NullCache()
 
+    @instrumented
     def list_people(self, person_type=None):
+        return self._cache.get_or_load(("people", person_type), lambda: self._list_people(person_type))
+
+    def _list_people(self, person_type=None):
         logging.info("Get people")
         with self._database_engine.new_session() as session:
             dao = PersonDAOFabric(session).get_dao(type=person_type)
-            members = dao.get_all()
+            rows, sport_rows = dao.get_all_rows(PEOPLE.columns, PEOPLE.sport_columns)
+        # Rendered from the rows, without loading ORM instances
+        return PEOPLE.render(rows, sport_rows)
+
+    @instrumented
+    def count_people(self, person_type=None):
+        with self._database_engine.new_session() as session:
+            dao = PersonDAOFabric(session).get_dao(type=person_type)
+            return dao.count()
+
+    @instrumented
+    def list_people_page(self, person_type=None, after=None, limit=50, offset=0):
+        """
+        Return at most `limit` people sorted by name, starting after the
+        (firstname, lastname, id) cursor of the last person of the previous page
+        """
+        logging.info("Get people page after %s" % str(after))
+        with self._database_engine.new_session() as session:
+            dao = PersonDAOFabric(session).get_dao(type=person_type)
+            members = dao.get_page(after=after, limit=limit, offset=offset, plan=FULL)
             members_data = [member.to_dict() for member in members]
         return members_data
 
+    @instrumented
+    def list_people_summaries(self, person_type=None, after=None, limit=50, offset=0):
+        """
+        PersonSummary page for list views, same order and cursor as list_people_page
+        """
+        with self._database_engine.new_session() as session:
+            dao = PersonDAOFabric(session).get_dao(type=person_type)
+            rows = dao.get_summary_page(after=after, limit=limit, offset=offset)
+        return [PersonSummary._make(row) for row in rows]
+
+    def iter_people(self, person_type=None, batch_size=500):
+        """
+        Generator yielding people as lists of at most `batch_size` dicts
+        """
+        logging.info("Iterate people")
+        with self._database_engine.new_session() as session:
+            dao = PersonDAOFabric(session).get_dao(type=person_type)
+            batch = []
+            for member in dao.iter_all(batch_size=batch_size, plan=FULL):
+                batch.append(member.to_dict())
+                if len(batch) == batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+    @instrumented
     def get_person(self, person_id, person_type=None):
+        return self._cache.get_or_load(("person", person_id, person_type),
+                                       lambda: self._get_person(person_id, person_type))
+
+    def _get_person(self, person_id, person_type=None):
         logging.info("Get person %s" % person_id)
         with self._database_engine.new_session() as session:
             dao = PersonDAOFabric(session).get_dao(type=person_type)
-            member = dao.get(person_id)
+            member = dao.get(person_id, plan=FULL)
             member_data = member.to_dict()
         return member_data
 
+    @instrumented
     def get_member(self, member_id):
         return self.get_person(member_id, person_type='member')
 
+    @instrumented
     def create_person(self, data, person_type=None):
         logging.info("Create member with data %s" % str(data))
         self._check_person_data(data)
@@ -43,116 +108,388 @@ class PersonController:
                 dao = PersonDAOFabric(session).get_dao(type=person_type)
                 member = dao.create(data)
                 member_data = member.to_dict()
-                return member_data
+            self._cache.invalidate("people")
+            return member_data
         except Error as e:
             # log error
             logging.error("An Error occured (%s)" % str(e))
             raise e
 
+    @instrumented
     def create_member(self, data):
         return self.create_person(data, 'member')
 
+    @instrumented
     def create_coach(self, data):
         return self.create_person(data, 'coach')
 
-    def _update_person(self, member_id, member_data, person_type=None):
+    @instrumented
+    def import_members(self, rows, chunk_size=1000):
+        """
+        Create members from an iterable of ImportRow, one transaction per chunk of `chunk_size` rows.
+        Invalid rows are reported and skipped without aborting the import.
+        """
+        logging.info("Import members")
+        report = {"rows": 0, "imported": 0, "errors": []}
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if len(chunk) == 0:
+                break
+            report["rows"] += len(chunk)
+            self._import_chunk(chunk, report)
+        self._cache.invalidate("people")
+        logging.info("%d members imported, %d errors" % (report["imported"], len(report["errors"])))
+        return report
+
+    def import_members_file(self, file, format="csv", chunk_size=1000):
+        return self.import_members(read_members(file, format=format), chunk_size=chunk_size)
+
+    def _import_chunk(self, chunk, report):
+        # All the parsed rows of the chunk checked at once, reporting every field error of a row
+        checked = iter(MEMBER_SCHEMA.validate_many([row.data for row in chunk if row.error is None]))
+        valid_rows = []
+        for row in chunk:
+            if row.error is not None:
+                report["errors"].append({"row": row.number, "error": row.error})
+                continue
+            errors = next(checked)
+            if errors:
+                report["errors"].append({"row": row.number, "error": format_errors(errors), "fields": errors})
+                continue
+            valid_rows.append(row)
+
+        new_rows = []
+        try:
+            with self._database_engine.new_session() as session:
+                dao = PersonDAOFabric(session).get_dao(type='member')
+                # Names are unique: report duplicates instead of failing the whole chunk
+                used_names = dao.existing_names((row.data['firstname'], row.data['lastname']) for row in valid_rows)
+                for row in valid_rows:
+                    name = (row.data['firstname'].lower(), row.data['lastname'].lower())
+                    if name in used_names:
+                        report["errors"].append({"row": row.number, "error": "Person %s %s already exist" % name})
+                    else:
+                        used_names.add(name)
+                        new_rows.append(row)
+                dao.bulk_create([row.data for row in new_rows])
+            report["imported"] += len(new_rows)
+        except Error as e:
+            # Isolate the faulty rows by inserting the chunk row by row
+            logging.error("Bulk insert failed (%s), retry row by row" % str(e))
+            for row in new_rows:
+                try:
+                    with self._database_engine.new_session() as session:
+                        PersonDAOFabric(session).get_dao(type='member').bulk_create([row.data])
+                    report["imported"] += 1
+                except Error as row_error:
+                    report["errors"].append({"row": row.number, "error": str(row_error)})
+
+    @instrumented
+    def export_people(self, path, format=None, compress=None):
+        """
+        Stream every person with address and sports to a CSV or JSON lines file, in constant memory
+        """
+        logging.info("Export people to %s" % path)
+        if format is None:
+            format = guess_format(path)
+        with self._database_engine.new_session() as session:
+            dao = PersonDAOFabric(session).get_dao()
+            with open_text(path, "wt", compress=compress) as file:
+                count = write_people(people_from_flat_rows(dao.iter_flat_rows()), file, format=format)
+        logging.info("%d people exported" % count)
+        return count
+
+    def _update_person(self, member_id, member_data, person_type=None, direct=False):
+        """
+        direct: UPDATE by id without loading the person, nothing is returned
+        """
         logging.info("Update %s with data: %s" % (member_id, str(member_data)))
         with self._database_engine.new_session() as session:
             dao = PersonDAOFabric(session).get_dao(type=person_type)
-            person = dao.get(member_id)
-
-            person = dao.update(person, member_data)
-            return person.to_dict()
+            if direct:
+                dao.update_by_id(member_id, member_data)
+                person_data = None
+            else:
+                person = dao.get(member_id, plan=FULL)
+                person = dao.update(person, member_data)
+                person_data = person.to_dict()
+        self._invalidate_person(member_id)
+        return person_data
 
-    def update_person(self, member_id, member_data):
+    @instrumented
+    def update_person(self, member_id, member_data, direct=False):
         self._check_person_data(member_data, update=True)
-        return self._update_person(member_id, member_data, person_type='person')
+        return self._update_person(member_id, member_data, person_type='person', direct=direct)
 
-    def update_member(self, member_id, data):
+    @instrumented
+    def update_member(self, member_id, data, direct=False):
         self._check_member_data(data, update=True)
-        return self._update_person(member_id, data, person_type='member')
+        return self._update_person(member_id, data, person_type='member', direct=direct)
 
-    def update_coach(self, member_id, data):
+    @instrumented
+    def update_coach(self, member_id, data, direct=False):
         self._check_coach_data(data, update=True)
-        return self._update_person(member_id, data, person_type='coach')
+        return self._update_person(member_id, data, person_type='coach', direct=direct)
+
+    def edit_person(self, person_id, person_type=None):
+        """
+        Unit of work collecting several changes of a person, applied in one session and transaction:
+
+            with person_controller.edit_person(person_id, 'member') as edit:
+                edit.update({"email": "new@bds.com"})
+                edit.add_sport(sport_id, "high")
+            person = edit.person
+        """
+        return PersonEdit(self, person_id, person_type)
+
+    def _check_edit_data(self, data, person_type=None):
+        if person_type == 'member':
+            self._check_member_data(data, update=True)
+        elif person_type == 'coach':
+            self._check_coach_data(data, update=True)
+        else:
+            self._check_person_data(data, update=True)
+
+    def _apply_edit(self, person_id, person_type, data, added_sports, removed_sports, dropped_sports=()):
+        logging.info("Edit person %s: %s, add sports %s, remove sports %s"
+                     % (person_id, str(data), str(added_sports), str(removed_sports)))
+        with self._database_engine.new_session() as session:
+            # Sports first, so that the person is then loaded with its up to date sports
+            if len(added_sports) > 0:
+                missing = SportDAO(session).missing_ids(added_sports.keys())
+                if len(missing) > 0:
+                    raise ResourceNotFound("Sport %s not found" % ", ".join(sorted(missing)))
+            dao = SportAssociationDAO(session)
+            dao.delete([(person_id, sport_id) for sport_id in removed_sports])
+            dao.delete([(person_id, sport_id) for sport_id in dropped_sports], missing_ok=True)
+            dao.upsert([(person_id, sport_id, level) for sport_id, level in added_sports.items()])
+
+            dao = PersonDAOFabric(session).get_dao(type=person_type)
+            person = dao.get(person_id, plan=FULL)
+            if len(data) > 0:
+                person = dao.update(person, data)
+            person_data = person.to_dict()
+        self._invalidate_person(person_id)
+        return person_data
 
+    @instrumented
     def add_sport_person(self, person_id, sport_id, level):
         logging.info("Add sport %s to person %s" % (sport_id, person_id))
         with self._database_engine.new_session() as session:
             dao = PersonDAOFabric(session).get_dao()
-            person = dao.get(person_id)
+            person = dao.get(person_id, plan=FULL)
             sport = SportDAO(session).get(sport_id)
             person.add_sport(sport, level, session)
-            return person.to_dict()
+            person_data = person.to_dict()
+        self._invalidate_person(person_id)
+        return person_data
 
+    @instrumented
+    def assign_sport(self, sport_id, assignments):
+        """
+        Give a sport to many people at once: `assignments` is a list of (person_id, level),
+        the level of people already practicing the sport is updated
+        """
+        assignments = list(assignments)
+        logging.info("Assign sport %s to %d people" % (sport_id, len(assignments)))
+        for person_id, level in assignments:
+            self._check_level(level)
+        with self._database_engine.new_session() as session:
+            if len(SportDAO(session).missing_ids([sport_id])) > 0:
+                raise ResourceNotFound("Sport %s not found" % sport_id)
+            self._check_people_exist(session, [person_id for person_id, level in assignments])
+            count = SportAssociationDAO(session).upsert([(person_id, sport_id, level)
+                                                         for person_id, level in assignments])
+        for person_id, level in assignments:
+            self._invalidate_person(person_id)
+        return {"sport_id": sport_id, "assigned": count}
+
+    @instrumented
+    def set_sports(self, person_id, sports):
+        """
+        Replace the sports of a person by the {sport_id: level} mapping `sports`
+        """
+        logging.info("Set sports of person %s" % person_id)
+        for level in sports.values():
+            self._check_level(level)
+        with self._database_engine.new_session() as session:
+            self._check_people_exist(session, [person_id])
+            missing = SportDAO(session).missing_ids(sports.keys())
+            if len(missing) > 0:
+                raise ResourceNotFound("Sport %s not found" % ", ".join(sorted(missing)))
+            dao = SportAssociationDAO(session)
+            removed = dao.delete_other_sports(person_id, sports.keys())
+            count = dao.upsert([(person_id, sport_id, level) for sport_id, level in sports.items()])
+        self._invalidate_person(person_id)
+        return {"person_id": person_id, "assigned": count, "removed": removed}
+
+    def _check_people_exist(self, session, person_ids):
+        missing = PersonDAOFabric(session).get_dao().missing_ids(person_ids)
+        if len(missing) > 0:
+            raise ResourceNotFound("Person %s not found" % ", ".join(sorted(missing)))
+
+    def _check_level(self, level):
+        if not isinstance(level, str) or len(level) == 0:
+            raise InvalidData("Invalid value level")
+
+    @instrumented
     def delete_sport_person(self, person_id, sport_id):
-        logging.info("Delete sport %s from user %s" % (person_id, sport_id))
+        logging.info("Delete sport %s from user %s" % (sport_id, person_id))
         with self._database_engine.new_session() as session:
-            dao = PersonDAOFabric(session).get_dao()
-            person = dao.get(person_id)
-            sport = SportDAO(session).get(sport_id)
-            person.delete_sport(sport, session)
-            return person.to_dict()
+            SportAssociationDAO(session).delete([(person_id, sport_id)])
+            person = PersonDAOFabric(session).get_dao().get(person_id, plan=FULL)
+            person_data = person.to_dict()
+        self._invalidate_person(person_id)
+        return person_data
 
+    @instrumented
+    def remove_sports(self, person_id, sport_ids):
+        """
+        Remove many sports from a person, all or nothing
+        """
+        logging.info("Remove sports %s from person %s" % (str(sport_ids), person_id))
+        with self._database_engine.new_session() as session:
+            removed = SportAssociationDAO(session).delete([(person_id, sport_id) for sport_id in sport_ids])
+        self._invalidate_person(person_id)
+        return {"person_id": person_id, "removed": removed}
+
+    @instrumented
+    def unassign_sport(self, sport_id, person_ids):
+        """
+        Remove a sport from many people, all or nothing
+        """
+        logging.info("Unassign sport %s from %d people" % (sport_id, len(person_ids)))
+        with self._database_engine.new_session() as session:
+            removed = SportAssociationDAO(session).delete([(person_id, sport_id) for person_id in person_ids])
+        for person_id in person_ids:
+            self._invalidate_person(person_id)
+        return {"sport_id": sport_id, "removed": removed}
+
+    @instrumented
     def delete_person(self, member_id, person_type=None):
         logging.info("Delete person %s" % member_id)
         with self._database_engine.new_session() as session:
             dao = PersonDAOFabric(session).get_dao(type=person_type)
             member = dao.get(member_id)
             dao.delete(member)
+        self._invalidate_person(member_id)
+
+    def _invalidate_person(self, person_id):
+        self._cache.invalidate("person", person_id)
+        self._cache.invalidate("people")
 
+    def cache_stats(self):
+        return self._cache.stats()
+
+    @instrumented
     def search_person(self, firstname, lastname, person_type=None):
         logging.info("Search person %s %s" % (firstname, lastname))
         # Query database
         with self._database_engine.new_session() as session:
             dao = PersonDAOFabric(session).get_dao(type=person_type)
-            member = dao.get_by_name(firstname, lastname)
+            member = dao.get_by_name(firstname, lastname, plan=FULL)
             return member.to_dict()
 
+    @instrumented
+    def search_people(self, text, limit=20, person_type=None):
+        """
+        Type-ahead search: people whose firstname, lastname or email starts with `text`, case insensitive
+        """
+        logging.info("Search people %s" % text)
+        with self._database_engine.new_session() as session:
+            dao = PersonDAOFabric(session).get_dao(type=person_type)
+            people = dao.search(text, limit=limit)
+            return [{"id": person.id, "firstname": person.firstname, "lastname": person.lastname,
+                     "email": person.email, "type": person.person_type} for person in people]
+
+    @instrumented
+    def search(self, text, limit=20, person_type=None):
+        """
+        Full-text search on names, email and city (words or word prefixes, best matches first)
+        """
+        logging.info("Full-text search people %s" % text)
+        with self._database_engine.new_session() as session:
+            dao = PersonDAOFabric(session).get_dao(type=person_type)
+            people = dao.full_text_search(text, limit=limit)
+            return [{"id": person.id, "firstname": person.firstname, "lastname": person.lastname,
+                     "email": person.email, "type": person.person_type} for person in people]
+
     def _check_member_data(self, data, update=False):
-        self._check_person_data(data, update=update)
-        specs = {
-            'medical_certificate': {"type": bool},
-        }
-        self._check_data(data, specs, update=update)
+        MEMBER_SCHEMA.check(data, update=update)
 
     def _check_coach_data(self, data, update=False):
-        self._check_person_data(data, update=update)
-        specs = {
-            'degree': {"type": str},
-            'certificate': {"type": str}
-        }
-        self._check_data(data, specs, update=update)
+        COACH_SCHEMA.check(data, update=update)
 
     def _check_person_data(self, data, update=False):
-        name_pattern = re.compile("^[\S-]{2,50}$")
-        email_pattern = re.compile("^([a-zA-Z0-9_\-\.]+)@([a-zA-Z0-9_\-\.]+)\.([a-zA-Z]{2,5})$")
-        specs = {
-            'firstname': {"type": str, "regex": name_pattern},
-            'lastname': {"type": str, "regex": name_pattern},
-            'email': {"type": str, "regex": email_pattern}
-        }
-        self._check_data(data, specs, update=update)
-
-        if 'address' in data:
-            address = data['address']
-            specs = {
-                'street': {"type": str},
-                'postal_code': {"type": int},
-                'city': {"type": str}
-            }
-            self._check_data(address, specs, update=update)
-
-    def _check_data(self, data, specs, update=False):
-        for mandatory, specs in specs.items():
-            if not update:
-                if mandatory not in data or data[mandatory] is None:
-                    raise InvalidData("Missing value %s" % mandatory)
-            else:
-                if mandatory not in data:
-                    continue
-            value = data[mandatory]
-            if "type" in specs and not isinstance(value, specs["type"]):
-                raise InvalidData("Invalid type %s" % mandatory)
-            if "regex" in specs and isinstance(value, str) and not re.match(specs["regex"], value):
-                raise InvalidData("Invalid value %s" % mandatory)
\ No newline at end of file
+        PERSON_SCHEMA.check(data, update=update)
+
+
+class PersonEdit:
+    """
+    Changes of a person collected in memory and applied by commit(), all or nothing
+    Data is checked when a change is added, the database is only used by commit().
+    Leaving the `with` block commits, unless an exception was raised (changes are then discarded).
+    """
+
+    def __init__(self, person_controller, person_id, person_type=None):
+        self._person_controller = person_controller
+        self.person_id = person_id
+        self.person_type = person_type
+        self._data = {}
+        self._added_sports = {}
+        self._removed_sports = set()
+        # Sports added then removed in this edit: removed if the person practiced them before
+        self._dropped_sports = set()
+        # Person dict after commit
+        self.person = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.commit()
+        return False
+
+    def update(self, data):
+        self._person_controller._check_edit_data(data, self.person_type)
+        if 'address' in data and 'address' in self._data:
+            data = dict(data, address=dict(self._data['address'], **data['address']))
+        self._data.update(data)
+        return self
+
+    def add_sport(self, sport_id, level):
+        """
+        Add a sport, or change its level if the person already practices it
+        """
+        self._person_controller._check_level(level)
+        self._added_sports[sport_id] = level
+        return self
+
+    def remove_sport(self, sport_id):
+        """
+        Remove a sport practiced by the person (ResourceNotFound on commit otherwise),
+        or a sport added by this edit
+        """
+        if sport_id in self._added_sports:
+            del self._added_sports[sport_id]
+            self._dropped_sports.add(sport_id)
+        else:
+            self._removed_sports.add(sport_id)
+        return self
+
+    def has_changes(self):
+        return (len(self._data) > 0 or len(self._added_sports) > 0 or len(self._removed_sports) > 0
+                or len(self._dropped_sports) > 0)
+
+    @instrumented
+    def commit(self):
+        """
+        Apply the changes in a single transaction and return the person dict
+        """
+        self.person = self._person_controller._apply_edit(self.person_id, self.person_type, self._data,
+                                                          self._added_sports, self._removed_sports,
+                                                          self._dropped_sports)
+        self._data, self._added_sports, self._removed_sports, self._dropped_sports = {}, {}, set(), set()
+        return self.person
@@ -0,0 +1,146 @@
+"""
+Read and write people files (CSV or JSON lines) in a streaming way
+"""
+
+import csv
+import gzip
+import json
+import os
+from collections import namedtuple
+from itertools import groupby
+
+from exceptions import InvalidData
+
+# Row of an import file: `data` is None and `error` is set when the row could not be parsed
+ImportRow = namedtuple("ImportRow", ["number", "data", "error"])
+
+MEMBER_FIELDS = ["firstname", "lastname", "email", "medical_certificate", "street", "postal_code", "city", "country"]
+
+EXPORT_FIELDS = ["id", "type", "firstname", "lastname", "email", "medical_certificate",
+                 "street", "postal_code", "city", "country", "sports"]
+
+_TRUE_VALUES = ("1", "true", "yes", "y", "oui")
+
+
+def open_text(path, mode="rt", compress=None):
+    """
+    Open a text file, gzip compressed if asked or if the path ends with .gz
+    """
+    if compress is None:
+        compress = path.endswith(".gz")
+    if compress:
+        return gzip.open(path, mode, encoding="utf-8", newline="")
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+def guess_format(path):
+    extension = os.path.splitext(path.lower().replace(".gz", ""))[1]
+    if extension in (".jsonl", ".json", ".ndjson"):
+        return "jsonl"
+    if extension == ".csv":
+        return "csv"
+    raise InvalidData("Unknown file format for %s" % path)
+
+
+def read_members(file, format="csv"):
+    """
+    Generator of ImportRow read from an open text file, one row at a time
+    """
+    if format == "csv":
+        return _read_csv(file)
+    elif format == "jsonl":
+        return _read_jsonl(file)
+    raise InvalidData("Unknown file format %s" % format)
+
+
+def _read_csv(file):
+    reader = csv.DictReader(file)
+    for number, row in enumerate(reader, start=1):
+        yield ImportRow(number, _member_from_csv(row), None)
+
+
+def _member_from_csv(row):
+    data = dict(firstname=row.get('firstname'), lastname=row.get('lastname'), email=row.get('email'),
+                medical_certificate=(row.get('medical_certificate') or "").strip().lower() in _TRUE_VALUES)
+    if row.get('street') or row.get('postal_code') or row.get('city'):
+        postal_code = (row.get('postal_code') or "").strip()
+        address = dict(street=row.get('street'), city=row.get('city'),
+                       postal_code=int(postal_code) if postal_code.isdigit() else postal_code)
+        if row.get('country'):
+            address['country'] = row['country']
+        data['address'] = address
+    return data
+
+
+def _read_jsonl(file):
+    for number, line in enumerate(file, start=1):
+        line = line.strip()
+        if line == "":
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            yield ImportRow(number, None, "Invalid JSON (%s)" % str(e))
+            continue
+        if not isinstance(data, dict):
+            yield ImportRow(number, None, "Invalid JSON object")
+            continue
+        yield ImportRow(number, data, None)
+
+
+def people_from_flat_rows(rows):
+    """
+    Generator of people dicts (same shape as Person.to_dict) from the consecutive rows
+    of PersonDAO.iter_flat_rows
+    """
+    for person_id, person_rows in groupby(rows, key=lambda row: row.id):
+        first = next(person_rows)
+        person = {
+            "id": first.id,
+            "firstname": first.firstname,
+            "lastname": first.lastname,
+            "email": first.email,
+            "type": first.person_type,
+            "sports": []
+        }
+        if first.medical_certificate is not None:
+            person["medical_certificate"] = first.medical_certificate
+        if first.street is not None:
+            person["address"] = {
+                "street": first.street,
+                "postal_code": first.postal_code,
+                "city": first.city,
+                "country": first.country
+            }
+        for row in [first] + list(person_rows):
+            if row.sport_id is not None:
+                person["sports"].append({"level": row.sport_level, "id": row.sport_id, "name": row.sport_name})
+        yield person
+
+
+def write_people(people, file, format="csv"):
+    """
+    Write people dicts to an open text file, one at a time, and return how many were written
+    """
+    count = 0
+    if format == "csv":
+        writer = csv.DictWriter(file, fieldnames=EXPORT_FIELDS)
+        writer.writeheader()
+        for person in people:
+            writer.writerow(_person_to_csv(person))
+            count += 1
+    elif format == "jsonl":
+        for person in people:
+            file.write(json.dumps(person))
+            file.write("\n")
+            count += 1
+    else:
+        raise InvalidData("Unknown file format %s" % format)
+    return count
+
+
+def _person_to_csv(person):
+    row = {key: person.get(key) for key in ("id", "type", "firstname", "lastname", "email", "medical_certificate")}
+    row.update(person.get("address", {}))
+    row["sports"] = ";".join("%s:%s" % (sport["name"], sport["level"]) for sport in person["sports"])
+    return row
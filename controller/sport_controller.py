@@ -1,7 +1,12 @@
-import re
 import logging
 
 from model.dao.sport_dao import SportDAO
+from model.dao.sport_association_dao import SportAssociationDAO
+from controller.cache import NullCache
+from model.instrumentation import instrumented
+from model.read_models import SportSummary
+from model.serializer import SPORTS
+from controller.validation import SPORT_SCHEMA
 
 from exceptions import Error, InvalidData, ResourceNotFound
 
@@ -11,60 +16,166 @@ class SportController:
     Sport actions
     """
 
-    def __init__(self, database_engine):
+    def __init__(self, database_engine, cache=None):
         self._database_engine = database_engine
+        self._cache = cache if cache is not None else NullCache()
 
+    @instrumented
     def list_sports(self):
+        return self._cache.get_or_load(("sports",), self._list_sports)
+
+    def _list_sports(self):
         logging.info("List sports")
         with self._database_engine.new_session() as session:
-            sports = SportDAO(session).get_all()
+            rows = SportDAO(session).get_all_rows(SPORTS.columns)
+        return SPORTS.render(rows)
+
+    @instrumented
+    def list_sport_summaries(self):
+        """
+        SportSummary of all sports sorted by name, for list views
+        """
+        return self._cache.get_or_load(("sports", "summaries"), self._list_sport_summaries)
+
+    def _list_sport_summaries(self):
+        with self._database_engine.new_session() as session:
+            rows = SportDAO(session).get_summaries()
+        return [SportSummary._make(row) for row in rows]
+
+    @instrumented
+    def list_sports_page(self, after=None, limit=50):
+        """
+        Return at most `limit` sports sorted by name, starting after the (name, id) cursor
+        """
+        logging.info("List sports page after %s" % str(after))
+        with self._database_engine.new_session() as session:
+            sports = SportDAO(session).get_page(after=after, limit=limit)
             sports_data = [sport.to_dict() for sport in sports]
         return sports_data
 
+    def iter_sports(self, batch_size=500):
+        """
+        Generator yielding sports as lists of at most `batch_size` dicts
+        """
+        logging.info("Iterate sports")
+        with self._database_engine.new_session() as session:
+            batch = []
+            for sport in SportDAO(session).iter_all(batch_size=batch_size):
+                batch.append(sport.to_dict())
+                if len(batch) == batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+    @instrumented
     def get_sport(self, sport_id):
+        return self._cache.get_or_load(("sport", sport_id), lambda: self._get_sport(sport_id))
+
+    def _get_sport(self, sport_id):
         logging.info("Get sport %s" % sport_id)
         with self._database_engine.new_session() as session:
             sport = SportDAO(session).get(sport_id)
             sport_data = sport.to_dict()
         return sport_data
 
+    @instrumented
+    def get_roster(self, sport_id, level=None, page=1, page_size=50):
+        """
+        People practicing a sport (optionally at a given level), sorted by name, one page at a time
+        """
+        logging.info("Get roster of sport %s" % sport_id)
+        if page < 1 or page_size < 1:
+            raise InvalidData("Invalid page")
+        with self._database_engine.new_session() as session:
+            dao = SportAssociationDAO(session)
+            total = dao.count_roster(sport_id, level=level)
+            if total == 0 and len(SportDAO(session).missing_ids([sport_id])) > 0:
+                raise ResourceNotFound("Sport %s not found" % sport_id)
+            rows = dao.roster(sport_id, level=level, limit=page_size, offset=(page - 1) * page_size)
+        items = [{"id": row.id, "firstname": row.firstname, "lastname": row.lastname, "email": row.email,
+                  "type": row.person_type, "level": row.level} for row in rows]
+        return {"sport_id": sport_id, "items": items, "total": total, "page": page, "page_size": page_size}
+
+    @instrumented
+    def get_sport_stats(self):
+        """
+        Number of people by sport and level, counted by the database
+        """
+        logging.info("Get sport stats")
+        with self._database_engine.new_session() as session:
+            rows = SportAssociationDAO(session).level_counts()
+        sports, levels = [], {}
+        for row in rows:
+            if len(sports) == 0 or sports[-1]["id"] != row.id:
+                sports.append({"id": row.id, "name": row.name, "total": 0, "levels": {}})
+            if row.level is not None or row.count > 0:
+                sports[-1]["levels"][row.level] = row.count
+                sports[-1]["total"] += row.count
+                levels[row.level] = levels.get(row.level, 0) + row.count
+        return {"sports": sports, "levels": levels, "total": sum(levels.values())}
+
+    @instrumented
     def create_sport(self, data):
         logging.info("Create sport with data %s" % str(data))
 
         self._check_sport_data(data)
         sport_name = data['name']
-        sports = self.list_sports()
-        if sport_name in [sport['name'] for sport in sports]:
-            raise Error("Sport '%s' already exist" % sport_name)
 
         try:
             with self._database_engine.new_session() as session:
                 # Save member in database
                 dao = SportDAO(session)
+                if dao.exists(sport_name):
+                    raise Error("Sport '%s' already exist" % sport_name)
                 sport = dao.create(data)
                 sport_data = sport.to_dict()
-                return sport_data
+            self._cache.invalidate("sports")
+            return sport_data
         except Error as e:
             # log error
             logging.error("An Error occured (%s)" % str(e))
             raise e
 
-    def update_sport(self, sport_id, sport_data):
+    @instrumented
+    def update_sport(self, sport_id, sport_data, direct=False):
+        """
+        direct: UPDATE by id without loading the sport, nothing is returned
+        """
         logging.info("Update sport %s with data: %s" % (sport_id, str(sport_data)))
         self._check_sport_data(sport_data, update=True)
         with self._database_engine.new_session() as session:
             dao = SportDAO(session)
-            sport = dao.get(sport_id)
-            sport = dao.update(sport, sport_data)
-            return sport.to_dict()
+            if direct:
+                dao.update_by_id(sport_id, sport_data)
+                sport_data = None
+            else:
+                sport = dao.get(sport_id)
+                sport = dao.update(sport, sport_data)
+                sport_data = sport.to_dict()
+        self._invalidate_sport(sport_id)
+        return sport_data
 
+    @instrumented
     def delete_sport(self, sport_id):
         logging.info("Delete person %s" % sport_id)
         with self._database_engine.new_session() as session:
             dao = SportDAO(session)
             sport = dao.get(sport_id)
             dao.delete(sport)
+        self._invalidate_sport(sport_id)
+
+    def _invalidate_sport(self, sport_id):
+        self._cache.invalidate("sports")
+        self._cache.invalidate("sport", sport_id)
+        # People data embeds sport names
+        self._cache.invalidate("person")
+        self._cache.invalidate("people")
 
+    def cache_stats(self):
+        return self._cache.stats()
+
+    @instrumented
     def search_sport(self, name):
         logging.info("Search sport %s" % name)
         # Query database
@@ -73,24 +184,25 @@ class SportController:
             sport = dao.get_by_name(name)
             return sport.to_dict()
 
+    @instrumented
+    def search_sports(self, text, limit=20):
+        """
+        Type-ahead search: sports whose name starts with `text`, case insensitive
+        """
+        logging.info("Search sports %s" % text)
+        with self._database_engine.new_session() as session:
+            sports = SportDAO(session).search(text, limit=limit)
+            return [sport.to_dict() for sport in sports]
+
+    @instrumented
+    def search(self, text, limit=20):
+        """
+        Full-text search on sport names and descriptions
+        """
+        logging.info("Full-text search sports %s" % text)
+        with self._database_engine.new_session() as session:
+            sports = SportDAO(session).full_text_search(text, limit=limit)
+            return [sport.to_dict() for sport in sports]
+
     def _check_sport_data(self, data, update=False):
-        name_pattern = re.compile("^[\S-]{2,50}$")
-        specs = {
-            "name": {"type": str, "regex": name_pattern},
-            "description": {"type": str}
-        }
-        self._check_data(data, specs, update=update)
-
-    def _check_data(self, data, specs, update=False):
-        for mandatory, specs in specs.items():
-            if not update:
-                if mandatory not in data or data[mandatory] is None:
-                    raise InvalidData("Missing value %s" % mandatory)
-            else:
-                if mandatory not in data:
-                    continue
-            value = data[mandatory]
-            if "type" in specs and not isinstance(value, specs["type"]):
-                raise InvalidData("Invalid type %s" % mandatory)
-            if "regex" in specs and isinstance(value, str) and not re.match(specs["regex"], value):
-                raise InvalidData("Invalid value %s" % mandatory)
\ No newline at end of file
+        SPORT_SCHEMA.check(data, update=update)
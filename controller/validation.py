@@ -0,0 +1,128 @@
+"""
+Input validation of the controllers
+A Schema is compiled once into one checker function per field (patterns compiled, lookups bound),
+validating a record then collects every field error in a single pass instead of stopping at the first one.
+"""
+
+import re
+
+from exceptions import InvalidData
+
+_MISSING = object()
+
+
+def format_errors(errors):
+    return ", ".join(errors.values())
+
+
+class ValidationError(InvalidData):
+    """
+    InvalidData listing every field error: `errors` maps field paths (e.g. "address.city") to messages
+    """
+
+    def __init__(self, errors):
+        super().__init__(format_errors(errors))
+        self.errors = errors
+
+
+class Field:
+
+    def __init__(self, type=None, regex=None, required=True, schema=None):
+        """
+        type: expected python type, regex: pattern of string values,
+        required: checked on creation only (updates are partial), schema: nested Schema of dict values
+        """
+        self.type = type
+        self.pattern = re.compile(regex) if isinstance(regex, str) else regex
+        self.required = required
+        self.schema = schema
+
+
+class Schema:
+
+    def __init__(self, fields):
+        self.fields = dict(fields)
+        # Compiled checkers for creation and update
+        self._checkers = {update: [_compile_field(name, field, update) for name, field in self.fields.items()]
+                          for update in (False, True)}
+
+    def extend(self, fields):
+        return Schema(dict(self.fields, **fields))
+
+    def validate(self, data, update=False, prefix=""):
+        """
+        Return the {field path: message} errors of `data`, empty when valid
+        """
+        errors = {}
+        if not isinstance(data, dict):
+            errors[prefix.rstrip(".") or "data"] = "Invalid type %s" % (prefix.rstrip(".") or "data")
+            return errors
+        for checker in self._checkers[bool(update)]:
+            checker(data, errors, prefix)
+        return errors
+
+    def validate_many(self, records, update=False):
+        """
+        Errors of each record (see validate), in the same order
+        """
+        validate = self.validate
+        return [validate(data, update) for data in records]
+
+    def check(self, data, update=False):
+        """
+        Raise ValidationError with all the errors of `data`
+        """
+        errors = self.validate(data, update)
+        if errors:
+            raise ValidationError(errors)
+
+
+def _compile_field(name, field, update):
+    expected_type, pattern, schema = field.type, field.pattern, field.schema
+    match = pattern.match if pattern is not None else None
+    required = field.required and not update
+
+    def check(data, errors, prefix):
+        value = data.get(name, _MISSING)
+        if value is _MISSING or (value is None and required):
+            if required:
+                errors[prefix + name] = "Missing value %s" % name
+            return
+        if expected_type is not None and not isinstance(value, expected_type):
+            errors[prefix + name] = "Invalid type %s" % name
+        elif match is not None and isinstance(value, str) and match(value) is None:
+            errors[prefix + name] = "Invalid value %s" % name
+        elif schema is not None:
+            errors.update(schema.validate(value, update, prefix + name + "."))
+    return check
+
+
+NAME_PATTERN = re.compile(r"^[\S-]{2,50}$")
+EMAIL_PATTERN = re.compile(r"^([a-zA-Z0-9_\-\.]+)@([a-zA-Z0-9_\-\.]+)\.([a-zA-Z]{2,5})$")
+
+ADDRESS_SCHEMA = Schema({
+    "street": Field(str),
+    "postal_code": Field(int),
+    "city": Field(str),
+})
+
+PERSON_SCHEMA = Schema({
+    "firstname": Field(str, NAME_PATTERN),
+    "lastname": Field(str, NAME_PATTERN),
+    "email": Field(str, EMAIL_PATTERN),
+    "address": Field(dict, required=False, schema=ADDRESS_SCHEMA),
+})
+
+MEMBER_SCHEMA = PERSON_SCHEMA.extend({
+    "medical_certificate": Field(bool),
+})
+
+COACH_SCHEMA = PERSON_SCHEMA.extend({
+    "degree": Field(str),
+    "certificate": Field(str),
+})
+
+SPORT_SCHEMA = Schema({
+    "name": Field(str, NAME_PATTERN),
+    "description": Field(str),
+})
@@ -1,8 +1,9 @@
 import logging
 import sys
-from model.database import DatabaseEngine
+from model.database import DatabaseEngine, PERFORMANCE_PROFILE
 from controller.person_controller import PersonController
 from controller.sport_controller import SportController
+from controller.cache import LRUCache
 
 from vue.root_frame import RootFrame
 
@@ -23,12 +24,14 @@ def main():
 
     # Init db
     logging.info("Init database")
-    database_engine = DatabaseEngine(url='sqlite:///bds.db')
-    database_engine.create_database()
-
-    # controller
-    person_controller = PersonController(database_engine)
-    sport_controller = SportController(database_engine)
+    database_engine = DatabaseEngine(url='sqlite:///bds.db', profile=PERFORMANCE_PROFILE)
+    database_engine.migrate()
+    database_engine.create_search_index()
+
+    # controller, sharing a cache so that sport updates invalidate cached people
+    cache = LRUCache(maxsize=1024, ttl=300)
+    person_controller = PersonController(database_engine, cache=cache)
+    sport_controller = SportController(database_engine, cache=cache)
 
     # init vue
     root = RootFrame(person_controller, sport_controller)
@@ -0,0 +1,86 @@
+"""
+Asynchronous database engine (SQLAlchemy asyncio, aiosqlite driver)
+The DAOs and controllers are synchronous: run_sync() runs them in a greenlet on an async session,
+every database access then awaits the driver instead of blocking the event loop.
+help: https://docs.sqlalchemy.org/en/20/orm/extensions/asyncio.html
+"""
+
+import asyncio
+from contextlib import nullcontext
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import Session as ORMSession
+
+from model.mapping import Base
+from model.database import DEFAULT_PROFILE, Session, engine_options, setup_sqlite_connection, shares_connection
+from model import search_index
+from model import instrumentation
+
+
+class _SyncSession(ORMSession):
+    """
+    Sessions of the async engine, so that instrumentation hooks only apply to them
+    """
+
+
+class SessionBoundEngine:
+    """
+    DatabaseEngine interface over the session of an async call: controllers used in run_sync()
+    open their sessions on it, each `with` block commits (or rolls back) its work
+    """
+
+    def __init__(self, sync_session):
+        self._sync_session = sync_session
+
+    def new_session(self):
+        return Session(self._sync_session)
+
+
+class AsyncDatabaseEngine:
+
+    def __init__(self, url='sqlite+aiosqlite:///:memory:', verbose=False, profile=DEFAULT_PROFILE, pool_size=5):
+        url = make_url(url)
+        options, self._pragmas = engine_options(url, profile, pool_size)
+        self._engine = create_async_engine(url, echo=verbose, **options)
+        self._Session = async_sessionmaker(bind=self._engine, autoflush=False, expire_on_commit=True,
+                                           sync_session_class=_SyncSession)
+        # In-memory database: one shared connection, run_sync() calls must not interleave their transactions
+        self._session_lock = asyncio.Lock() if shares_connection(options) else None
+        if url.get_backend_name() == 'sqlite':
+            event.listen(self._engine.sync_engine, "connect", self._setup_sqlite_connection)
+
+        event.listen(self._engine.sync_engine, "before_cursor_execute", instrumentation.record_statement)
+        event.listen(_SyncSession, "loaded_as_persistent", instrumentation.record_row)
+
+    def _setup_sqlite_connection(self, dbapi_connection, connection_record):
+        setup_sqlite_connection(dbapi_connection, self._pragmas)
+
+    def new_session(self):
+        return self._Session()
+
+    async def run_sync(self, func, *args, **kwargs):
+        """
+        Await func(engine, *args, **kwargs), `engine` being a SessionBoundEngine
+        On an in-memory database the calls run one at a time (use a database file for concurrency)
+        """
+        async with self._session_lock or nullcontext(), self._Session() as session:
+            return await session.run_sync(lambda sync_session: func(SessionBoundEngine(sync_session),
+                                                                    *args, **kwargs))
+
+    async def create_database(self):
+        async with self._engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+
+    async def remove_database(self):
+        async with self._engine.begin() as connection:
+            await connection.run_sync(search_index.drop)
+            await connection.run_sync(Base.metadata.drop_all)
+
+    async def create_search_index(self):
+        async with self._engine.begin() as connection:
+            return await connection.run_sync(search_index.create)
+
+    async def dispose(self):
+        await self._engine.dispose()
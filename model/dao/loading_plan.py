@@ -0,0 +1,31 @@
+"""
+Loading plans
+Describe which relationships of a person are fetched together with the person itself,
+so that serializing people costs a fixed number of SELECT instead of one per row.
+help: https://docs.sqlalchemy.org/en/13/orm/loading_relationships.html
+"""
+
+from sqlalchemy.orm import joinedload, selectinload
+
+from model.mapping.person import Person
+from model.mapping.sport import SportAssociation
+
+WITH_ADDRESS = "address"
+WITH_SPORTS = "sports"
+
+# Everything needed by Person.to_dict()
+FULL = (WITH_ADDRESS, WITH_SPORTS)
+
+
+def person_loading_options(plan=()):
+    options = []
+    for relation in plan:
+        if relation == WITH_ADDRESS:
+            # many-to-one: one LEFT OUTER JOIN in the main query
+            options.append(joinedload(Person.address))
+        elif relation == WITH_SPORTS:
+            # one-to-many: one extra SELECT ... WHERE person_id IN (...) for the whole result
+            options.append(selectinload(Person.sports).joinedload(SportAssociation.sport))
+        else:
+            raise ValueError("Unknown loading plan %s" % relation)
+    return options
@@ -1,4 +1,7 @@
 from model.mapping.member import Member
+from model.mapping.person import Person
+from model.mapping.address import Address
+from model.mapping.uuid_type import new_id
 from model.dao.person_dao import PersonDAO
 from model.dao.dao_error_handler import dao_error_handler
 
@@ -25,15 +28,32 @@ class MemberDAO(PersonDAO):
         return member
 
     @dao_error_handler
-    def update(self, member: Member, data: dict):
-        # Update Person data
-        super().update(member, data)
-
-        # Update Member data
-        if 'medical_certificate' in data:
-            member.medical_certificate = data['medical_certificate']
-
-        self._database_session.merge(member)
-        self._database_session.flush()
-
-        return member
+    def bulk_create(self, data_list):
+        """
+        Insert many members with one executemany per table, without building ORM objects
+        """
+        addresses, people, members = [], [], []
+        for data in data_list:
+            person_id = new_id()
+            address_id = None
+            if 'address' in data:
+                address = data['address']
+                address_id = new_id()
+                addresses.append(dict(id=address_id, street=address['street'], postal_code=address['postal_code'],
+                                      city=address['city'], country=address.get('country', 'FRANCE')))
+            people.append(dict(id=person_id, firstname=data['firstname'].lower(), lastname=data['lastname'].lower(),
+                               email=data['email'], person_type='member', address_id=address_id))
+            members.append(dict(id=person_id, medical_certificate=data.get('medical_certificate', False)))
+
+        if len(addresses) > 0:
+            self._database_session.execute(Address.__table__.insert(), addresses)
+        if len(people) > 0:
+            self._database_session.execute(Person.__table__.insert(), people)
+            self._database_session.execute(Member.__table__.insert(), members)
+        return [person['id'] for person in people]
+
+    def _table_values(self, data):
+        values = super()._table_values(data)
+        values[Member.__table__] = {'medical_certificate': data['medical_certificate']} \
+            if 'medical_certificate' in data else {}
+        return values
@@ -1,6 +1,17 @@
+from sqlalchemy import or_, and_, func, select, case, literal_column, true
+from sqlalchemy.exc import OperationalError
+
 from model.mapping.person import Person
+from model.mapping.member import Member
+from model.mapping.address import Address
+from model.mapping.sport import Sport, SportAssociation
+from model.mapping.uuid_type import new_id
 from model.dao.dao import DAO
 from model.dao.dao_error_handler import dao_error_handler
+from model.dao.loading_plan import person_loading_options
+from model.dao.prefix import starts_with, equals
+from model import search_index
+from exceptions import Error, InvalidData, ResourceNotFound
 
 
 class PersonDAO(DAO):
@@ -12,20 +23,188 @@ class PersonDAO(DAO):
         super().__init__(database_session)
         self._person_type = person_type
 
+    def _query(self, plan=()):
+        return self._database_session.query(self._person_type).options(*person_loading_options(plan))
+
+    @dao_error_handler
+    def get(self, id, plan=()):
+        return self._query(plan).filter_by(id=id).one()
+
+    def _ordered_query(self, plan=()):
+        person = self._person_type
+        return self._query(plan).order_by(person.firstname, person.lastname, person.id)
+
+    @dao_error_handler
+    def get_all(self, plan=()):
+        return self._ordered_query(plan).all()
+
+    @dao_error_handler
+    def get_page(self, after=None, limit=50, offset=0, plan=()):
+        """
+        Keyset pagination: return the `limit` people following the (firstname, lastname, id) cursor
+        `offset` is only meant for random access when no cursor is known (e.g. scrollbar jumps)
+        """
+        query = self._ordered_query(plan)
+        if after is not None:
+            query = query.filter(self._after(self._person_type, after))
+        return query.offset(offset).limit(limit).all()
+
+    def _after(self, person, after):
+        firstname, lastname, id = after
+        return or_(person.firstname > firstname,
+                   and_(person.firstname == firstname, person.lastname > lastname),
+                   and_(person.firstname == firstname, person.lastname == lastname, person.id > id))
+
+    @dao_error_handler
+    def get_summary_page(self, after=None, limit=50, offset=0):
+        """
+        Like get_page, but only (id, firstname, lastname, person_type) rows read from the people table
+        """
+        statement = select(Person.id, Person.firstname, Person.lastname, Person.person_type)
+        if self._person_type is not Person:
+            # Rows of the subclass, without joining its table
+            statement = statement.where(Person.person_type == self._person_type.__mapper__.polymorphic_identity)
+        if after is not None:
+            statement = statement.where(self._after(Person, after))
+        statement = statement.order_by(Person.firstname, Person.lastname, Person.id).offset(offset).limit(limit)
+        return self._database_session.execute(statement).all()
+
+    @dao_error_handler
+    def get_all_rows(self, columns, sport_columns):
+        """
+        Rows of `columns` (people outer joined with members and addresses) sorted by name,
+        and rows of `sport_columns` (associations joined with sports) of the same people
+        See model.serializer.PeopleSerializer
+        """
+        people = Person.__table__
+        associations = SportAssociation.__table__
+        statement = select(*columns)\
+            .select_from(people
+                         .outerjoin(Member.__table__, Member.__table__.c.id == people.c.id)
+                         .outerjoin(Address.__table__, Address.__table__.c.id == people.c.address_id))\
+            .order_by(people.c.firstname, people.c.lastname, people.c.id)
+        sport_statement = select(*sport_columns)\
+            .select_from(associations.join(Sport.__table__, Sport.__table__.c.id == associations.c.sport_id))\
+            .order_by(associations.c.person_id, associations.c.sport_id)
+        if self._person_type is not Person:
+            identity = people.c.person_type == self._person_type.__mapper__.polymorphic_identity
+            statement = statement.where(identity)
+            sport_statement = sport_statement.join(people, people.c.id == associations.c.person_id).where(identity)
+        return self._database_session.execute(statement).all(), self._database_session.execute(sport_statement).all()
+
+    @dao_error_handler
+    def search(self, text: str, limit=20):
+        """
+        Case insensitive prefix search on names and email, exact names first.
+        With several words, the first two are matched against firstname and lastname in any order.
+        """
+        person = self._person_type
+        words = text.lower().split()
+        if len(words) == 0:
+            return []
+        if len(words) == 1:
+            word = words[0]
+            condition = or_(starts_with(person.firstname, word), starts_with(person.lastname, word),
+                            starts_with(person.email, word))
+            rank = case((or_(equals(person.lastname, word), equals(person.firstname, word)), 0),
+                        (starts_with(person.lastname, word), 1),
+                        (starts_with(person.firstname, word), 2),
+                        else_=3)
+        else:
+            first, second = words[0], words[1]
+            condition = or_(and_(starts_with(person.firstname, first), starts_with(person.lastname, second)),
+                            and_(starts_with(person.firstname, second), starts_with(person.lastname, first)))
+            rank = case((and_(equals(person.firstname, first), equals(person.lastname, second)), 0),
+                        else_=1)
+        return self._database_session.query(person).filter(condition)\
+            .order_by(rank, person.lastname, person.firstname).limit(limit).all()
+
     @dao_error_handler
-    def get(self, id):
-        return self._database_session.query(self._person_type).filter_by(id=id).one()
+    def full_text_search(self, text: str, limit=20):
+        """
+        Search words (or word prefixes) in names, email and city with the FTS5 index, best matches first
+        """
+        query = search_index.match_query(text)
+        if query == "":
+            return []
+        try:
+            return self._database_session.query(self._person_type)\
+                .join(search_index.people_fts, search_index.people_fts.c.rowid == search_index.PEOPLE_ROWID)\
+                .filter(literal_column("people_fts").match(query))\
+                .order_by(search_index.people_fts.c.rank).limit(limit).all()
+        except OperationalError as e:
+            if search_index.is_missing_index_error(e):
+                raise Error("Full-text search is not enabled")
+            raise
 
     @dao_error_handler
-    def get_all(self):
-        return self._database_session.query(self._person_type).order_by(self._person_type.firstname).all()
+    def missing_ids(self, ids, chunk_size=500):
+        """
+        Return the ids of `ids` not matching any person, querying them by chunks
+        """
+        ids = list(set(ids))
+        found = set()
+        for start in range(0, len(ids), chunk_size):
+            rows = self._database_session.query(Person.id).filter(Person.id.in_(ids[start:start + chunk_size])).all()
+            found.update(row.id for row in rows)
+        return set(ids) - found
 
     @dao_error_handler
-    def get_by_name(self, firstname: str, lastname: str):
-        return self._database_session.query(self._person_type)\
-            .filter_by(firstname=firstname.lower(), lastname=lastname.lower()).one()
+    def existing_names(self, names):
+        """
+        Return the subset of (firstname, lastname) pairs already used, with a single query
+        """
+        names = set((firstname.lower(), lastname.lower()) for firstname, lastname in names)
+        if len(names) == 0:
+            return set()
+        rows = self._database_session.query(Person.firstname, Person.lastname)\
+            .filter(Person.firstname.in_(set(firstname for firstname, _ in names))).all()
+        return names.intersection((row.firstname, row.lastname) for row in rows)
+
+    def iter_flat_rows(self, batch_size=1000):
+        """
+        Stream people joined with member data, address and sports from a single SQL cursor.
+        A person with several sports spans several consecutive rows (ordered by person id).
+        """
+        people = Person.__table__
+        members = Member.__table__
+        addresses = Address.__table__
+        associations = SportAssociation.__table__
+        sports = Sport.__table__
+        statement = select(people.c.id, people.c.person_type, people.c.firstname, people.c.lastname,
+                           people.c.email, members.c.medical_certificate,
+                           addresses.c.street, addresses.c.postal_code, addresses.c.city, addresses.c.country,
+                           sports.c.id.label('sport_id'), sports.c.name.label('sport_name'),
+                           associations.c.level.label('sport_level'))\
+            .select_from(people
+                         .outerjoin(members, members.c.id == people.c.id)
+                         .outerjoin(addresses, addresses.c.id == people.c.address_id)
+                         .outerjoin(associations, associations.c.person_id == people.c.id)
+                         .outerjoin(sports, sports.c.id == associations.c.sport_id))\
+            .order_by(people.c.id)
+        result = self._database_session.execute(statement)
+        while True:
+            rows = result.fetchmany(batch_size)
+            if len(rows) == 0:
+                break
+            for row in rows:
+                yield row
+
+    @dao_error_handler
+    def count(self):
+        return self._database_session.query(func.count(self._person_type.id)).scalar()
+
+    @dao_error_handler
+    def iter_all(self, batch_size=500, plan=()):
+        """
+        Stream all people, fetching `batch_size` rows at a time from the database cursor
+        """
+        return self._ordered_query(plan).yield_per(batch_size)
 
     @dao_error_handler
+    def get_by_name(self, firstname: str, lastname: str, plan=()):
+        return self._query(plan).filter_by(firstname=firstname.lower(), lastname=lastname.lower()).one()
+
     def _update_address(self, member, address_data):
         if member.address is not None:
             if 'street' in address_data:
@@ -40,21 +219,93 @@ class PersonDAO(DAO):
             member.set_address(address_data['street'], address_data['postal_code'], address_data['city'],
                                address_data.get('country', 'FRANCE'))
 
-    @dao_error_handler
-    def update(self, member: Person, data: dict):
+    def _person_values(self, data):
+        values = {}
+        # Names are stored lower case, like in create (see get_by_name)
         if 'firstname' in data:
-            member.firstname = data['firstname']
+            values['firstname'] = data['firstname'].lower()
         if 'lastname' in data:
-            member.lastname = data['lastname']
+            values['lastname'] = data['lastname'].lower()
         if 'email' in data:
-            member.email = data['email']
+            values['email'] = data['email']
+        return values
+
+    def _table_values(self, data):
+        """
+        {table: changed values} of an update, the address excepted
+        """
+        return {Person.__table__: self._person_values(data)}
+
+    def _set_fields(self, member, data):
+        for values in self._table_values(data).values():
+            for key, value in values.items():
+                setattr(member, key, value)
         if 'address' in data:
             self._update_address(member, data['address'])
 
-        self._database_session.merge(member)
+    @dao_error_handler
+    def update(self, member: Person, data: dict):
+        """
+        Update a person of the session: a single flush, writing only the changed columns (one UPDATE per table)
+        """
+        self._set_fields(member, data)
         self._database_session.flush()
         return member
 
+    def _type_condition(self, people):
+        if self._person_type is Person:
+            return true()
+        return people.c.person_type == self._person_type.__mapper__.polymorphic_identity
+
+    @dao_error_handler
+    def update_by_id(self, id, data: dict):
+        """
+        Direct mode: UPDATE ... WHERE id = ? of the changed tables, without loading the person
+        Raise ResourceNotFound when there is no such person
+        """
+        people = Person.__table__
+        found = None
+        for table, values in self._table_values(data).items():
+            if len(values) == 0:
+                continue
+            statement = table.update().where(table.c.id == id).values(**values)
+            if table is people:
+                statement = statement.where(self._type_condition(people))
+            found = self._database_session.execute(statement).rowcount > 0
+            if not found:
+                raise ResourceNotFound("Person %s not found" % id)
+        if 'address' in data:
+            found = self._update_address_by_id(id, data['address'])
+        if found is None:
+            found = self._database_session.execute(select(people.c.id).where(people.c.id == id,
+                                                                             self._type_condition(people))).first()
+        if not found:
+            raise ResourceNotFound("Person %s not found" % id)
+
+    def _update_address_by_id(self, id, address_data):
+        people = Person.__table__
+        addresses = Address.__table__
+        values = {key: address_data[key] for key in ('street', 'postal_code', 'city', 'country') if key in address_data}
+        if len(values) == 0:
+            # Nothing to change, existence checked by the caller
+            return None
+        address_id = select(people.c.address_id).where(people.c.id == id, self._type_condition(people))
+        if self._database_session.execute(addresses.update().where(addresses.c.id == address_id.scalar_subquery())
+                                          .values(**values)).rowcount > 0:
+            return True
+        # No address yet (or no person): create it
+        address_id = new_id()
+        found = self._database_session.execute(people.update().where(people.c.id == id, self._type_condition(people))
+                                               .values(address_id=address_id)).rowcount > 0
+        if found:
+            missing = [key for key in ('street', 'postal_code', 'city') if key not in address_data]
+            if len(missing) > 0:
+                raise InvalidData("Missing value %s" % missing[0])
+            self._database_session.execute(addresses.insert().values(
+                id=address_id, street=address_data['street'], postal_code=address_data['postal_code'],
+                city=address_data['city'], country=address_data.get('country', 'FRANCE')))
+        return found
+
     @dao_error_handler
     def delete(self, entity):
         self._database_session.delete(entity)
@@ -0,0 +1,38 @@
+"""
+Case insensitive prefix matching able to use an index on lower(column):
+lower(column) LIKE 'abc%' cannot use it, the equivalent range 'abc' <= lower(column) < 'abd' can.
+lower() of SQLite only folds ASCII letters, 'Émile' stays 'Émile': non ASCII letters of the prefix are
+also matched upper case, with one range per spelling.
+"""
+
+from sqlalchemy import and_, or_, func
+
+# Spellings matched at most, further non ASCII letters of a prefix are matched lower case only
+MAX_SPELLINGS = 8
+
+
+def prefix_upper_bound(prefix):
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def spellings(text):
+    """
+    `text` lower case as compared with lower(column): with each non ASCII letter lower or upper case
+    """
+    result = [""]
+    for char in text.lower():
+        upper = char.upper()
+        if char.isascii() or len(upper) != 1 or upper == char or len(result) * 2 > MAX_SPELLINGS:
+            result = [spelling + char for spelling in result]
+        else:
+            result = [spelling + variant for spelling in result for variant in (char, upper)]
+    return result
+
+
+def starts_with(column, prefix):
+    lower = func.lower(column)
+    return or_(*[and_(lower >= spelling, lower < prefix_upper_bound(spelling)) for spelling in spellings(prefix)])
+
+
+def equals(column, text):
+    return func.lower(column).in_(spellings(text))
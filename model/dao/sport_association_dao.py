@@ -0,0 +1,101 @@
+from sqlalchemy import bindparam, select, func
+from sqlalchemy.dialects.sqlite import insert
+
+from model.mapping.person import Person
+from model.mapping.sport import Sport, SportAssociation
+from model.dao.dao import DAO
+from model.dao.dao_error_handler import dao_error_handler
+from exceptions import ResourceNotFound
+
+
+class SportAssociationDAO(DAO):
+    """
+    Set based operations on the person <-> sport association table, without loading ORM objects
+    """
+
+    @dao_error_handler
+    def upsert(self, associations):
+        """
+        Insert (person_id, sport_id, level) rows with one executemany, updating the level of existing ones
+        """
+        if len(associations) == 0:
+            return 0
+        statement = insert(SportAssociation.__table__)
+        statement = statement.on_conflict_do_update(index_elements=['person_id', 'sport_id'],
+                                                    set_={'level': statement.excluded.level})
+        self._database_session.execute(statement, [dict(person_id=person_id, sport_id=sport_id, level=level)
+                                                   for person_id, sport_id, level in associations])
+        return len(associations)
+
+    @dao_error_handler
+    def delete_other_sports(self, person_id, kept_sport_ids):
+        """
+        Remove the sports of a person which are not in `kept_sport_ids`, return how many were removed
+        """
+        table = SportAssociation.__table__
+        statement = table.delete().where(table.c.person_id == person_id)
+        if len(kept_sport_ids) > 0:
+            statement = statement.where(table.c.sport_id.notin_(list(kept_sport_ids)))
+        return self._database_session.execute(statement).rowcount
+
+    @dao_error_handler
+    def delete(self, associations, missing_ok=False):
+        """
+        Remove (person_id, sport_id) associations with one keyed executemany DELETE
+        Raise ResourceNotFound when one of them does not exist (unless missing_ok), the caller's session is then
+        rolled back
+        """
+        associations = set(associations)
+        if len(associations) == 0:
+            return 0
+        table = SportAssociation.__table__
+        statement = table.delete().where(table.c.person_id == bindparam('p_person_id'),
+                                         table.c.sport_id == bindparam('p_sport_id'))
+        deleted = self._database_session.execute(statement, [dict(p_person_id=person_id, p_sport_id=sport_id)
+                                                             for person_id, sport_id in associations]).rowcount
+        if deleted < len(associations) and not missing_ok:
+            if len(associations) == 1:
+                person_id, sport_id = next(iter(associations))
+                raise ResourceNotFound("Sport %s not assigned to person %s" % (sport_id, person_id))
+            raise ResourceNotFound("%d of %d sports not assigned" % (len(associations) - deleted, len(associations)))
+        return deleted
+
+    def _roster_filter(self, statement, sport_id, level):
+        table = SportAssociation.__table__
+        statement = statement.where(table.c.sport_id == sport_id)
+        if level is not None:
+            statement = statement.where(table.c.level == level)
+        return statement
+
+    @dao_error_handler
+    def roster(self, sport_id, level=None, limit=50, offset=0):
+        """
+        Rows (id, firstname, lastname, email, person_type, level) of the people practicing a sport, sorted by name
+        """
+        associations = SportAssociation.__table__
+        people = Person.__table__
+        statement = select(people.c.id, people.c.firstname, people.c.lastname, people.c.email,
+                           people.c.person_type, associations.c.level)\
+            .select_from(associations.join(people, people.c.id == associations.c.person_id))
+        statement = self._roster_filter(statement, sport_id, level)\
+            .order_by(people.c.firstname, people.c.lastname, people.c.id).limit(limit).offset(offset)
+        return self._database_session.execute(statement).all()
+
+    @dao_error_handler
+    def count_roster(self, sport_id, level=None):
+        statement = self._roster_filter(select(func.count()).select_from(SportAssociation.__table__), sport_id, level)
+        return self._database_session.execute(statement).scalar()
+
+    @dao_error_handler
+    def level_counts(self):
+        """
+        Rows (sport_id, name, level, count) grouped in the database, sports without people have a None level
+        """
+        associations = SportAssociation.__table__
+        sports = Sport.__table__
+        statement = select(sports.c.id, sports.c.name, associations.c.level,
+                           func.count(associations.c.person_id).label('count'))\
+            .select_from(sports.outerjoin(associations, associations.c.sport_id == sports.c.id))\
+            .group_by(sports.c.id, associations.c.level)\
+            .order_by(sports.c.name, associations.c.level)
+        return self._database_session.execute(statement).all()
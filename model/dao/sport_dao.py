@@ -1,6 +1,12 @@
+from sqlalchemy import or_, and_, func, case, literal_column, select
+from sqlalchemy.exc import OperationalError
+
 from model.mapping.sport import Sport
 from model.dao.dao import DAO
 from model.dao.dao_error_handler import dao_error_handler
+from model.dao.prefix import starts_with, equals
+from model import search_index
+from exceptions import Error, ResourceNotFound
 
 
 class SportDAO(DAO):
@@ -12,14 +18,88 @@ class SportDAO(DAO):
     def get(self, id):
         return self._database_session.query(Sport).filter_by(id=id).one()
 
+    def _ordered_query(self):
+        return self._database_session.query(Sport).order_by(Sport.name, Sport.id)
+
     @dao_error_handler
     def get_all(self):
-        return self._database_session.query(Sport).order_by(Sport.name).all()
+        return self._ordered_query().all()
+
+    @dao_error_handler
+    def get_page(self, after=None, limit=50):
+        """
+        Keyset pagination: return the `limit` sports following the (name, id) cursor
+        """
+        query = self._ordered_query()
+        if after is not None:
+            name, id = after
+            query = query.filter(or_(Sport.name > name, and_(Sport.name == name, Sport.id > id)))
+        return query.limit(limit).all()
+
+    @dao_error_handler
+    def get_all_rows(self, columns):
+        """
+        Rows of sports `columns` sorted by name, see model.serializer.SportsSerializer
+        """
+        return self._database_session.execute(select(*columns).order_by(Sport.name, Sport.id)).all()
+
+    @dao_error_handler
+    def get_summaries(self):
+        """
+        (id, name) rows of all sports sorted by name
+        """
+        return self._database_session.execute(select(Sport.id, Sport.name).order_by(Sport.name, Sport.id)).all()
+
+    @dao_error_handler
+    def iter_all(self, batch_size=500):
+        return self._ordered_query().yield_per(batch_size)
 
     @dao_error_handler
     def get_by_name(self, name: str):
         return self._database_session.query(Sport).filter_by(name=name).one()
 
+    @dao_error_handler
+    def search(self, text: str, limit=20):
+        """
+        Case insensitive prefix search on sport names, exact name first
+        """
+        text = text.strip().lower()
+        if text == "":
+            return []
+        rank = case((equals(Sport.name, text), 0), else_=1)
+        return self._database_session.query(Sport).filter(starts_with(Sport.name, text))\
+            .order_by(rank, Sport.name).limit(limit).all()
+
+    @dao_error_handler
+    def full_text_search(self, text: str, limit=20):
+        """
+        Search words (or word prefixes) in sport names and descriptions with the FTS5 index
+        """
+        query = search_index.match_query(text)
+        if query == "":
+            return []
+        try:
+            return self._database_session.query(Sport)\
+                .join(search_index.sports_fts, search_index.sports_fts.c.rowid == search_index.SPORTS_ROWID)\
+                .filter(literal_column("sports_fts").match(query))\
+                .order_by(search_index.sports_fts.c.rank).limit(limit).all()
+        except OperationalError as e:
+            if search_index.is_missing_index_error(e):
+                raise Error("Full-text search is not enabled")
+            raise
+
+    @dao_error_handler
+    def missing_ids(self, ids):
+        ids = set(ids)
+        if len(ids) == 0:
+            return set()
+        rows = self._database_session.query(Sport.id).filter(Sport.id.in_(ids)).all()
+        return ids - set(row.id for row in rows)
+
+    @dao_error_handler
+    def exists(self, name: str):
+        return self._database_session.query(Sport.id).filter_by(name=name).first() is not None
+
     @dao_error_handler
     def create(self, data: dict):
         sport = Sport(name=data.get('name'), description=data.get('description'))
@@ -27,18 +107,30 @@ class SportDAO(DAO):
         self._database_session.flush()
         return sport
 
+    def _values(self, data):
+        return {key: data[key] for key in ('name', 'description') if key in data}
+
     @dao_error_handler
     def update(self, sport: Sport, data: dict):
-        if 'name' in data:
-            sport.name = data['name']
-        if 'description' in data:
-            sport.description = data['description']
-
-        self._database_session.merge(sport)
+        for key, value in self._values(data).items():
+            setattr(sport, key, value)
         self._database_session.flush()
-
         return sport
 
+    @dao_error_handler
+    def update_by_id(self, id, data: dict):
+        """
+        Direct mode: UPDATE sports ... WHERE id = ? without loading the sport
+        """
+        table = Sport.__table__
+        values = self._values(data)
+        if len(values) > 0:
+            found = self._database_session.execute(table.update().where(table.c.id == id).values(**values)).rowcount
+        else:
+            found = self._database_session.execute(select(table.c.id).where(table.c.id == id)).first()
+        if not found:
+            raise ResourceNotFound("Sport %s not found" % id)
+
     @dao_error_handler
     def delete(self, entity):
         self._database_session.delete(entity)
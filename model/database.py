@@ -1,8 +1,89 @@
+import threading
+import time
+from contextlib import contextmanager
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
 from model.mapping import Base
+from model.mapping.uuid_type import uuid_blob
+from model import search_index
+from model import instrumentation
+from model.migrations.migrator import Migrator
+from model.migrations.versions import MIGRATIONS
+
+
+class SQLiteProfile:
+    """
+    SQLite settings applied with PRAGMA on every new connection, None leaves SQLite default
+    help: https://www.sqlite.org/pragma.html
+    """
+
+    def __init__(self, journal_mode=None, synchronous=None, cache_size=None, mmap_size=None,
+                 busy_timeout=None, temp_store=None):
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.cache_size = cache_size
+        self.mmap_size = mmap_size
+        self.busy_timeout = busy_timeout
+        self.temp_store = temp_store
+
+    def pragmas(self, in_memory=False):
+        pragmas = [("journal_mode", self.journal_mode), ("synchronous", self.synchronous),
+                   ("cache_size", self.cache_size), ("mmap_size", self.mmap_size),
+                   ("busy_timeout", self.busy_timeout), ("temp_store", self.temp_store)]
+        if in_memory:
+            # WAL and memory mapping only make sense for database files
+            pragmas = [(name, value) for name, value in pragmas if name not in ("journal_mode", "mmap_size")]
+        return [(name, value) for name, value in pragmas if value is not None]
+
+
+# Rollback journal, synchronous=FULL: SQLite defaults
+DEFAULT_PROFILE = SQLiteProfile()
+
+# Readers do not block writers (WAL), no fsync on each commit: the database stays consistent, but the last
+# commits before a power loss or OS crash may be lost (synchronous=NORMAL under WAL is not durable),
+# 64MB page cache, 256MB memory mapped I/O and wait 5s on locks instead of failing
+PERFORMANCE_PROFILE = SQLiteProfile(journal_mode="WAL", synchronous="NORMAL", cache_size=-64000,
+                                    mmap_size=256 * 1024 * 1024, busy_timeout=5000, temp_store="MEMORY")
+
+
+def engine_options(url, profile, pool_size):
+    """
+    create_engine options and SQLite pragmas of a database url
+    """
+    options = {}
+    pragmas = []
+    if url.get_backend_name() == 'sqlite':
+        in_memory = url.database in (None, "", ":memory:")
+        pragmas = profile.pragmas(in_memory=in_memory)
+        # Connections are shared between the threads of the pool
+        options["connect_args"] = {"check_same_thread": False}
+        if in_memory:
+            # A single connection, otherwise each connection would see its own empty database.
+            # Its sessions must then be serialized (see shares_connection), or their transactions interleave
+            options["poolclass"] = StaticPool
+        else:
+            options["pool_size"] = pool_size
+    return options, pragmas
+
+
+def shares_connection(options):
+    """
+    True when all the sessions of an engine built with `options` use the same connection
+    """
+    return options.get("poolclass") is StaticPool
+
+
+def setup_sqlite_connection(dbapi_connection, pragmas):
+    # Used by the binary keys migration
+    dbapi_connection.create_function("uuid_blob", 1, uuid_blob, deterministic=True)
+    cursor = dbapi_connection.cursor()
+    for name, value in pragmas:
+        cursor.execute("PRAGMA %s = %s" % (name, value))
+    cursor.close()
 
 
 class DatabaseEngine:
@@ -11,37 +92,139 @@ class DatabaseEngine:
     Handle Database connections and sessions
     """
 
-    def __init__(self, url='sqlite:///:memory:', verbose=False):
-        self._engine = create_engine(url, echo=verbose)
+    def __init__(self, url='sqlite:///:memory:', verbose=False, profile=DEFAULT_PROFILE, pool_size=5):
+        url = make_url(url)
+        options, self._pragmas = engine_options(url, profile, pool_size)
+        self._engine = create_engine(url, echo=verbose, **options)
         self._Session = sessionmaker(bind=self._engine, autoflush=False)
+        # One session at a time on a shared connection (in-memory database), reentrant for nested sessions
+        self._session_lock = threading.RLock() if shares_connection(options) else None
+        if url.get_backend_name() == 'sqlite':
+            event.listen(self._engine, "connect", self._setup_sqlite_connection)
+
+        # Feed controller instrumentation
+        event.listen(self._engine, "before_cursor_execute", instrumentation.record_statement)
+        event.listen(self._Session, "loaded_as_persistent", instrumentation.record_row)
+
+    def _setup_sqlite_connection(self, dbapi_connection, connection_record):
+        setup_sqlite_connection(dbapi_connection, self._pragmas)
 
     def new_session(self):
+        if self._session_lock is not None:
+            # Released when the session is closed
+            self._session_lock.acquire()
         sqlalchemy_session = self._Session()
-        return Session(sqlalchemy_session)
+        return Session(sqlalchemy_session, lock=self._session_lock)
 
     def create_database(self):
         Base.metadata.create_all(self._engine)
 
+    def migrate(self, run_backfills=True, chunk_size=1000, pause=0, progress=None):
+        """
+        Bring the schema (and data) of the database to the latest version, return the version
+        """
+        migrator = Migrator(self, MIGRATIONS, chunk_size=chunk_size, pause=pause, progress=progress)
+        return migrator.upgrade(run_backfills=run_backfills)
+
+    def schema_version(self):
+        return Migrator(self, MIGRATIONS).current_version()
+
     def remove_database(self):
+        with self._engine.begin() as connection:
+            search_index.drop(connection)
+            connection.exec_driver_sql("DROP TABLE IF EXISTS schema_version")
+            connection.exec_driver_sql("DROP TABLE IF EXISTS backfill_progress")
         Base.metadata.drop_all(self._engine)
 
+    def create_search_index(self):
+        """
+        Create the optional full-text search index, return False if not supported by the database
+        """
+        with self._engine.begin() as connection:
+            return search_index.create(connection)
+
+    def rebuild_search_index(self):
+        with self._engine.begin() as connection:
+            search_index.rebuild(connection)
+
+    def copy(self):
+        """
+        In-memory copy of the database (schema, statistics and rows), to run statements without changing it
+        """
+        copy = DatabaseEngine()
+        with self._engine.connect() as source, copy._engine.connect() as target:
+            source.connection.driver_connection.backup(target.connection.driver_connection)
+        return copy
+
+    def connect(self):
+        """
+        Raw connection for statements outside the ORM (maintenance, EXPLAIN)
+        """
+        return self._engine.connect()
+
+    def dispose(self):
+        """
+        Close all pooled connections
+        """
+        self._engine.dispose()
+
+    @contextmanager
+    def count_queries(self):
+        """
+        Record every SQL statement sent to the database while the context is active
+        """
+        counter = QueryCounter()
+        event.listen(self._engine, "before_cursor_execute", counter.record)
+        try:
+            yield counter
+        finally:
+            event.remove(self._engine, "before_cursor_execute", counter.record)
+
+
+class QueryCounter:
+
+    def __init__(self):
+        self.statements = []
+        self.parameters = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def record(self, connection, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+        self.parameters.append(parameters[0] if executemany and len(parameters) > 0 else parameters)
+
 
 class Session:
 
-    def __init__(self, sql_alchemy_session, autocommit=True):
+    def __init__(self, sql_alchemy_session, autocommit=True, lock=None):
         self._session = sql_alchemy_session
         self._autocommit = autocommit
+        self._opened_at = None
+        # Held by the session until it is closed (see DatabaseEngine.new_session)
+        self._lock = lock
+
+    def _release(self):
+        if self._lock is not None:
+            lock, self._lock = self._lock, None
+            lock.release()
 
     def __enter__(self):
+        self._opened_at = time.perf_counter()
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        if self._autocommit:
-            if exc_type is not None:
-                self._session.rollback()
-            else:
-                self._session.commit()
-        self._session.close()
+        try:
+            if self._autocommit:
+                if exc_type is not None:
+                    self._session.rollback()
+                else:
+                    self._session.commit()
+            self._session.close()
+        finally:
+            self._release()
+            instrumentation.record_session_time(time.perf_counter() - self._opened_at)
         return False
 
     def add(self, entity):
@@ -50,6 +233,9 @@ class Session:
     def query(self, *entity_class):
         return self._session.query(*entity_class)
 
+    def execute(self, statement, params=None):
+        return self._session.execute(statement, params)
+
     def merge(self, entity):
         return self._session.merge(entity)
 
@@ -63,7 +249,13 @@ class Session:
         self._session.commit()
 
     def close(self):
-        self._session.close()
+        try:
+            self._session.close()
+        finally:
+            self._release()
 
     def refresh(self, entity):
         self._session.refresh(entity)
+
+    def expire(self, entity, attribute_names=None):
+        self._session.expire(entity, attribute_names)
@@ -0,0 +1,177 @@
+"""
+Per-call instrumentation of controller methods
+Wall time, SQL statements, ORM rows loaded and session lifetime of each call decorated with @instrumented
+are aggregated into histograms, which can be dumped or exported in the Prometheus text format.
+SQL statements and rows are reported by the hooks installed on the engine by DatabaseEngine.
+"""
+
+import threading
+import time
+from functools import wraps
+
+TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000, 10000, 100000)
+
+# metric name: (help, buckets)
+METRICS_SPECS = {
+    "duration_seconds": ("Controller call wall time", TIME_BUCKETS),
+    "sql_statements": ("SQL statements executed by a controller call", COUNT_BUCKETS),
+    "rows_loaded": ("ORM rows loaded by a controller call", COUNT_BUCKETS),
+    "session_seconds": ("Time database sessions stayed open during a controller call", TIME_BUCKETS),
+}
+
+
+class Histogram:
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+
+    def to_dict(self):
+        cumulated, buckets = 0, {}
+        for bound, count in zip(self.buckets, self.counts):
+            cumulated += count
+            buckets[str(bound)] = cumulated
+        return {"count": self.count, "sum": self.sum, "buckets": buckets}
+
+
+class Metrics:
+    """
+    Registry of histograms by metric and controller method
+    """
+
+    def __init__(self, prefix="bds_controller"):
+        self._prefix = prefix
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, method, metric, value):
+        with self._lock:
+            histogram = self._histograms.get((metric, method))
+            if histogram is None:
+                histogram = Histogram(METRICS_SPECS[metric][1])
+                self._histograms[(metric, method)] = histogram
+            histogram.observe(value)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def dump(self):
+        """
+        {method: {metric: {"count", "sum", "buckets"}}}
+        """
+        with self._lock:
+            data = {}
+            for (metric, method), histogram in sorted(self._histograms.items()):
+                data.setdefault(method, {})[metric] = histogram.to_dict()
+            return data
+
+    def to_prometheus(self):
+        lines = []
+        with self._lock:
+            for metric, (help, buckets) in METRICS_SPECS.items():
+                name = "%s_%s" % (self._prefix, metric)
+                histograms = sorted((method, histogram) for (key, method), histogram in self._histograms.items()
+                                    if key == metric)
+                if len(histograms) == 0:
+                    continue
+                lines.append("# HELP %s %s" % (name, help))
+                lines.append("# TYPE %s histogram" % name)
+                for method, histogram in histograms:
+                    cumulated = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulated += count
+                        lines.append('%s_bucket{method="%s",le="%s"} %d' % (name, method, bound, cumulated))
+                    lines.append('%s_bucket{method="%s",le="+Inf"} %d' % (name, method, histogram.count))
+                    lines.append('%s_sum{method="%s"} %s' % (name, method, repr(float(histogram.sum))))
+                    lines.append('%s_count{method="%s"} %d' % (name, method, histogram.count))
+        return "\n".join(lines) + "\n"
+
+
+# Default registry
+METRICS = Metrics()
+
+
+class CallStats:
+    """
+    Measures of a controller call in progress
+    """
+
+    def __init__(self, method):
+        self.method = method
+        self.statements = 0
+        self.rows = 0
+        self.session_time = 0
+
+
+try:
+    # Calls are tracked per greenlet: the async engine runs each session in its own greenlet,
+    # all of them in the event loop thread (each thread has its own main greenlet)
+    from greenlet import getcurrent as _current_context
+except ImportError:
+    _local = threading.local()
+
+    def _current_context():
+        return _local
+
+
+def _active_calls():
+    context = _current_context()
+    calls = getattr(context, "bds_calls", None)
+    if calls is None:
+        calls = context.bds_calls = []
+    return calls
+
+
+def record_statement(*args):
+    # Engine "before_cursor_execute" hook
+    for call in _active_calls():
+        call.statements += 1
+
+
+def record_row(*args):
+    # Session "loaded_as_persistent" hook
+    for call in _active_calls():
+        call.rows += 1
+
+
+def record_session_time(duration):
+    for call in _active_calls():
+        call.session_time += duration
+
+
+def instrumented(func, metrics=METRICS):
+    """
+    Decorator recording the measures of each call of a controller method
+    Nested calls (e.g. create_member calling create_person) are measured by each level
+    """
+    method = func.__qualname__
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        call = CallStats(method)
+        calls = _active_calls()
+        calls.append(call)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            duration = time.perf_counter() - start
+            calls.remove(call)
+            metrics.observe(method, "duration_seconds", duration)
+            metrics.observe(method, "sql_statements", call.statements)
+            metrics.observe(method, "rows_loaded", call.rows)
+            metrics.observe(method, "session_seconds", call.session_time)
+
+    return wrapper
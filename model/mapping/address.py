@@ -1,13 +1,13 @@
 from model.mapping import Base
-import uuid
 
 from sqlalchemy import Column, String, Integer
+from model.mapping.uuid_type import UUID, new_id
 
 
 class Address(Base):
     __tablename__ = 'addresses'
 
-    id = Column(String(36), default=str(uuid.uuid4()), primary_key=True)
+    id = Column(UUID(), default=new_id, primary_key=True)
 
     street = Column(String(256), nullable=False)
     city = Column(String(50), nullable=False)
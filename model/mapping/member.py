@@ -1,16 +1,19 @@
 
-from sqlalchemy import Column, Boolean, String, ForeignKey
+from sqlalchemy import Column, Boolean, ForeignKey
+from model.mapping.uuid_type import UUID
 from model.mapping.person import Person
 
 
 class Member(Person):
     __tablename__ = 'members'
 
-    id = Column(String(36), ForeignKey('people.id'), primary_key=True)
+    id = Column(UUID(), ForeignKey('people.id'), primary_key=True)
     medical_certificate = Column(Boolean(), nullable=False, default=False)
 
     __mapper_args__ = {
         'polymorphic_identity': 'member',
+        # Join members table when querying Person, so to_dict() does not load it row by row
+        'polymorphic_load': 'inline',
     }
 
     def __repr__(self):
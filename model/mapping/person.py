@@ -1,8 +1,8 @@
 from model.mapping import Base
-import uuid
 
-from sqlalchemy import Column, String, UniqueConstraint, ForeignKey
+from sqlalchemy import Column, String, UniqueConstraint, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
+from model.mapping.uuid_type import UUID, new_id
 from model.mapping.address import Address
 from model.mapping.sport import SportAssociation
 from model.dao.dao_error_handler import dao_error_handler
@@ -12,18 +12,27 @@ from exceptions import ResourceNotFound
 class Person(Base):
     __tablename__ = 'people'
 
-    id = Column(String(36), default=str(uuid.uuid4()), primary_key=True)
+    id = Column(UUID(), default=new_id, primary_key=True)
 
     firstname = Column(String(50), nullable=False)
     lastname = Column(String(50), nullable=False)
     email = Column(String(256), nullable=False)
     person_type = Column(String(50), nullable=False)
-    address_id = Column(String(36), ForeignKey("addresses.id"), nullable=True)
+    address_id = Column(UUID(), ForeignKey("addresses.id"), nullable=True)
 
     address = relationship("Address", cascade="all,delete-orphan", single_parent=True)
     sports = relationship("SportAssociation", back_populates="person")
 
-    __table_args__ = (UniqueConstraint('firstname', 'lastname'),)
+    # The unique constraint index also serves the ORDER BY firstname, lastname, id of the listings
+    __table_args__ = (UniqueConstraint('firstname', 'lastname'),
+                      # Listings filtered by type
+                      Index('ix_people_type_name', person_type, firstname, lastname, id),
+                      # Address lookups (orphan deletion, full-text index triggers)
+                      Index('ix_people_address_id', address_id),
+                      # Case insensitive prefix search (see PersonDAO.search)
+                      Index('ix_people_firstname_lower', func.lower(firstname)),
+                      Index('ix_people_lastname_lower', func.lower(lastname)),
+                      Index('ix_people_email_lower', func.lower(email)))
     # https://docs.sqlalchemy.org/en/13/orm/inheritance.html
     __mapper_args__ = {
         'polymorphic_identity': 'person',
@@ -68,14 +77,10 @@ class Person(Base):
 
     @dao_error_handler
     def delete_sport(self, sport, session):
-        sport_association = None
-        for association in self.sports:
-            if association.sport == sport:
-                sport_association = association
-                break
-        if sport_association is not None:
-            self.sports.remove(sport_association)
-            session.delete(sport_association)
-            session.flush()
-        else:
+        # Keyed DELETE: no need to load and scan the sports collection
+        table = SportAssociation.__table__
+        deleted = session.execute(table.delete().where(table.c.person_id == self.id,
+                                                       table.c.sport_id == sport.id)).rowcount
+        if deleted == 0:
             raise ResourceNotFound("Sport %s not assigned to user %s" % (sport.name, self.firstname))
+        session.expire(self, ['sports'])
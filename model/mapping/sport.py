@@ -1,20 +1,23 @@
 from model.mapping import Base
-import uuid
 
-from sqlalchemy import Column, String, UniqueConstraint, ForeignKey
+from sqlalchemy import Column, String, UniqueConstraint, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
+from model.mapping.uuid_type import UUID, new_id
 
 
 class Sport(Base):
     __tablename__ = 'sports'
 
-    id = Column(String(36), default=str(uuid.uuid4()), primary_key=True)
+    id = Column(UUID(), default=new_id, primary_key=True)
 
     # Sport is unique in database
     name = Column(String(50), nullable=False, unique=True)
     description = Column(String(512), nullable=True)
     people = relationship("SportAssociation", back_populates="sport")
 
+    # Case insensitive prefix search (see SportDAO.search)
+    __table_args__ = (Index('ix_sports_name_lower', func.lower(name)),)
+
     def __repr__(self):
         return "<Sport %s>" % self.name
 
@@ -32,10 +35,14 @@ class SportAssociation(Base):
     help relationship: https://docs.sqlalchemy.org/en/13/orm/basic_relationships.html
     """
     __tablename__ = 'sport_associations'
-    __table_args__ = (UniqueConstraint('person_id', 'sport_id'),)
 
-    person_id = Column(String(36), ForeignKey('people.id'), primary_key=True)
-    sport_id = Column(String(36), ForeignKey('sports.id'), primary_key=True)
+    person_id = Column(UUID(), ForeignKey('people.id'), primary_key=True)
+    sport_id = Column(UUID(), ForeignKey('sports.id'), primary_key=True)
     level = Column(String(50))
+
+    # The primary key serves lookups by person, this index the reverse lookups by sport (rosters)
+    __table_args__ = (UniqueConstraint('person_id', 'sport_id'),
+                      Index('ix_sport_associations_sport_level', sport_id, level))
+
     person = relationship("Person", back_populates="sports")
     sport = relationship("Sport", back_populates="people")
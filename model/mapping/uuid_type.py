@@ -0,0 +1,78 @@
+"""
+Primary keys: UUIDs stored as 16 bytes blobs instead of 36 characters strings
+The application keeps handling ids as canonical strings, conversions are done by the column type.
+"""
+
+import os
+import time
+import uuid
+
+from sqlalchemy.types import TypeDecorator, LargeBinary
+
+
+def uuid7():
+    """
+    Time ordered UUID (RFC 9562 version 7): ids created one after the other are close in the indexes
+    """
+    milliseconds = time.time_ns() // 1000000
+    random = int.from_bytes(os.urandom(10), "big")
+    value = (milliseconds & (1 << 48) - 1) << 80
+    value |= 0x7 << 76
+    value |= (random >> 64 & 0xfff) << 64
+    value |= 0b10 << 62
+    value |= random & (1 << 62) - 1
+    return uuid.UUID(int=value)
+
+
+def new_id():
+    """
+    Column default, called for each new row
+    """
+    return str(uuid7())
+
+
+def to_bytes(value):
+    """
+    16 bytes of a UUID string, other strings are stored encoded (they never match a generated key)
+    """
+    if isinstance(value, uuid.UUID):
+        return value.bytes
+    if isinstance(value, bytes):
+        return value
+    try:
+        return uuid.UUID(value).bytes
+    except ValueError:
+        return value.encode("utf-8")
+
+
+def to_string(value):
+    if isinstance(value, str):
+        # Ids not converted yet (see migration 4)
+        return value
+    if len(value) == 16:
+        return str(uuid.UUID(bytes=value))
+    return bytes(value).decode("utf-8")
+
+
+def uuid_blob(value):
+    """
+    SQL function converting string keys to blobs, like the column type does
+    """
+    if isinstance(value, str):
+        return to_bytes(value)
+    return value
+
+
+class UUID(TypeDecorator):
+    impl = LargeBinary(16)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return to_bytes(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return to_string(value)
@@ -0,0 +1,95 @@
+"""
+Online data backfills
+Rows are updated by rowid ranges, one short transaction per chunk, so other connections
+can still write between chunks. The last processed rowid is saved in the same transaction
+as the chunk, an interrupted backfill resumes where it stopped.
+"""
+
+import logging
+import time
+
+from sqlalchemy import text
+
+_CREATE_PROGRESS = """CREATE TABLE IF NOT EXISTS backfill_progress (
+    name VARCHAR(100) PRIMARY KEY,
+    last_rowid INTEGER NOT NULL,
+    done BOOLEAN NOT NULL DEFAULT 0,
+    updated_at FLOAT NOT NULL
+)"""
+
+
+class Backfill:
+    """
+    `statement` updates the rows of `table` whose rowid is between :start and :end (both included)
+    optional: the table may not exist, the backfill is then skipped
+    """
+
+    def __init__(self, name, table, statement, optional=False):
+        self.name = name
+        self.table = table
+        self.statement = statement
+        self.optional = optional
+
+
+def _table_exists(connection, table):
+    return connection.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :table"),
+                              {"table": table}).first() is not None
+
+
+class BackfillRunner:
+
+    def __init__(self, database_engine, chunk_size=1000, pause=0, progress=None):
+        """
+        pause: seconds to sleep between chunks, to leave the database to other writers
+        progress: function(name, last_rowid, max_rowid, updated_rows) called after each chunk
+        """
+        self._database_engine = database_engine
+        self._chunk_size = chunk_size
+        self._pause = pause
+        self._progress = progress
+
+    def state(self, connection, name):
+        connection.execute(text(_CREATE_PROGRESS))
+        row = connection.execute(text("SELECT last_rowid, done FROM backfill_progress WHERE name = :name"),
+                                 {"name": name}).first()
+        return (0, False) if row is None else (row.last_rowid, bool(row.done))
+
+    def _save(self, connection, name, last_rowid, done=False):
+        connection.execute(text("INSERT INTO backfill_progress(name, last_rowid, done, updated_at) "
+                                "VALUES (:name, :last_rowid, :done, :now) "
+                                "ON CONFLICT(name) DO UPDATE SET last_rowid = excluded.last_rowid, "
+                                "done = excluded.done, updated_at = excluded.updated_at"),
+                           {"name": name, "last_rowid": last_rowid, "done": done, "now": time.time()})
+
+    def run(self, backfill):
+        """
+        Process the rows existing when the backfill starts (rows written afterwards are expected
+        to be written right by the application), return the number of updated rows
+        """
+        with self._database_engine.connect() as connection:
+            with connection.begin():
+                last_rowid, done = self.state(connection, backfill.name)
+                if backfill.optional and not _table_exists(connection, backfill.table):
+                    logging.info("Skip backfill %s, no %s table" % (backfill.name, backfill.table))
+                    return 0
+                max_rowid = connection.execute(text("SELECT max(rowid) FROM %s" % backfill.table)).scalar() or 0
+            if done:
+                return 0
+            if last_rowid > 0:
+                logging.info("Resume backfill %s after rowid %d" % (backfill.name, last_rowid))
+            updated = 0
+            while last_rowid < max_rowid:
+                end = min(last_rowid + self._chunk_size, max_rowid)
+                with connection.begin():
+                    result = connection.execute(text(backfill.statement), {"start": last_rowid + 1, "end": end})
+                    updated += max(result.rowcount, 0)
+                    self._save(connection, backfill.name, end)
+                last_rowid = end
+                if self._progress is not None:
+                    self._progress(backfill.name, last_rowid, max_rowid, updated)
+                if self._pause > 0:
+                    time.sleep(self._pause)
+            with connection.begin():
+                self._save(connection, backfill.name, last_rowid, done=True)
+        logging.info("Backfill %s done, %d rows updated" % (backfill.name, updated))
+        return updated
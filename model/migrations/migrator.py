@@ -0,0 +1,79 @@
+"""
+Versioned schema migrations
+The version of a database is the highest version recorded in its schema_version table.
+Migrations must be idempotent: a migration interrupted during its backfill is run again from its schema step.
+"""
+
+import logging
+import time
+
+from sqlalchemy import text
+
+from model.migrations.backfill import BackfillRunner
+
+_CREATE_VERSION = """CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER PRIMARY KEY,
+    description VARCHAR(256) NOT NULL,
+    applied_at FLOAT NOT NULL
+)"""
+
+
+class Migration:
+    """
+    upgrade: function(connection) changing the schema, run in one transaction
+    backfills: Backfill list updating existing rows once the schema is upgraded
+    """
+
+    def __init__(self, version, description, upgrade=None, backfills=()):
+        self.version = version
+        self.description = description
+        self.upgrade = upgrade
+        self.backfills = list(backfills)
+
+
+class Migrator:
+
+    def __init__(self, database_engine, migrations, chunk_size=1000, pause=0, progress=None):
+        self._database_engine = database_engine
+        self._migrations = sorted(migrations, key=lambda migration: migration.version)
+        self._backfill_runner = BackfillRunner(database_engine, chunk_size=chunk_size, pause=pause,
+                                               progress=progress)
+
+    def current_version(self):
+        with self._database_engine.connect() as connection:
+            with connection.begin():
+                connection.execute(text(_CREATE_VERSION))
+                return connection.execute(text("SELECT max(version) FROM schema_version")).scalar() or 0
+
+    def pending(self):
+        version = self.current_version()
+        return [migration for migration in self._migrations if migration.version > version]
+
+    def upgrade(self, run_backfills=True):
+        """
+        Apply the pending migrations in order, return the new version
+        With run_backfills=False, stop before the first migration with a backfill
+        """
+        version = self.current_version()
+        for migration in self.pending():
+            if len(migration.backfills) > 0 and not run_backfills:
+                logging.info("Migration %d has a backfill, run the migrate command" % migration.version)
+                break
+            logging.info("Migrate database to version %d (%s)" % (migration.version, migration.description))
+            if migration.upgrade is not None:
+                with self._database_engine.connect() as connection:
+                    with connection.begin():
+                        migration.upgrade(connection)
+            for backfill in migration.backfills:
+                self._backfill_runner.run(backfill)
+            self.stamp(migration)
+            version = migration.version
+        return version
+
+    def stamp(self, migration):
+        with self._database_engine.connect() as connection:
+            with connection.begin():
+                connection.execute(text("INSERT INTO schema_version(version, description, applied_at) "
+                                        "VALUES (:version, :description, :now)"),
+                                   {"version": migration.version, "description": migration.description,
+                                    "now": time.time()})
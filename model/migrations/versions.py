@@ -0,0 +1,69 @@
+"""
+Migrations of the application database, in order
+Add new migrations at the end, never change a released one
+"""
+
+from sqlalchemy.schema import CreateIndex
+
+from model.mapping import Base
+from model.mapping.person import Person
+from model.mapping.sport import Sport, SportAssociation
+from model.migrations.migrator import Migration
+from model.migrations.backfill import Backfill
+
+# Import every mapped class so that the baseline creates all the tables
+from model.mapping.member import Member  # noqa: F401
+
+
+def _baseline(connection):
+    # Tables of databases created before the migrations, or of a new database
+    Base.metadata.create_all(connection)
+
+
+def _create_indexes(*indexes):
+    def upgrade(connection):
+        for index in indexes:
+            connection.execute(CreateIndex(index, if_not_exists=True))
+    return upgrade
+
+
+def _index(table, name):
+    return next(index for index in table.indexes if index.name == name)
+
+
+def _binary_keys(table, *columns, optional=False):
+    return Backfill("binary_keys_%s" % table, table,
+                    "UPDATE %s SET %s WHERE rowid BETWEEN :start AND :end AND (%s)"
+                    % (table, ", ".join("%s = uuid_blob(%s)" % (column, column) for column in columns),
+                       " OR ".join("typeof(%s) = 'text'" % column for column in columns)), optional=optional)
+
+
+MIGRATIONS = [
+    Migration(1, "baseline", upgrade=_baseline),
+    Migration(2, "indexes for type filtered listings, address lookups and sport rosters",
+              upgrade=_create_indexes(_index(Person.__table__, 'ix_people_type_name'),
+                                      _index(Person.__table__, 'ix_people_address_id'),
+                                      _index(SportAssociation.__table__, 'ix_sport_associations_sport_level'))),
+    # Updates used to store names as typed, lookups by name expect them lower case.
+    # A name conflicting with an existing lower case name is left unchanged.
+    Migration(3, "lower case names",
+              backfills=[Backfill("lower_case_names", "people",
+                                  "UPDATE OR IGNORE people SET firstname = lower(firstname), lastname = lower(lastname) "
+                                  "WHERE rowid BETWEEN :start AND :end "
+                                  "AND (firstname != lower(firstname) OR lastname != lower(lastname))")]),
+    # Keys were 36 characters strings. Foreign keys are not enforced, so each table is converted on its own
+    # with the uuid_blob() function registered by DatabaseEngine, joins only match again once all are done.
+    # The coaches table is not mapped anymore but older databases still have it.
+    Migration(4, "16 bytes UUID keys",
+              backfills=[_binary_keys("addresses", "id"),
+                         _binary_keys("people", "id", "address_id"),
+                         _binary_keys("members", "id"),
+                         _binary_keys("sports", "id"),
+                         _binary_keys("sport_associations", "person_id", "sport_id"),
+                         _binary_keys("coaches", "id", optional=True)]),
+    Migration(5, "indexes for case insensitive lookups by name and email",
+              upgrade=_create_indexes(_index(Person.__table__, 'ix_people_firstname_lower'),
+                                      _index(Person.__table__, 'ix_people_lastname_lower'),
+                                      _index(Person.__table__, 'ix_people_email_lower'),
+                                      _index(Sport.__table__, 'ix_sports_name_lower'))),
+]
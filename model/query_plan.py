@@ -0,0 +1,134 @@
+"""
+Query plan checker
+Every statement issued by the DAO queries below is explained with EXPLAIN QUERY PLAN,
+a full table scan (SCAN <table> without an index) is reported as a problem.
+help: https://www.sqlite.org/eqp.html
+"""
+
+import re
+
+from model.mapping import Base
+from model.mapping.member import Member
+from model.mapping.address import Address
+from model.mapping.sport import Sport, SportAssociation
+from model.dao.person_dao import PersonDAO
+from model.dao.member_dao import MemberDAO
+from model.dao.sport_dao import SportDAO
+from model.dao.sport_association_dao import SportAssociationDAO
+from model.dao.loading_plan import FULL
+from exceptions import Error
+
+# "SCAN people" but not "SCAN people USING INDEX ..." nor "SCAN people_fts VIRTUAL TABLE ..."
+_SCAN = re.compile(r"^SCAN (\w+)(?P<rest>.*)$")
+
+# Fixture rows: the plans of eager loads are only visible when the main query returns something
+PERSON_ID = "00000000-0000-0000-0000-000000000001"
+ADDRESS_ID = "00000000-0000-0000-0000-000000000002"
+SPORT_ID = "00000000-0000-0000-0000-000000000003"
+
+
+def _probes():
+    """
+    name: function(session) issuing the DAO queries to check
+    """
+    return [
+        ("PersonDAO.get", lambda session: PersonDAO(session).get(PERSON_ID, plan=FULL)),
+        ("PersonDAO.get_all", lambda session: PersonDAO(session).get_all(plan=FULL)),
+        ("MemberDAO.get_all", lambda session: MemberDAO(session).get_all(plan=FULL)),
+        ("PersonDAO.get_page", lambda session: PersonDAO(session).get_page(after=("a", "b", "c"), plan=FULL)),
+        ("MemberDAO.get_page", lambda session: MemberDAO(session).get_page(after=("a", "b", "c"), plan=FULL)),
+        ("PersonDAO.get_summary_page",
+         lambda session: PersonDAO(session).get_summary_page(after=("a", "b", PERSON_ID))),
+        ("MemberDAO.get_summary_page",
+         lambda session: MemberDAO(session).get_summary_page(after=("a", "b", PERSON_ID))),
+        ("PersonDAO.iter_all", lambda session: list(PersonDAO(session).iter_all(plan=FULL))),
+        ("PersonDAO.get_by_name", lambda session: PersonDAO(session).get_by_name("anna", "smith", plan=FULL)),
+        ("PersonDAO.search", lambda session: PersonDAO(session).search("ann")),
+        ("PersonDAO.search (two words)", lambda session: PersonDAO(session).search("anna smi")),
+        ("PersonDAO.full_text_search", lambda session: PersonDAO(session).full_text_search("anna")),
+        ("PersonDAO.missing_ids", lambda session: PersonDAO(session).missing_ids([PERSON_ID, "unknown"])),
+        ("PersonDAO.existing_names", lambda session: PersonDAO(session).existing_names([("anna", "smith")])),
+        ("PersonDAO.count", lambda session: PersonDAO(session).count()),
+        ("PersonDAO.iter_flat_rows", lambda session: list(PersonDAO(session).iter_flat_rows())),
+        ("SportDAO.get", lambda session: SportDAO(session).get(SPORT_ID)),
+        ("SportDAO.get_all", lambda session: SportDAO(session).get_all()),
+        ("SportDAO.get_summaries", lambda session: SportDAO(session).get_summaries()),
+        ("SportDAO.get_page", lambda session: SportDAO(session).get_page(after=("foot", "a"))),
+        ("SportDAO.get_by_name", lambda session: SportDAO(session).get_by_name("foot")),
+        ("SportDAO.search", lambda session: SportDAO(session).search("fo")),
+        ("SportDAO.full_text_search", lambda session: SportDAO(session).full_text_search("foot")),
+        ("SportDAO.missing_ids", lambda session: SportDAO(session).missing_ids([SPORT_ID, "unknown"])),
+        ("SportDAO.exists", lambda session: SportDAO(session).exists("foot")),
+        ("Sport.people", lambda session: SportDAO(session).get(SPORT_ID).people),
+        ("SportAssociationDAO.roster",
+         lambda session: SportAssociationDAO(session).roster(SPORT_ID, level="beginner", offset=10)),
+        ("SportAssociationDAO.count_roster", lambda session: SportAssociationDAO(session).count_roster(SPORT_ID)),
+        ("SportAssociationDAO.level_counts", lambda session: SportAssociationDAO(session).level_counts()),
+        ("SportAssociationDAO.delete", lambda session: SportAssociationDAO(session).delete([("unknown", SPORT_ID)])),
+        ("SportAssociationDAO.delete_other_sports",
+         lambda session: SportAssociationDAO(session).delete_other_sports(PERSON_ID, [SPORT_ID])),
+    ]
+
+
+def _create_fixture(database_engine):
+    with database_engine.new_session() as session:
+        if session.query(Sport.id).filter_by(id=SPORT_ID).first() is not None:
+            return
+        session.add(Address(id=ADDRESS_ID, street="1 rue du stade", city="Laval", postal_code=53000))
+        session.add(Member(id=PERSON_ID, firstname="anna", lastname="smith", email="anna@smith.com",
+                           address_id=ADDRESS_ID, medical_certificate=True))
+        session.add(Sport(id=SPORT_ID, name="foot"))
+        session.flush()
+        session.add(SportAssociation(person_id=PERSON_ID, sport_id=SPORT_ID, level="beginner"))
+
+
+def full_scans(plan):
+    """
+    Names of the tables fully scanned in the EXPLAIN QUERY PLAN rows `plan`
+    """
+    tables = Base.metadata.tables
+    scanned = []
+    for row in plan:
+        match = _SCAN.match(row[-1])
+        if match is not None and match.group(1) in tables and "USING" not in match.group("rest"):
+            scanned.append(match.group(1))
+    return scanned
+
+
+def explain(connection, statement, parameters):
+    return connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters or ()).fetchall()
+
+
+def check_plans(database_engine):
+    """
+    Run every probe and explain its statements
+    Return a list of (probe name, statement, plan details, fully scanned tables), problems have scanned tables
+    """
+    _create_fixture(database_engine)
+    results = []
+    for name, probe in _probes():
+        with database_engine.count_queries() as counter:
+            with database_engine.new_session() as session:
+                try:
+                    probe(session)
+                except Error:
+                    # e.g. ResourceNotFound: the statements were issued anyway
+                    pass
+        with database_engine.connect() as connection:
+            for statement, parameters in zip(counter.statements, counter.parameters):
+                if not statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE", "WITH")):
+                    continue
+                plan = explain(connection, statement, parameters)
+                results.append((name, statement, [row[-1] for row in plan], full_scans(plan)))
+    return results
+
+
+def format_report(results):
+    lines = []
+    for name, statement, details, scanned in results:
+        status = "FULL SCAN of %s" % ", ".join(scanned) if scanned else "ok"
+        lines.append("%s: %s" % (name, status))
+        if scanned:
+            lines.append("    " + " ".join(statement.split()))
+            lines.extend("    | " + detail for detail in details)
+    return "\n".join(lines)
@@ -0,0 +1,18 @@
+"""
+Read models of the list views: immutable tuples built from column projections,
+without ORM instances, identity map nor change tracking
+"""
+
+from typing import NamedTuple
+
+
+class PersonSummary(NamedTuple):
+    id: str
+    firstname: str
+    lastname: str
+    type: str
+
+
+class SportSummary(NamedTuple):
+    id: str
+    name: str
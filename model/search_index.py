@@ -0,0 +1,127 @@
+"""
+Optional SQLite FTS5 full-text index over people (names, email, city) and sports (name, description)
+The index rows share the rowid of the indexed rows and are kept in sync by triggers,
+so every write path (ORM, bulk insert, raw SQL) updates it.
+help: https://www.sqlite.org/fts5.html
+"""
+
+import logging
+import re
+
+from sqlalchemy import text, literal_column
+from sqlalchemy.sql import table, column
+from sqlalchemy.exc import OperationalError
+
+people_fts = table("people_fts", column("rowid"), column("rank"))
+sports_fts = table("sports_fts", column("rowid"), column("rank"))
+
+# Join conditions with the indexed tables
+PEOPLE_ROWID = literal_column("people.rowid")
+SPORTS_ROWID = literal_column("sports.rowid")
+
+_TOKENIZE = "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'"
+
+_CREATE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS people_fts USING fts5(firstname, lastname, email, city, %s)" % _TOKENIZE,
+    "CREATE VIRTUAL TABLE IF NOT EXISTS sports_fts USING fts5(name, description, %s)" % _TOKENIZE,
+
+    """CREATE TRIGGER IF NOT EXISTS people_fts_insert AFTER INSERT ON people BEGIN
+        INSERT INTO people_fts(rowid, firstname, lastname, email, city)
+        VALUES (new.rowid, new.firstname, new.lastname, new.email,
+                (SELECT city FROM addresses WHERE id = new.address_id));
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS people_fts_update AFTER UPDATE ON people BEGIN
+        DELETE FROM people_fts WHERE rowid = old.rowid;
+        INSERT INTO people_fts(rowid, firstname, lastname, email, city)
+        VALUES (new.rowid, new.firstname, new.lastname, new.email,
+                (SELECT city FROM addresses WHERE id = new.address_id));
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS people_fts_delete AFTER DELETE ON people BEGIN
+        DELETE FROM people_fts WHERE rowid = old.rowid;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS addresses_fts_update AFTER UPDATE OF city ON addresses BEGIN
+        UPDATE people_fts SET city = new.city WHERE rowid IN (SELECT rowid FROM people WHERE address_id = new.id);
+    END""",
+
+    """CREATE TRIGGER IF NOT EXISTS sports_fts_insert AFTER INSERT ON sports BEGIN
+        INSERT INTO sports_fts(rowid, name, description) VALUES (new.rowid, new.name, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS sports_fts_update AFTER UPDATE ON sports BEGIN
+        DELETE FROM sports_fts WHERE rowid = old.rowid;
+        INSERT INTO sports_fts(rowid, name, description) VALUES (new.rowid, new.name, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS sports_fts_delete AFTER DELETE ON sports BEGIN
+        DELETE FROM sports_fts WHERE rowid = old.rowid;
+    END""",
+]
+
+_REBUILD = [
+    "DELETE FROM people_fts",
+    """INSERT INTO people_fts(rowid, firstname, lastname, email, city)
+       SELECT people.rowid, people.firstname, people.lastname, people.email, addresses.city
+       FROM people LEFT OUTER JOIN addresses ON addresses.id = people.address_id""",
+    "INSERT INTO people_fts(people_fts) VALUES ('optimize')",
+    "DELETE FROM sports_fts",
+    "INSERT INTO sports_fts(rowid, name, description) SELECT rowid, name, description FROM sports",
+    "INSERT INTO sports_fts(sports_fts) VALUES ('optimize')",
+]
+
+_DROP = [
+    "DROP TRIGGER IF EXISTS people_fts_insert",
+    "DROP TRIGGER IF EXISTS people_fts_update",
+    "DROP TRIGGER IF EXISTS people_fts_delete",
+    "DROP TRIGGER IF EXISTS addresses_fts_update",
+    "DROP TRIGGER IF EXISTS sports_fts_insert",
+    "DROP TRIGGER IF EXISTS sports_fts_update",
+    "DROP TRIGGER IF EXISTS sports_fts_delete",
+    "DROP TABLE IF EXISTS people_fts",
+    "DROP TABLE IF EXISTS sports_fts",
+]
+
+
+def is_supported(connection):
+    if connection.dialect.name != 'sqlite':
+        return False
+    options = [row[0] for row in connection.execute(text("PRAGMA compile_options"))]
+    return "ENABLE_FTS5" in options
+
+
+def create(connection):
+    """
+    Create the index tables and triggers if needed, then index existing rows
+    Return False when SQLite was built without FTS5
+    """
+    if not is_supported(connection):
+        logging.warning("SQLite FTS5 not available, full-text search disabled")
+        return False
+    exists = connection.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'people_fts'")).first() is not None
+    for statement in _CREATE:
+        connection.execute(text(statement))
+    if not exists:
+        rebuild(connection)
+    return True
+
+
+def rebuild(connection):
+    """
+    Re-index every row, e.g. after a VACUUM which may renumber rowids
+    """
+    for statement in _REBUILD:
+        connection.execute(text(statement))
+
+
+def drop(connection):
+    for statement in _DROP:
+        connection.execute(text(statement))
+
+
+def match_query(search):
+    """
+    Turn user input into a FTS5 query: every word must match the prefix of an indexed word
+    """
+    words = re.findall(r"\w+", search.lower())
+    return " ".join('"%s"*' % word for word in words)
+
+
+def is_missing_index_error(error):
+    return isinstance(error, OperationalError) and "no such table" in str(error) and "_fts" in str(error)
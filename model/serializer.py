@@ -0,0 +1,113 @@
+"""
+Serializers rendering result rows to dicts (same shape as the to_dict() methods) or JSON bytes
+Plans are compiled once: the columns to select and, for each output key, its position in the row.
+Rendering a row is then an itemgetter call and a dict(zip()), without ORM instances nor attribute access.
+"""
+
+import json
+from collections import defaultdict
+from operator import itemgetter
+
+from model.mapping.person import Person
+from model.mapping.member import Member
+from model.mapping.address import Address
+from model.mapping.sport import Sport, SportAssociation
+
+_json_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def to_json(data):
+    """
+    Compact UTF-8 JSON bytes
+    """
+    return _json_encoder.encode(data).encode("utf-8")
+
+
+class ColumnPlan:
+    """
+    Output keys of an entity and the columns they are read from
+    """
+
+    def __init__(self, fields):
+        self.keys = tuple(fields)
+        self.columns = tuple(fields.values())
+
+    def compile(self, offset=0):
+        """
+        Return a function rendering the row columns offset to offset + len(keys) as a dict
+        """
+        keys = self.keys
+        getter = itemgetter(*range(offset, offset + len(keys)))
+        if len(keys) == 1:
+            return lambda row: {keys[0]: getter(row)}
+        return lambda row: dict(zip(keys, getter(row)))
+
+
+_people = Person.__table__
+_members = Member.__table__
+_addresses = Address.__table__
+_sports = Sport.__table__
+_associations = SportAssociation.__table__
+
+PERSON_PLAN = ColumnPlan({"id": _people.c.id, "firstname": _people.c.firstname, "lastname": _people.c.lastname,
+                          "email": _people.c.email, "type": _people.c.person_type})
+ADDRESS_PLAN = ColumnPlan({"street": _addresses.c.street, "postal_code": _addresses.c.postal_code,
+                           "city": _addresses.c.city, "country": _addresses.c.country})
+SPORT_LEVEL_PLAN = ColumnPlan({"level": _associations.c.level, "id": _sports.c.id, "name": _sports.c.name})
+SPORT_PLAN = ColumnPlan({"id": _sports.c.id, "name": _sports.c.name, "description": _sports.c.description})
+
+
+class PeopleSerializer:
+    """
+    People rows: person columns, member certificate, address id then address columns
+    Sport rows: person id then sport level columns
+    """
+
+    def __init__(self):
+        self.columns = PERSON_PLAN.columns + (_members.c.medical_certificate, _people.c.address_id) \
+            + ADDRESS_PLAN.columns
+        self.sport_columns = (_associations.c.person_id,) + SPORT_LEVEL_PLAN.columns
+        self._person = PERSON_PLAN.compile(0)
+        self._certificate = len(PERSON_PLAN.keys)
+        self._address_id = self._certificate + 1
+        self._address = ADDRESS_PLAN.compile(self._address_id + 1)
+        self._sport = SPORT_LEVEL_PLAN.compile(1)
+
+    def render(self, rows, sport_rows):
+        sports = defaultdict(list)
+        render_sport = self._sport
+        for row in sport_rows:
+            sports[row[0]].append(render_sport(row))
+        render_person, render_address = self._person, self._address
+        certificate, address_id = self._certificate, self._address_id
+        people = []
+        for row in rows:
+            person = render_person(row)
+            person["sports"] = sports.get(row[0], [])
+            if row[address_id] is not None:
+                person["address"] = render_address(row)
+            # Only members have a certificate (NULL from the outer join otherwise)
+            if row[certificate] is not None:
+                person["medical_certificate"] = row[certificate]
+            people.append(person)
+        return people
+
+    def render_json(self, rows, sport_rows):
+        return to_json(self.render(rows, sport_rows))
+
+
+class SportsSerializer:
+
+    def __init__(self):
+        self.columns = SPORT_PLAN.columns
+        self._sport = SPORT_PLAN.compile(0)
+
+    def render(self, rows):
+        return list(map(self._sport, rows))
+
+    def render_json(self, rows):
+        return to_json(self.render(rows))
+
+
+PEOPLE = PeopleSerializer()
+SPORTS = SportsSerializer()
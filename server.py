@@ -0,0 +1,53 @@
+"""
+Headless mode: serve the controllers over HTTP/JSON instead of the Tk interface
+"""
+
+import argparse
+import logging
+import sys
+from model.database import DatabaseEngine, PERFORMANCE_PROFILE
+from controller.person_controller import PersonController
+from controller.sport_controller import SportController
+from controller.cache import LRUCache
+
+from api.http_server import make_server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="BDS HTTP/JSON server")
+    parser.add_argument("--database", default="sqlite:///bds.db", help="database url (default: %(default)s)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=8, help="request worker threads (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    # configure logging
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    root.addHandler(handler)
+
+    # Init db, one pooled connection per worker
+    logging.info("Init database")
+    database_engine = DatabaseEngine(url=args.database, profile=PERFORMANCE_PROFILE, pool_size=args.workers)
+    database_engine.migrate()
+    database_engine.create_search_index()
+
+    # controllers shared by the workers, as is the cache
+    cache = LRUCache(maxsize=1024, ttl=300)
+    person_controller = PersonController(database_engine, cache=cache)
+    sport_controller = SportController(database_engine, cache=cache)
+
+    server = make_server(person_controller, sport_controller, host=args.host, port=args.port, workers=args.workers)
+    logging.info("Serving on http://%s:%d" % server.server_address[:2])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logging.info("Stop BDS server")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+from contextlib import contextmanager
+
+
+class QueryCountMixin:
+    """
+    Pin the number of SQL statements issued by a block of code
+    """
+
+    @contextmanager
+    def assertQueryCount(self, database_engine, expected):
+        with database_engine.count_queries() as counter:
+            yield counter
+        self.assertEqual(counter.count, expected,
+                         "%d queries executed, expected %d:\n%s"
+                         % (counter.count, expected, "\n".join(counter.statements)))
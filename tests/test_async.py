@@ -0,0 +1,98 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from controller.async_controller import AsyncPersonController, AsyncSportController
+from controller.cache import LRUCache
+from exceptions import ResourceNotFound, InvalidData, Error
+from model.async_database import AsyncDatabaseEngine
+from model.database import PERFORMANCE_PROFILE
+
+
+class TestAsyncControllers(unittest.IsolatedAsyncioTestCase):
+    """
+    Controllers served from an asyncio event loop
+    """
+
+    async def asyncSetUp(self) -> None:
+        self._directory = tempfile.TemporaryDirectory()
+        url = "sqlite+aiosqlite:///%s" % os.path.join(self._directory.name, "bds.db")
+        self._database_engine = AsyncDatabaseEngine(url=url, profile=PERFORMANCE_PROFILE)
+        await self._database_engine.create_database()
+        cache = LRUCache()
+        self.person_controller = AsyncPersonController(self._database_engine, cache=cache)
+        self.sport_controller = AsyncSportController(self._database_engine, cache=cache)
+        self.foot = await self.sport_controller.create_sport({"name": "foot", "description": "ball"})
+        self.members = []
+        for index in range(5):
+            self.members.append(await self.person_controller.create_member({
+                "firstname": "player%d" % index, "lastname": "team", "email": "player%d@team.com" % index,
+                "medical_certificate": True,
+                "address": {"street": "1 rue du stade", "postal_code": 53000, "city": "Laval"}}))
+
+    async def asyncTearDown(self) -> None:
+        await self._database_engine.dispose()
+        self._directory.cleanup()
+
+    async def test_read_write(self):
+        await self.person_controller.assign_sport(self.foot["id"], [(member["id"], "high") for member in self.members])
+        person = await self.person_controller.get_person(self.members[0]["id"])
+        self.assertEqual(person["sports"], [{"id": self.foot["id"], "name": "foot", "level": "high"}])
+        self.assertEqual(person["address"]["city"], "Laval")
+        roster = await self.sport_controller.get_roster(self.foot["id"])
+        self.assertEqual(roster["total"], 5)
+        self.assertEqual(len(await self.person_controller.list_people_summaries()), 5)
+
+    async def test_errors(self):
+        with self.assertRaises(ResourceNotFound):
+            await self.person_controller.get_person("unknown")
+        with self.assertRaises(InvalidData):
+            await self.person_controller.create_member({"firstname": "x"})
+        with self.assertRaises(Error):
+            await self.sport_controller.create_sport({"name": "foot", "description": "again"})
+
+    async def test_concurrent_requests(self):
+        # Without cache: every call reads the database
+        person_controller = AsyncPersonController(self._database_engine)
+        ids = [member["id"] for member in self.members] * 40
+        update = {"email": "new@team.com"}
+        people = await asyncio.gather(*[person_controller.get_person(id) for id in ids],
+                                      *[person_controller.update_member(ids[0], update) for _ in range(5)],
+                                      *[self.sport_controller.get_roster(self.foot["id"]) for _ in range(20)])
+        self.assertEqual([person["id"] for person in people[:len(ids)]], ids)
+
+    async def test_concurrent_writes(self):
+        await assert_concurrent_writes_persist(self, self.sport_controller)
+
+
+async def assert_concurrent_writes_persist(test, sport_controller):
+    # Half of the creations fail (duplicate names): every reported success must still be stored
+    results = await asyncio.gather(*[sport_controller.create_sport({"name": "s%d" % (index // 2), "description": "x"})
+                                     for index in range(40)], return_exceptions=True)
+    created = [result["name"] for result in results if isinstance(result, dict)]
+    test.assertEqual(len(created), 20)
+    test.assertTrue(all(isinstance(result, (dict, Error)) for result in results))
+    test.assertEqual(sorted(sport["name"] for sport in await sport_controller.list_sports() if sport["name"] != "foot"),
+                     sorted(created))
+
+
+class TestAsyncMemoryDatabase(unittest.IsolatedAsyncioTestCase):
+    """
+    In-memory database: a single shared connection
+    """
+
+    async def asyncSetUp(self) -> None:
+        self._database_engine = AsyncDatabaseEngine()
+        await self._database_engine.create_database()
+        self.sport_controller = AsyncSportController(self._database_engine)
+
+    async def asyncTearDown(self) -> None:
+        await self._database_engine.dispose()
+
+    async def test_concurrent_writes(self):
+        await assert_concurrent_writes_persist(self, self.sport_controller)
+
+
+if __name__ == '__main__':
+    unittest.main()
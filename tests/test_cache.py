@@ -0,0 +1,106 @@
+import unittest
+import uuid
+
+from controller.cache import LRUCache, MISSING
+from controller.person_controller import PersonController
+from controller.sport_controller import SportController
+from exceptions import Error
+from model.database import DatabaseEngine
+from model.mapping.member import Member
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.now = 0
+        self.cache = LRUCache(maxsize=2, ttl=10, clock=lambda: self.now)
+
+    def test_hit_and_miss(self):
+        self.assertIs(self.cache.get(("sport", 1)), MISSING)
+        self.cache.set(("sport", 1), "foot")
+        self.assertEqual(self.cache.get(("sport", 1)), "foot")
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    def test_eviction(self):
+        self.cache.set(("sport", 1), "foot")
+        self.cache.set(("sport", 2), "golf")
+        self.cache.get(("sport", 1))
+        self.cache.set(("sport", 3), "judo")
+        self.assertIs(self.cache.get(("sport", 2)), MISSING)
+        self.assertEqual(self.cache.get(("sport", 1)), "foot")
+
+    def test_ttl(self):
+        self.cache.set(("sports",), [])
+        self.now = 11
+        self.assertIs(self.cache.get(("sports",)), MISSING)
+
+    def test_invalidate_prefix(self):
+        self.cache.set(("person", "a", None), 1)
+        self.cache.set(("person", "b", None), 2)
+        self.cache.invalidate("person", "a")
+        self.assertIs(self.cache.get(("person", "a", None)), MISSING)
+        self.assertEqual(self.cache.get(("person", "b", None)), 2)
+
+    def test_invalidate_while_loading(self):
+        def load(*prefix):
+            # Invalidated by another thread once the value was read from the database
+            self.cache.invalidate(*prefix)
+            return "stale"
+
+        self.assertEqual(self.cache.get_or_load(("person", "a", None), lambda: load("person", "a")), "stale")
+        self.assertIs(self.cache.get(("person", "a", None)), MISSING)
+        self.assertEqual(self.cache.get_or_load(("person", "a", None), lambda: load("person")), "stale")
+        self.assertIs(self.cache.get(("person", "a", None)), MISSING)
+        # Other prefixes do not matter
+        self.cache.get_or_load(("person", "a", None), lambda: load("person", "b"))
+        self.assertEqual(self.cache.get(("person", "a", None)), "stale")
+
+
+class TestControllerCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self._database_engine = DatabaseEngine()
+        self._database_engine.create_database()
+        self.cache = LRUCache()
+        self.person_controller = PersonController(self._database_engine, cache=self.cache)
+        self.sport_controller = SportController(self._database_engine, cache=self.cache)
+        with self._database_engine.new_session() as session:
+            member = Member(id=str(uuid.uuid4()), firstname="john", lastname="doe", email="john@doe.com")
+            session.add(member)
+            session.flush()
+            self.member_id = member.id
+        self.sport_id = self.sport_controller.create_sport({"name": "foot", "description": "ball"})['id']
+
+    def test_list_sports_cached(self):
+        with self._database_engine.count_queries() as counter:
+            self.sport_controller.list_sports()
+            self.sport_controller.list_sports()
+        self.assertEqual(counter.count, 1)
+        self.assertEqual(self.sport_controller.cache_stats()["hits"], 1)
+
+    def test_delete_sport_invalidates_list(self):
+        self.assertEqual(len(self.sport_controller.list_sports()), 1)
+        self.sport_controller.delete_sport(self.sport_id)
+        self.assertEqual(len(self.sport_controller.list_sports()), 0)
+
+    def test_create_sport_duplicate(self):
+        with self.assertRaises(Error):
+            self.sport_controller.create_sport({"name": "foot", "description": "again"})
+
+    def test_update_sport_invalidates_people(self):
+        self.person_controller.add_sport_person(self.member_id, self.sport_id, "beginner")
+        self.assertEqual(self.person_controller.get_person(self.member_id)['sports'][0]['name'], "foot")
+        self.sport_controller.update_sport(self.sport_id, {"name": "soccer"})
+        self.assertEqual(self.sport_controller.get_sport(self.sport_id)['name'], "soccer")
+        self.assertEqual(self.person_controller.get_person(self.member_id)['sports'][0]['name'], "soccer")
+
+    def test_update_person_invalidates(self):
+        self.person_controller.list_people()
+        self.person_controller.update_member(self.member_id, {"email": "john@updated.com"})
+        self.assertEqual(self.person_controller.get_person(self.member_id)['email'], "john@updated.com")
+        self.assertEqual(self.person_controller.list_people()[0]['email'], "john@updated.com")
+
+
+if __name__ == '__main__':
+    unittest.main()
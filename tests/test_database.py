@@ -0,0 +1,68 @@
+import os
+import tempfile
+import threading
+import unittest
+import uuid
+
+from sqlalchemy import text
+
+from model.database import DatabaseEngine, PERFORMANCE_PROFILE
+from model.mapping.sport import Sport
+from controller.sport_controller import SportController
+from exceptions import Error
+
+
+class TestDatabaseEngine(unittest.TestCase):
+
+    def test_performance_profile(self):
+        with tempfile.TemporaryDirectory() as directory:
+            database_engine = DatabaseEngine(url="sqlite:///%s" % os.path.join(directory, "test.db"),
+                                             profile=PERFORMANCE_PROFILE)
+            with database_engine.new_session() as session:
+                self.assertEqual(session.execute(text("PRAGMA journal_mode")).scalar(), "wal")
+                self.assertEqual(session.execute(text("PRAGMA synchronous")).scalar(), 1)
+                self.assertEqual(session.execute(text("PRAGMA busy_timeout")).scalar(), 5000)
+            database_engine.dispose()
+
+    def test_memory_database_shared_between_threads(self):
+        database_engine = DatabaseEngine(profile=PERFORMANCE_PROFILE)
+        database_engine.create_database()
+        with database_engine.new_session() as session:
+            session.add(Sport(id=str(uuid.uuid4()), name="foot"))
+
+        names = []
+
+        def read():
+            with database_engine.new_session() as session:
+                names.extend(sport.name for sport in session.query(Sport).all())
+
+        thread = threading.Thread(target=read)
+        thread.start()
+        thread.join()
+        self.assertEqual(names, ["foot"])
+
+    def test_memory_database_concurrent_sessions(self):
+        # Sessions on the single shared connection must not roll back each other's work
+        database_engine = DatabaseEngine()
+        database_engine.create_database()
+        sport_controller = SportController(database_engine)
+        created, failed = [], []
+
+        def create(index):
+            try:
+                created.append(sport_controller.create_sport({"name": "s%d" % (index // 2), "description": "x"}))
+            except Error:
+                failed.append(index)
+
+        threads = [threading.Thread(target=create, args=(index,)) for index in range(40)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual((len(created), len(failed)), (20, 20))
+        self.assertEqual(sorted(sport["name"] for sport in sport_controller.list_sports()),
+                         sorted(sport["name"] for sport in created))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+import gzip
+import http.client
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from api.http_server import make_server
+from controller.cache import LRUCache
+from controller.person_controller import PersonController
+from controller.sport_controller import SportController
+from model.database import DatabaseEngine, PERFORMANCE_PROFILE
+
+
+class TestHttpServer(unittest.TestCase):
+    """
+    Controllers served over HTTP/JSON
+    """
+
+    def setUp(self) -> None:
+        self._directory = tempfile.TemporaryDirectory()
+        url = "sqlite:///%s" % os.path.join(self._directory.name, "bds.db")
+        self._database_engine = DatabaseEngine(url=url, profile=PERFORMANCE_PROFILE, pool_size=4)
+        self._database_engine.create_database()
+        cache = LRUCache()
+        self._server = make_server(PersonController(self._database_engine, cache=cache),
+                                   SportController(self._database_engine, cache=cache), port=0, workers=4)
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.start()
+        self._connection = http.client.HTTPConnection(*self._server.server_address[:2], timeout=5)
+
+    def tearDown(self) -> None:
+        self._connection.close()
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._directory.cleanup()
+
+    def _request(self, method, path, body=None, headers=None):
+        headers = dict(headers or {})
+        if body is not None:
+            body = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+        self._connection.request(method, path, body=body, headers=headers)
+        response = self._connection.getresponse()
+        data = response.read()
+        if response.getheader("Content-Encoding") == "gzip":
+            data = gzip.decompress(data)
+        if response.getheader("Content-Type") == "application/json":
+            data = json.loads(data)
+        return response, data
+
+    def _create_member(self, index):
+        response, member = self._request("POST", "/members", {
+            "firstname": "player%d" % index, "lastname": "team", "email": "player%d@team.com" % index,
+            "medical_certificate": True,
+            "address": {"street": "1 rue du stade", "postal_code": 53000, "city": "Laval"}})
+        self.assertEqual(response.status, 201)
+        return member
+
+    def test_crud(self):
+        response, sport = self._request("POST", "/sports", {"name": "foot", "description": "ball"})
+        self.assertEqual(response.status, 201)
+        member = self._create_member(0)
+        response, person = self._request("POST", "/people/%s/sports" % member["id"],
+                                         {"sport_id": sport["id"], "level": "high"})
+        self.assertEqual(response.status, 200)
+        self.assertEqual(person["sports"], [{"id": sport["id"], "name": "foot", "level": "high"}])
+
+        response, roster = self._request("GET", "/sports/%s/roster" % sport["id"])
+        self.assertEqual(roster["total"], 1)
+        response, people = self._request("GET", "/people?type=member")
+        self.assertEqual(people, [{"id": member["id"], "firstname": "player0", "lastname": "team", "type": "member"}])
+
+        other = self._create_member(1)
+        response, data = self._request("DELETE", "/people/%s" % other["id"])
+        self.assertEqual(response.status, 204)
+        response, error = self._request("GET", "/people/%s" % other["id"])
+        self.assertEqual(response.status, 404)
+        self.assertIn("error", error)
+
+    def test_errors(self):
+        response, error = self._request("POST", "/members", {"firstname": "x"})
+        self.assertEqual(response.status, 400)
+        self.assertIn("error", error)
+        self._request("POST", "/sports", {"name": "foot", "description": "ball"})
+        response, error = self._request("POST", "/sports", {"name": "foot", "description": "again"})
+        self.assertEqual(response.status, 400)
+        response, error = self._request("POST", "/sports", headers={"Content-Length": "0"})
+        self.assertEqual(response.status, 400)
+        response, error = self._request("GET", "/unknown")
+        self.assertEqual(response.status, 404)
+        response, error = self._request("PUT", "/sports")
+        self.assertEqual(response.status, 405)
+        response, error = self._request("GET", "/people?limit=many")
+        self.assertEqual(response.status, 400)
+
+    def test_invalid_content_length(self):
+        for length in ("many", "-1"):
+            connection = http.client.HTTPConnection(*self._server.server_address[:2], timeout=2)
+            try:
+                connection.putrequest("POST", "/sports")
+                connection.putheader("Content-Length", length)
+                connection.endheaders()
+                response = connection.getresponse()
+                self.assertEqual(response.status, 400)
+                self.assertEqual(response.getheader("Connection"), "close")
+                self.assertEqual(json.loads(response.read()), {"error": "Invalid Content-Length"})
+            finally:
+                connection.close()
+
+    def test_limit(self):
+        for index in range(3):
+            self._create_member(index)
+        for path in ("/people?limit=-1", "/people?limit=0", "/people/search?q=player&limit=-1",
+                     "/sports/search?q=foot&limit=0"):
+            response, error = self._request("GET", path)
+            self.assertEqual(response.status, 400, path)
+            self.assertEqual(error, {"error": "Invalid parameter limit"})
+        with mock.patch("api.http_server.MAX_LIMIT", 2):
+            response, people = self._request("GET", "/people?limit=100")
+            self.assertEqual(len(people), 2)
+            response, people = self._request("GET", "/people/search?q=player&limit=100")
+            self.assertEqual(len(people), 2)
+
+    def test_keep_alive_and_gzip(self):
+        for index in range(20):
+            self._create_member(index)
+        # All the requests above used the same connection
+        sock = self._connection.sock
+        response, people = self._request("GET", "/people?limit=100", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.getheader("Content-Encoding"), "gzip")
+        self.assertEqual(len(people), 20)
+        self.assertIs(self._connection.sock, sock)
+        response, health = self._request("GET", "/health", headers={"Accept-Encoding": "gzip"})
+        # Small responses are sent as is
+        self.assertIsNone(response.getheader("Content-Encoding"))
+        self.assertEqual(health, {"status": "ok"})
+
+    def test_idle_connections(self):
+        # Every worker holds an idle kept alive connection
+        connections = [http.client.HTTPConnection(*self._server.server_address[:2], timeout=5) for _ in range(4)]
+        try:
+            for connection in connections:
+                connection.request("GET", "/health")
+                connection.getresponse().read()
+            start = time.monotonic()
+            response, health = self._request("GET", "/health")
+            self.assertEqual(health, {"status": "ok"})
+            # Served once an idle connection gave its worker back, not after the keep alive timeout
+            self.assertLess(time.monotonic() - start, 1)
+        finally:
+            for connection in connections:
+                connection.close()
+
+    def test_metrics(self):
+        self._request("GET", "/sports")
+        response, data = self._request("GET", "/metrics")
+        self.assertEqual(response.status, 200)
+        self.assertTrue(response.getheader("Content-Type").startswith("text/plain"))
+        self.assertIn(b"list_sport_summaries", data)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from controller.person_controller import PersonController
+from controller.person_io import open_text
+from model.database import DatabaseEngine
+
+CSV_DATA = """firstname,lastname,email,medical_certificate,street,postal_code,city,country
+John,Doe,john@doe.com,yes,1 rue du stade,53000,Laval,
+Jane,Doe,jane@doe.com,no,,,,
+bad,email,not-an-email,,,,,
+john,doe,john2@doe.com,,,,,
+Paul,Martin,paul@martin.com,1,2 rue du port,abc,Nantes,
+"""
+
+JSONL_DATA = """{"firstname": "anna", "lastname": "smith", "email": "anna@smith.com", "medical_certificate": true}
+{"firstname": "bob",
+{"firstname": "carl", "lastname": "smith", "email": "carl@smith.com",
+ "address": {"street": "3 rue", "postal_code": 44000, "city": "Nantes"}}
+
+{"firstname": "dan", "lastname": "smith", "email": "dan@smith.com"}
+"""
+
+
+class TestImportMembers(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self._database_engine = DatabaseEngine()
+        self._database_engine.create_database()
+        self.person_controller = PersonController(self._database_engine)
+
+    def test_import_csv(self):
+        report = self.person_controller.import_members_file(io.StringIO(CSV_DATA), format="csv", chunk_size=2)
+        self.assertEqual(report["rows"], 5)
+        self.assertEqual(report["imported"], 2)
+        self.assertEqual([error["row"] for error in report["errors"]], [3, 4, 5])
+
+        members = self.person_controller.list_people(person_type='member')
+        self.assertEqual([member['firstname'] for member in members], ["jane", "john"])
+        self.assertTrue(members[1]['medical_certificate'])
+        self.assertEqual(members[1]['address']['city'], "Laval")
+        self.assertNotIn('address', members[0])
+
+    def test_import_jsonl(self):
+        report = self.person_controller.import_members_file(io.StringIO(JSONL_DATA), format="jsonl")
+        self.assertEqual(report["imported"], 1)
+        # row 6 misses the mandatory medical_certificate value
+        self.assertEqual([error["row"] for error in report["errors"]], [2, 3, 4, 6])
+
+    def test_import_existing_member(self):
+        self.person_controller.import_members_file(io.StringIO(CSV_DATA), format="csv")
+        report = self.person_controller.import_members_file(io.StringIO(CSV_DATA), format="csv")
+        self.assertEqual(report["imported"], 0)
+        self.assertEqual(self.person_controller.count_people(person_type='member'), 2)
+
+
+class TestExportPeople(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self._database_engine = DatabaseEngine()
+        self._database_engine.create_database()
+        self.person_controller = PersonController(self._database_engine)
+        self.person_controller.import_members_file(io.StringIO(CSV_DATA), format="csv")
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_export_jsonl_gzip(self):
+        path = os.path.join(self.directory.name, "people.jsonl.gz")
+        self.assertEqual(self.person_controller.export_people(path), 2)
+        with open_text(path) as file:
+            people = sorted((json.loads(line) for line in file), key=lambda person: person['firstname'])
+        self.assertEqual(people, self.person_controller.list_people())
+
+    def test_export_csv_reimport(self):
+        path = os.path.join(self.directory.name, "people.csv")
+        self.person_controller.export_people(path)
+
+        database_engine = DatabaseEngine()
+        database_engine.create_database()
+        person_controller = PersonController(database_engine)
+        with open_text(path) as file:
+            report = person_controller.import_members_file(file, format="csv")
+        self.assertEqual(report["imported"], 2)
+        self.assertEqual(person_controller.search_person("john", "doe")['address']['city'], "Laval")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+import uuid
+
+from controller.person_controller import PersonController
+from model.database import DatabaseEngine
+from model.instrumentation import METRICS
+from model.mapping.member import Member
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self._database_engine = DatabaseEngine()
+        self._database_engine.create_database()
+        with self._database_engine.new_session() as session:
+            member = Member(id=str(uuid.uuid4()), firstname="john", lastname="doe", email="john@doe.com")
+            session.add(member)
+            session.flush()
+            self.member_id = member.id
+        self.person_controller = PersonController(self._database_engine)
+        METRICS.reset()
+
+    def test_controller_call_measures(self):
+        self.person_controller.get_person(self.member_id)
+        self.person_controller.get_person(self.member_id)
+        measures = METRICS.dump()["PersonController.get_person"]
+        self.assertEqual(measures["duration_seconds"]["count"], 2)
+        self.assertEqual(measures["sql_statements"]["sum"], 4)
+        self.assertEqual(measures["rows_loaded"]["sum"], 2)
+        self.assertGreater(measures["session_seconds"]["sum"], 0)
+
+    def test_nested_calls(self):
+        self.person_controller.get_member(self.member_id)
+        measures = METRICS.dump()
+        self.assertEqual(measures["PersonController.get_member"]["sql_statements"]["sum"], 2)
+        self.assertEqual(measures["PersonController.get_person"]["sql_statements"]["sum"], 2)
+
+    def test_prometheus_export(self):
+        self.person_controller.list_people()
+        text = METRICS.to_prometheus()
+        self.assertIn("# TYPE bds_controller_duration_seconds histogram", text)
+        self.assertIn('bds_controller_sql_statements_bucket{method="PersonController.list_people",le="2"} 1', text)
+        self.assertIn('bds_controller_sql_statements_count{method="PersonController.list_people"} 1', text)
+
+
+if __name__ == '__main__':
+    unittest.main()
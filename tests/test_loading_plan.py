@@ -0,0 +1,63 @@
+import unittest
+import uuid
+
+from controller.person_controller import PersonController
+from model.database import DatabaseEngine
+from model.mapping.member import Member
+from model.mapping.sport import Sport, SportAssociation
+from model.mapping.address import Address
+from tests.query_count import QueryCountMixin
+
+
+class TestLoadingPlan(QueryCountMixin, unittest.TestCase):
+    """
+    Controller calls must issue a fixed number of queries whatever the number of people
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._database_engine = DatabaseEngine()
+        cls._database_engine.create_database()
+        with cls._database_engine.new_session() as session:
+            sports = [Sport(id=str(uuid.uuid4()), name=name) for name in ("foot", "tennis", "judo")]
+            for index in range(10):
+                member = Member(id=str(uuid.uuid4()), firstname="john%d" % index, lastname="doe",
+                                email="john%d@doe.com" % index, medical_certificate=True)
+                member.address = Address(id=str(uuid.uuid4()), street="1 rue du stade", city="Laval",
+                                         postal_code=53000)
+                for sport in sports:
+                    association = SportAssociation(level="beginner")
+                    association.sport = sport
+                    member.sports.append(association)
+                session.add(member)
+            session.flush()
+            cls.member_id = member.id
+
+    def setUp(self) -> None:
+        self.person_controller = PersonController(self._database_engine)
+
+    def test_list_people(self):
+        with self.assertQueryCount(self._database_engine, 2):
+            people = self.person_controller.list_people()
+        self.assertEqual(len(people), 10)
+        self.assertEqual(len(people[0]['sports']), 3)
+        self.assertTrue(people[0]['medical_certificate'])
+
+    def test_list_members(self):
+        with self.assertQueryCount(self._database_engine, 2):
+            members = self.person_controller.list_people(person_type='member')
+        self.assertEqual(members[0]['address']['city'], "Laval")
+
+    def test_get_person(self):
+        with self.assertQueryCount(self._database_engine, 2):
+            person = self.person_controller.get_person(self.member_id)
+        self.assertEqual(len(person['sports']), 3)
+
+    def test_search_person(self):
+        with self.assertQueryCount(self._database_engine, 2):
+            person = self.person_controller.search_person("john9", "doe")
+        self.assertEqual(person['id'], self.member_id)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+import uuid
+
+from sqlalchemy import select
+
+from model.database import DatabaseEngine
+from model.mapping.person import Person
+from controller.person_controller import PersonController
+from exceptions import ResourceNotFound
+from model.migrations.versions import MIGRATIONS
+
+LOWER_INDEXES = ["ix_people_firstname_lower", "ix_people_lastname_lower", "ix_people_email_lower",
+                 "ix_sports_name_lower"]
+
+
+class TestMigrations(unittest.TestCase):
+    """
+    Versioned migrations and resumable backfills
+    """
+
+    def setUp(self) -> None:
+        # A database created before the migrations: no version table, no recent index,
+        # names as typed and keys stored as strings
+        self._database_engine = DatabaseEngine()
+        self._database_engine.create_database()
+        self.ids = [str(uuid.uuid4()) for _ in range(11)]
+        self.sport_id = str(uuid.uuid4())
+        with self._database_engine.connect() as connection:
+            for index in LOWER_INDEXES + ["ix_sport_associations_sport_level"]:
+                connection.exec_driver_sql("DROP INDEX %s" % index)
+            names = [("First%d" % index, "Last") for index in range(10)]
+            # Conflicts with First0 Last once lower case
+            names.append(("first0", "last"))
+            for person_id, (firstname, lastname) in zip(self.ids, names):
+                connection.exec_driver_sql("INSERT INTO people(id, firstname, lastname, email, person_type) "
+                                           "VALUES (?, ?, ?, 'e@bds.com', 'member')", (person_id, firstname, lastname))
+                connection.exec_driver_sql("INSERT INTO members(id, medical_certificate) VALUES (?, 1)", (person_id,))
+            connection.exec_driver_sql("INSERT INTO sports(id, name) VALUES (?, 'foot')", (self.sport_id,))
+            connection.exec_driver_sql("INSERT INTO sport_associations(person_id, sport_id, level) "
+                                       "VALUES (?, ?, 'high')", (self.ids[3], self.sport_id))
+            connection.commit()
+
+    def _names(self):
+        people = Person.__table__
+        with self._database_engine.connect() as connection:
+            return dict(connection.execute(select(people.c.id, people.c.firstname)).all())
+
+    def _indexes(self):
+        with self._database_engine.connect() as connection:
+            return [row[0] for row in connection.exec_driver_sql("SELECT name FROM sqlite_master WHERE type='index'")]
+
+    def test_upgrade(self):
+        self.assertEqual(self._database_engine.schema_version(), 0)
+        progress = []
+        version = self._database_engine.migrate(chunk_size=4, progress=lambda *args: progress.append(args))
+        self.assertEqual(version, MIGRATIONS[-1].version)
+        indexes = self._indexes()
+        for index in LOWER_INDEXES + ["ix_sport_associations_sport_level"]:
+            self.assertIn(index, indexes)
+        names = self._names()
+        self.assertEqual(names[self.ids[3]], "first3")
+        self.assertEqual(names[self.ids[0]], "First0")
+        progress = [args for args in progress if args[0] == "lower_case_names"]
+        self.assertEqual([(last_rowid, max_rowid) for _, last_rowid, max_rowid, _ in progress],
+                         [(4, 11), (8, 11), (11, 11)])
+        self.assertEqual(progress[-1][3], 9)
+        # Nothing left to do
+        self.assertEqual(self._database_engine.migrate(progress=lambda *args: self.fail()), version)
+
+    def test_schema_only(self):
+        self.assertEqual(self._database_engine.migrate(run_backfills=False), 2)
+        self.assertEqual(self._names()[self.ids[3]], "First3")
+
+    def test_resume(self):
+        def interrupt(name, last_rowid, max_rowid, updated):
+            raise KeyboardInterrupt()
+
+        with self.assertRaises(KeyboardInterrupt):
+            self._database_engine.migrate(chunk_size=4, progress=interrupt)
+        self.assertEqual(self._database_engine.schema_version(), 2)
+        self.assertEqual(self._names()[self.ids[5]], "First5")
+
+        progress = []
+        self._database_engine.migrate(chunk_size=4, progress=lambda *args: progress.append(args))
+        self.assertEqual([last_rowid for name, last_rowid, _, _ in progress if name == "lower_case_names"], [8, 11])
+        self.assertEqual(self._names()[self.ids[5]], "first5")
+        self.assertEqual(self._database_engine.schema_version(), MIGRATIONS[-1].version)
+
+    def test_binary_keys(self):
+        person_controller = PersonController(self._database_engine)
+        with self.assertRaises(ResourceNotFound):
+            # Keys stored as strings are not found by the binary key lookups
+            person_controller.get_person(self.ids[3])
+        self._database_engine.migrate()
+        with self._database_engine.connect() as connection:
+            types = connection.exec_driver_sql("SELECT DISTINCT typeof(id), length(id) FROM people").all()
+            self.assertEqual(types, [("blob", 16)])
+        person = person_controller.get_person(self.ids[3])
+        self.assertEqual(person["id"], self.ids[3])
+        self.assertEqual(person["sports"], [{"id": self.sport_id, "name": "foot", "level": "high"}])
+        self.assertTrue(person["medical_certificate"])
+
+    def test_binary_keys_coaches(self):
+        # Table of older databases, not mapped anymore
+        with self._database_engine.connect() as connection:
+            connection.exec_driver_sql("CREATE TABLE coaches (id VARCHAR(36) NOT NULL, contract VARCHAR(10) NOT NULL, "
+                                       "degree VARCHAR(150) NOT NULL, PRIMARY KEY (id))")
+            connection.exec_driver_sql("INSERT INTO coaches(id, contract, degree) VALUES (?, 'CDI', 'BPJEPS')",
+                                       (self.ids[0],))
+            connection.commit()
+        self._database_engine.migrate()
+        with self._database_engine.connect() as connection:
+            coach_id = connection.exec_driver_sql("SELECT coaches.id FROM coaches JOIN people "
+                                                  "ON people.id = coaches.id").scalar()
+        self.assertEqual(coach_id, uuid.UUID(self.ids[0]).bytes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+import uuid
+
+from controller.person_controller import PersonController
+from controller.sport_controller import SportController
+from model.database import DatabaseEngine
+from model.mapping.member import Member
+from model.mapping.sport import Sport
+from model.read_models import PersonSummary, SportSummary
+from model.instrumentation import METRICS
+
+
+class TestPagination(unittest.TestCase):
+    """
+    Keyset pagination and streaming of people and sports
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._database_engine = DatabaseEngine()
+        cls._database_engine.create_database()
+        with cls._database_engine.new_session() as session:
+            for firstname in ("anna", "bob", "carl"):
+                for lastname in ("dupont", "martin", "smith"):
+                    session.add(Member(id=str(uuid.uuid4()), firstname=firstname, lastname=lastname,
+                                       email="%s@%s.com" % (firstname, lastname)))
+            for name in ("foot", "golf", "judo", "rugby", "tennis"):
+                session.add(Sport(id=str(uuid.uuid4()), name=name))
+
+    def setUp(self) -> None:
+        self.person_controller = PersonController(self._database_engine)
+        self.sport_controller = SportController(self._database_engine)
+
+    def test_people_pages(self):
+        pages = []
+        after = None
+        while True:
+            page = self.person_controller.list_people_page(after=after, limit=4)
+            if len(page) == 0:
+                break
+            pages.append(page)
+            last = page[-1]
+            after = (last['firstname'], last['lastname'], last['id'])
+        self.assertEqual([len(page) for page in pages], [4, 4, 1])
+        people = [person for page in pages for person in page]
+        self.assertEqual(people, self.person_controller.list_people())
+
+    def test_people_page_offset(self):
+        self.assertEqual(self.person_controller.count_people(person_type='member'), 9)
+        page = self.person_controller.list_people_page(offset=3, limit=2)
+        self.assertEqual([person['firstname'] for person in page], ["bob", "bob"])
+        self.assertEqual(page[0]['lastname'], "dupont")
+
+    def test_iter_people(self):
+        batches = list(self.person_controller.iter_people(person_type='member', batch_size=4))
+        self.assertEqual([len(batch) for batch in batches], [4, 4, 1])
+        self.assertEqual(batches[0][0]['firstname'], "anna")
+
+    def test_sports_pages(self):
+        page = self.sport_controller.list_sports_page(limit=2)
+        self.assertEqual([sport['name'] for sport in page], ["foot", "golf"])
+        page = self.sport_controller.list_sports_page(after=(page[-1]['name'], page[-1]['id']), limit=2)
+        self.assertEqual([sport['name'] for sport in page], ["judo", "rugby"])
+
+    def test_iter_sports(self):
+        batches = list(self.sport_controller.iter_sports(batch_size=2))
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 1])
+
+    def test_people_summaries(self):
+        METRICS.reset()
+        summaries, after = [], None
+        while True:
+            page = self.person_controller.list_people_summaries(person_type='member', after=after, limit=4)
+            if len(page) == 0:
+                break
+            summaries.extend(page)
+            after = (page[-1].firstname, page[-1].lastname, page[-1].id)
+        people = self.person_controller.list_people()
+        self.assertEqual(summaries, [PersonSummary(person['id'], person['firstname'], person['lastname'], 'member')
+                                     for person in people])
+        # No ORM instance built
+        self.assertEqual(METRICS.dump()["PersonController.list_people_summaries"]["rows_loaded"]["sum"], 0)
+
+    def test_people_summaries_offset(self):
+        page = self.person_controller.list_people_summaries(offset=3, limit=2)
+        self.assertEqual([(person.firstname, person.lastname) for person in page],
+                         [("bob", "dupont"), ("bob", "martin")])
+
+    def test_sport_summaries(self):
+        summaries = self.sport_controller.list_sport_summaries()
+        self.assertTrue(all(isinstance(sport, SportSummary) for sport in summaries))
+        self.assertEqual([sport.name for sport in summaries], ["foot", "golf", "judo", "rugby", "tennis"])
+        self.assertEqual([sport.id for sport in summaries], [sport['id'] for sport in self.sport_controller.list_sports()])
+
+
+if __name__ == '__main__':
+    unittest.main()
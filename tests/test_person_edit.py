@@ -0,0 +1,87 @@
+import unittest
+
+from controller.person_controller import PersonController
+from controller.sport_controller import SportController
+from exceptions import ResourceNotFound, InvalidData
+from model.database import DatabaseEngine
+from tests.query_count import QueryCountMixin
+
+
+class TestPersonEdit(QueryCountMixin, unittest.TestCase):
+    """
+    Several changes of a person applied in one session
+    """
+
+    def setUp(self) -> None:
+        self._database_engine = DatabaseEngine()
+        self._database_engine.create_database()
+        self.person_controller = PersonController(self._database_engine)
+        self.sport_controller = SportController(self._database_engine)
+        self.foot = self.sport_controller.create_sport({"name": "foot", "description": "ball"})["id"]
+        self.judo = self.sport_controller.create_sport({"name": "judo", "description": "mat"})["id"]
+        self.member = self.person_controller.create_member({
+            "firstname": "john", "lastname": "doe", "email": "john@doe.com", "medical_certificate": False,
+            "address": {"street": "1 rue du stade", "postal_code": 53000, "city": "Laval"}})
+        self.person_controller.add_sport_person(self.member["id"], self.foot, "beginner")
+
+    def test_commit(self):
+        with self.assertQueryCount(self._database_engine, 8) as counter:
+            with self.person_controller.edit_person(self.member["id"], 'member') as edit:
+                edit.update({"email": "new@doe.com", "address": {"city": "Paris"}})
+                edit.update({"medical_certificate": True})
+                edit.add_sport(self.judo, "high")
+                edit.remove_sport(self.foot)
+        # sport check, sports delete and upsert, person and sports loading, one update per table
+        self.assertEqual(len([statement for statement in counter.statements if statement.startswith("UPDATE")]), 3)
+        person = edit.person
+        self.assertEqual(person["email"], "new@doe.com")
+        self.assertEqual(person["address"]["city"], "Paris")
+        self.assertTrue(person["medical_certificate"])
+        self.assertEqual(person["sports"], [{"id": self.judo, "name": "judo", "level": "high"}])
+        self.assertEqual(self.person_controller.get_person(self.member["id"]), person)
+
+    def test_all_or_nothing(self):
+        edit = self.person_controller.edit_person(self.member["id"], 'member')
+        edit.update({"email": "new@doe.com"}).add_sport(self.judo, "high").remove_sport("unknown")
+        with self.assertRaises(ResourceNotFound):
+            edit.commit()
+        person = self.person_controller.get_person(self.member["id"])
+        self.assertEqual(person["email"], "john@doe.com")
+        self.assertEqual([sport["id"] for sport in person["sports"]], [self.foot])
+
+        with self.assertRaises(ResourceNotFound):
+            self.person_controller.edit_person("unknown").add_sport(self.judo, "high").commit()
+        # Rolled back: no association left for the unknown person
+        self.assertEqual(self.sport_controller.get_roster(self.judo)["total"], 0)
+
+    def test_remove_added_sport(self):
+        with self.person_controller.edit_person(self.member["id"], 'member') as edit:
+            edit.add_sport(self.judo, "high")
+            edit.remove_sport(self.judo)
+        self.assertEqual([sport["id"] for sport in edit.person["sports"]], [self.foot])
+
+        # Level change of a practiced sport, then removed
+        with self.person_controller.edit_person(self.member["id"], 'member') as edit:
+            edit.add_sport(self.foot, "high").remove_sport(self.foot)
+        self.assertEqual(edit.person["sports"], [])
+        self.assertEqual(self.person_controller.get_person(self.member["id"])["sports"], [])
+
+    def test_invalid_data(self):
+        edit = self.person_controller.edit_person(self.member["id"], 'member')
+        with self.assertRaises(InvalidData):
+            edit.update({"email": "not an email"})
+        with self.assertRaises(InvalidData):
+            edit.add_sport(self.judo, None)
+        self.assertFalse(edit.has_changes())
+
+    def test_discard_on_error(self):
+        with self.assertRaises(KeyError):
+            with self.person_controller.edit_person(self.member["id"]) as edit:
+                edit.update({"email": "new@doe.com"})
+                raise KeyError()
+        self.assertIsNone(edit.person)
+        self.assertEqual(self.person_controller.get_person(self.member["id"])["email"], "john@doe.com")
+
+
+if __name__ == '__main__':
+    unittest.main()
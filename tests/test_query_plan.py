@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+
+import cli
+from model.database import DatabaseEngine
+from model.query_plan import check_plans, full_scans
+
+
+class TestQueryPlan(unittest.TestCase):
+    """
+    Every DAO query is served by an index
+    """
+
+    def setUp(self) -> None:
+        self._database_engine = DatabaseEngine()
+        self._database_engine.create_database()
+        self._database_engine.create_search_index()
+
+    def test_no_full_scan(self):
+        results = check_plans(self._database_engine)
+        self.assertGreater(len(results), 20)
+        problems = ["%s: %s" % (name, " | ".join(details)) for name, _, details, scanned in results if scanned]
+        self.assertEqual(problems, [])
+
+    def test_roster_needs_sport_index(self):
+        with self._database_engine.connect() as connection:
+            connection.exec_driver_sql("DROP INDEX ix_sport_associations_sport_level")
+            connection.commit()
+        scanned = [table for name, _, _, scanned in check_plans(self._database_engine) if name == "Sport.people"
+                   for table in scanned]
+        self.assertEqual(scanned, ["sport_associations"])
+
+    def test_cli_database(self):
+        with tempfile.TemporaryDirectory() as directory:
+            url = "sqlite:///%s" % os.path.join(directory, "bds.db")
+            database_engine = DatabaseEngine(url=url)
+            database_engine.create_database()
+            self.assertEqual(cli.main(["--database", url, "check-plans"]), 0)
+            with database_engine.connect() as connection:
+                connection.exec_driver_sql("DROP INDEX ix_sport_associations_sport_level")
+                connection.commit()
+            # Indexes of the given database, checked on a copy
+            self.assertEqual(cli.main(["--database", url, "check-plans"]), 1)
+            with database_engine.connect() as connection:
+                self.assertEqual(connection.exec_driver_sql("SELECT count(*) FROM people").scalar(), 0)
+            database_engine.dispose()
+
+    def test_full_scans(self):
+        plan = [(2, 0, 0, "SCAN people"),
+                (3, 0, 0, "SCAN sports USING INDEX sqlite_autoindex_sports_2"),
+                (4, 0, 0, "SCAN people_fts VIRTUAL TABLE INDEX 32:M4"),
+                (5, 0, 0, "SEARCH members USING INDEX sqlite_autoindex_members_1 (id=?)")]
+        self.assertEqual(full_scans(plan), ["people"])
+
+
+if __name__ == '__main__':
+    unittest.main()
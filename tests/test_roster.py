@@ -0,0 +1,72 @@
+import unittest
+import uuid
+
+from controller.person_controller import PersonController
+from controller.sport_controller import SportController
+from exceptions import ResourceNotFound
+from model.database import DatabaseEngine
+from model.mapping.member import Member
+from model.mapping.sport import Sport
+from tests.query_count import QueryCountMixin
+
+
+class TestRoster(QueryCountMixin, unittest.TestCase):
+    """
+    Sport rosters and statistics computed by the database
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._database_engine = DatabaseEngine()
+        cls._database_engine.create_database()
+        cls.person_ids = [str(uuid.uuid4()) for _ in range(7)]
+        cls.foot_id, cls.golf_id, cls.judo_id = [str(uuid.uuid4()) for _ in range(3)]
+        with cls._database_engine.new_session() as session:
+            for index, person_id in enumerate(cls.person_ids):
+                session.add(Member(id=person_id, firstname="player%d" % index, lastname="team",
+                                   email="player%d@team.com" % index))
+            session.add(Sport(id=cls.foot_id, name="foot"))
+            session.add(Sport(id=cls.golf_id, name="golf"))
+            session.add(Sport(id=cls.judo_id, name="judo"))
+        person_controller = PersonController(cls._database_engine)
+        person_controller.assign_sport(cls.foot_id, [(person_id, "beginner") for person_id in cls.person_ids[:5]])
+        person_controller.assign_sport(cls.foot_id, [(person_id, "high") for person_id in cls.person_ids[5:]])
+        person_controller.assign_sport(cls.golf_id, [(cls.person_ids[0], "professional")])
+
+    def setUp(self) -> None:
+        self.sport_controller = SportController(self._database_engine)
+
+    def test_roster_pages(self):
+        with self.assertQueryCount(self._database_engine, 2):
+            roster = self.sport_controller.get_roster(self.foot_id, page=1, page_size=3)
+        self.assertEqual(roster["total"], 7)
+        self.assertEqual([person["firstname"] for person in roster["items"]], ["player0", "player1", "player2"])
+        roster = self.sport_controller.get_roster(self.foot_id, page=3, page_size=3)
+        self.assertEqual([person["firstname"] for person in roster["items"]], ["player6"])
+        self.assertEqual(roster["items"][0]["level"], "high")
+
+    def test_roster_level(self):
+        roster = self.sport_controller.get_roster(self.foot_id, level="high")
+        self.assertEqual(roster["total"], 2)
+        self.assertEqual(set(person["id"] for person in roster["items"]), set(self.person_ids[5:]))
+
+    def test_empty_roster(self):
+        roster = self.sport_controller.get_roster(self.judo_id)
+        self.assertEqual((roster["total"], roster["items"]), (0, []))
+        with self.assertRaises(ResourceNotFound):
+            self.sport_controller.get_roster("unknown")
+
+    def test_sport_stats(self):
+        with self.assertQueryCount(self._database_engine, 1):
+            stats = self.sport_controller.get_sport_stats()
+        self.assertEqual(stats["total"], 8)
+        self.assertEqual(stats["levels"], {"beginner": 5, "high": 2, "professional": 1})
+        self.assertEqual(stats["sports"], [
+            {"id": self.foot_id, "name": "foot", "total": 7, "levels": {"beginner": 5, "high": 2}},
+            {"id": self.golf_id, "name": "golf", "total": 1, "levels": {"professional": 1}},
+            {"id": self.judo_id, "name": "judo", "total": 0, "levels": {}},
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+import uuid
+
+from controller.person_controller import PersonController
+from controller.sport_controller import SportController
+from model.database import DatabaseEngine
+from model.mapping.member import Member
+from model.mapping.sport import Sport
+from model.mapping.address import Address
+from exceptions import Error
+
+
+class TestPrefixSearch(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._database_engine = DatabaseEngine()
+        cls._database_engine.create_database()
+        with cls._database_engine.new_session() as session:
+            for firstname, lastname, email in (("john", "smith", "john@smith.com"),
+                                               ("johnny", "walker", "jw@whisky.com"),
+                                               ("paul", "johnson", "paul@johnson.com"),
+                                               ("anna", "john", "Anna.John@Mail.com")):
+                session.add(Member(id=str(uuid.uuid4()), firstname=firstname, lastname=lastname, email=email))
+            # Stored with an upper case non ASCII letter, left as is by lower() of SQLite
+            session.add(Member(id=str(uuid.uuid4()), firstname="Émile", lastname="zola", email="emile@zola.fr"))
+            for name in ("Football", "Foot", "Fencing", "Judo", "Équitation"):
+                session.add(Sport(id=str(uuid.uuid4()), name=name))
+
+    def setUp(self) -> None:
+        self.person_controller = PersonController(self._database_engine)
+        self.sport_controller = SportController(self._database_engine)
+
+    def test_search_people_prefix(self):
+        people = self.person_controller.search_people("JOHN")
+        names = [(person['firstname'], person['lastname']) for person in people]
+        # exact names first, then lastname and firstname prefixes
+        self.assertEqual(names, [("anna", "john"), ("john", "smith"), ("paul", "johnson"), ("johnny", "walker")])
+
+    def test_search_people_email(self):
+        people = self.person_controller.search_people("anna.j")
+        self.assertEqual([person['lastname'] for person in people], ["john"])
+
+    def test_search_people_full_name(self):
+        people = self.person_controller.search_people("smi jo")
+        self.assertEqual([person['firstname'] for person in people], ["john"])
+
+    def test_search_non_ascii(self):
+        for text in ("émi", "ÉMILE", "zola ém"):
+            self.assertEqual([person['lastname'] for person in self.person_controller.search_people(text)], ["zola"])
+        for text in ("équi", "ÉQUITATION"):
+            self.assertEqual([sport['name'] for sport in self.sport_controller.search_sports(text)], ["Équitation"])
+
+    def test_search_people_limit(self):
+        self.assertEqual(len(self.person_controller.search_people("j", limit=2)), 2)
+        self.assertEqual(self.person_controller.search_people("  "), [])
+
+    def test_search_sports(self):
+        sports = self.sport_controller.search_sports("foo")
+        self.assertEqual([sport['name'] for sport in sports], ["Foot", "Football"])
+        sports = self.sport_controller.search_sports("football")
+        self.assertEqual([sport['name'] for sport in sports], ["Football"])
+
+
+class TestFullTextSearch(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self._database_engine = DatabaseEngine()
+        self._database_engine.create_database()
+        self.person_controller = PersonController(self._database_engine)
+        self.sport_controller = SportController(self._database_engine)
+        with self._database_engine.new_session() as session:
+            # Rows created before the index must be indexed too
+            john = Member(id=str(uuid.uuid4()), firstname="john", lastname="smith", email="john@smith.com")
+            john.address = Address(id=str(uuid.uuid4()), street="1 rue", postal_code=53000, city="Laval")
+            session.add(john)
+            session.flush()
+            self.john_id = john.id
+        self.assertTrue(self._database_engine.create_search_index())
+        with self._database_engine.new_session() as session:
+            session.add(Member(id=str(uuid.uuid4()), firstname="jane", lastname="doe", email="jane@doe.com"))
+            session.add(Sport(id=str(uuid.uuid4()), name="rugby", description="Ballon ovale, mêlée et essais"))
+            session.add(Sport(id=str(uuid.uuid4()), name="foot", description="Ballon rond"))
+
+    def test_search_people(self):
+        self.assertEqual([person['firstname'] for person in self.person_controller.search("lav")], ["john"])
+        self.assertEqual([person['firstname'] for person in self.person_controller.search("doe")], ["jane"])
+        self.assertEqual(self.person_controller.search("john doe"), [])
+
+    def test_search_sports(self):
+        names = sorted(sport['name'] for sport in self.sport_controller.search("ballon"))
+        self.assertEqual(names, ["foot", "rugby"])
+        self.assertEqual([sport['name'] for sport in self.sport_controller.search("melee")], ["rugby"])
+
+    def test_index_follows_updates(self):
+        self.person_controller.update_member(self.john_id, {"address": {"city": "Nantes"}})
+        self.assertEqual(self.person_controller.search("laval"), [])
+        self.assertEqual(len(self.person_controller.search("nantes")), 1)
+        self.person_controller.delete_person(self.john_id)
+        self.assertEqual(self.person_controller.search("nantes"), [])
+
+    def test_rebuild(self):
+        self._database_engine.rebuild_search_index()
+        self.assertEqual(len(self.person_controller.search("smith")), 1)
+
+    def test_search_disabled(self):
+        database_engine = DatabaseEngine()
+        database_engine.create_database()
+        with self.assertRaises(Error):
+            PersonController(database_engine).search("john")
+
+
+if __name__ == '__main__':
+    unittest.main()
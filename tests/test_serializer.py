@@ -0,0 +1,66 @@
+import json
+import unittest
+import uuid
+
+from model.database import DatabaseEngine
+from model.dao.person_dao import PersonDAO
+from model.dao.member_dao import MemberDAO
+from model.dao.sport_dao import SportDAO
+from model.dao.loading_plan import FULL
+from model.mapping.person import Person
+from model.mapping.member import Member
+from model.mapping.sport import Sport, SportAssociation
+from model.mapping.address import Address
+from model.serializer import PEOPLE, SPORTS, ColumnPlan
+
+
+class TestSerializer(unittest.TestCase):
+    """
+    Rendering from result rows must match the to_dict() methods
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._database_engine = DatabaseEngine()
+        cls._database_engine.create_database()
+        with cls._database_engine.new_session() as session:
+            sports = [Sport(id=str(uuid.uuid4()), name=name, description="about %s" % name)
+                      for name in ("foot", "tennis", "judo")]
+            for index in range(6):
+                member = Member(id=str(uuid.uuid4()), firstname="john%d" % index, lastname="doe",
+                                email="john%d@doe.com" % index, medical_certificate=index % 2 == 0)
+                if index != 3:
+                    member.address = Address(id=str(uuid.uuid4()), street="1 rue du stade", city="Laval",
+                                             postal_code=53000)
+                for sport in sports[:index % 4]:
+                    association = SportAssociation(level="beginner")
+                    association.sport = sport
+                    member.sports.append(association)
+                session.add(member)
+            # Not a member: no certificate
+            session.add(Person(id=str(uuid.uuid4()), firstname="coach", lastname="doe", email="coach@doe.com",
+                               person_type="person"))
+
+    def test_people(self):
+        with self._database_engine.new_session() as session:
+            for dao in (PersonDAO(session), MemberDAO(session)):
+                expected = [person.to_dict() for person in dao.get_all(plan=FULL)]
+                rows, sport_rows = dao.get_all_rows(PEOPLE.columns, PEOPLE.sport_columns)
+                self.assertEqual(PEOPLE.render(rows, sport_rows), expected)
+                self.assertEqual(json.loads(PEOPLE.render_json(rows, sport_rows)), expected)
+        self.assertEqual(len(expected), 6)
+
+    def test_sports(self):
+        with self._database_engine.new_session() as session:
+            dao = SportDAO(session)
+            expected = [sport.to_dict() for sport in dao.get_all()]
+            self.assertEqual(SPORTS.render(dao.get_all_rows(SPORTS.columns)), expected)
+
+    def test_column_plan(self):
+        plan = ColumnPlan({"a": None, "b": None})
+        self.assertEqual(plan.compile(1)(("x", 1, 2)), {"a": 1, "b": 2})
+        self.assertEqual(ColumnPlan({"a": None}).compile()((1,)), {"a": 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
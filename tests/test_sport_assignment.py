@@ -0,0 +1,129 @@
+import unittest
+import uuid
+
+from controller.person_controller import PersonController
+from exceptions import ResourceNotFound, InvalidData
+from model.database import DatabaseEngine
+from model.mapping.member import Member
+from model.mapping.sport import Sport
+from model.dao.person_dao import PersonDAO
+from model.dao.sport_dao import SportDAO
+from model.dao.loading_plan import FULL
+from tests.query_count import QueryCountMixin
+
+
+class TestSportAssignment(QueryCountMixin, unittest.TestCase):
+    """
+    Set based sport assignment
+    """
+
+    def setUp(self) -> None:
+        self._database_engine = DatabaseEngine()
+        self._database_engine.create_database()
+        self.person_ids = [str(uuid.uuid4()) for _ in range(40)]
+        self.sport_ids = [str(uuid.uuid4()) for _ in range(3)]
+        with self._database_engine.new_session() as session:
+            for index, person_id in enumerate(self.person_ids):
+                session.add(Member(id=person_id, firstname="player%d" % index, lastname="team",
+                                   email="player%d@team.com" % index))
+            for index, sport_id in enumerate(self.sport_ids):
+                session.add(Sport(id=sport_id, name="sport%d" % index))
+        self.person_controller = PersonController(self._database_engine)
+
+    def _levels(self, person_id):
+        return {sport['id']: sport['level'] for sport in self.person_controller.get_person(person_id)['sports']}
+
+    def test_assign_sport(self):
+        assignments = [(person_id, "beginner") for person_id in self.person_ids]
+        # sport check, people check, one executemany upsert
+        with self.assertQueryCount(self._database_engine, 3):
+            result = self.person_controller.assign_sport(self.sport_ids[0], assignments)
+        self.assertEqual(result, {"sport_id": self.sport_ids[0], "assigned": 40})
+        self.assertEqual(self._levels(self.person_ids[5]), {self.sport_ids[0]: "beginner"})
+
+    def test_assign_sport_generator(self):
+        result = self.person_controller.assign_sport(self.sport_ids[1], ((person_id, "high")
+                                                                         for person_id in self.person_ids[:3]))
+        self.assertEqual(result["assigned"], 3)
+        self.assertEqual(self._levels(self.person_ids[2]), {self.sport_ids[1]: "high"})
+
+    def test_assign_sport_updates_level(self):
+        self.person_controller.assign_sport(self.sport_ids[0], [(self.person_ids[0], "beginner")])
+        self.person_controller.assign_sport(self.sport_ids[0], [(self.person_ids[0], "high")])
+        self.assertEqual(self._levels(self.person_ids[0]), {self.sport_ids[0]: "high"})
+
+    def test_assign_sport_unknown(self):
+        with self.assertRaises(ResourceNotFound):
+            self.person_controller.assign_sport("unknown", [(self.person_ids[0], "high")])
+        with self.assertRaises(ResourceNotFound):
+            self.person_controller.assign_sport(self.sport_ids[0], [(self.person_ids[0], "high"), ("unknown", "high")])
+        # Nothing written
+        self.assertEqual(self._levels(self.person_ids[0]), {})
+
+    def test_assign_sport_invalid_level(self):
+        with self.assertRaises(InvalidData):
+            self.person_controller.assign_sport(self.sport_ids[0], [(self.person_ids[0], None)])
+
+    def test_set_sports(self):
+        person_id = self.person_ids[0]
+        self.person_controller.set_sports(person_id, {self.sport_ids[0]: "beginner", self.sport_ids[1]: "high"})
+        result = self.person_controller.set_sports(person_id, {self.sport_ids[1]: "professional",
+                                                               self.sport_ids[2]: "beginner"})
+        self.assertEqual(result, {"person_id": person_id, "assigned": 2, "removed": 1})
+        self.assertEqual(self._levels(person_id), {self.sport_ids[1]: "professional", self.sport_ids[2]: "beginner"})
+
+        self.assertEqual(self.person_controller.set_sports(person_id, {})["removed"], 2)
+        self.assertEqual(self._levels(person_id), {})
+
+    def test_set_sports_unknown(self):
+        with self.assertRaises(ResourceNotFound):
+            self.person_controller.set_sports("unknown", {self.sport_ids[0]: "high"})
+        with self.assertRaises(ResourceNotFound):
+            self.person_controller.set_sports(self.person_ids[0], {"unknown": "high"})
+
+    def test_person_delete_sport(self):
+        person_id = self.person_ids[0]
+        self.person_controller.set_sports(person_id, {self.sport_ids[0]: "high", self.sport_ids[1]: "beginner"})
+        with self._database_engine.new_session() as session:
+            person = PersonDAO(session).get(person_id, plan=FULL)
+            sport = SportDAO(session).get(self.sport_ids[0])
+            person.delete_sport(sport, session)
+            # The sports collection is reloaded
+            self.assertEqual([association.sport_id for association in person.sports], [self.sport_ids[1]])
+            with self.assertRaises(ResourceNotFound):
+                person.delete_sport(sport, session)
+        self.assertEqual(self._levels(person_id), {self.sport_ids[1]: "beginner"})
+
+    def test_delete_sport_person(self):
+        person_id = self.person_ids[0]
+        self.person_controller.set_sports(person_id, {sport_id: "high" for sport_id in self.sport_ids})
+        # keyed delete, then person and sports loaded with the full plan
+        with self.assertQueryCount(self._database_engine, 3):
+            person = self.person_controller.delete_sport_person(person_id, self.sport_ids[0])
+        self.assertEqual(sorted(sport['id'] for sport in person['sports']), sorted(self.sport_ids[1:]))
+        with self.assertRaises(ResourceNotFound):
+            self.person_controller.delete_sport_person(person_id, self.sport_ids[0])
+
+    def test_remove_sports(self):
+        person_id = self.person_ids[0]
+        self.person_controller.set_sports(person_id, {sport_id: "high" for sport_id in self.sport_ids})
+        result = self.person_controller.remove_sports(person_id, self.sport_ids[:2])
+        self.assertEqual(result, {"person_id": person_id, "removed": 2})
+        self.assertEqual(self._levels(person_id), {self.sport_ids[2]: "high"})
+        # All or nothing
+        with self.assertRaises(ResourceNotFound):
+            self.person_controller.remove_sports(person_id, self.sport_ids)
+        self.assertEqual(self._levels(person_id), {self.sport_ids[2]: "high"})
+
+    def test_unassign_sport(self):
+        sport_id = self.sport_ids[0]
+        self.person_controller.assign_sport(sport_id, [(person_id, "beginner") for person_id in self.person_ids])
+        with self.assertQueryCount(self._database_engine, 1):
+            result = self.person_controller.unassign_sport(sport_id, self.person_ids[:30])
+        self.assertEqual(result, {"sport_id": sport_id, "removed": 30})
+        self.assertEqual(self._levels(self.person_ids[0]), {})
+        self.assertEqual(self._levels(self.person_ids[35]), {sport_id: "beginner"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+
+from controller.person_controller import PersonController
+from controller.sport_controller import SportController
+from exceptions import ResourceNotFound
+from model.database import DatabaseEngine
+from model.mapping.person import Person
+from tests.query_count import QueryCountMixin
+
+
+class TestUpdate(QueryCountMixin, unittest.TestCase):
+    """
+    Updates write the changed columns only, with one UPDATE per changed table
+    """
+
+    def setUp(self) -> None:
+        self._database_engine = DatabaseEngine()
+        self._database_engine.create_database()
+        self.person_controller = PersonController(self._database_engine)
+        self.sport_controller = SportController(self._database_engine)
+        self.member = self.person_controller.create_member({
+            "firstname": "john", "lastname": "doe", "email": "john@doe.com", "medical_certificate": False,
+            "address": {"street": "1 rue du stade", "postal_code": 53000, "city": "Laval"}})
+        with self._database_engine.new_session() as session:
+            # Not a member, without address
+            person = Person(firstname="jane", lastname="doe", email="jane@doe.com")
+            session.add(person)
+            session.flush()
+            self.person = {"id": person.id}
+        self.sport = self.sport_controller.create_sport({"name": "foot", "description": "ball"})
+
+    def _updates(self, counter):
+        return [statement for statement in counter.statements if statement.startswith("UPDATE")]
+
+    def test_update_member(self):
+        # person and sports loading, then a single UPDATE
+        with self.assertQueryCount(self._database_engine, 3) as counter:
+            member = self.person_controller.update_member(self.member["id"], {"email": "new@doe.com",
+                                                                             "firstname": "john"})
+        self.assertEqual(self._updates(counter), ["UPDATE people SET email=? WHERE people.id = ?"])
+        self.assertEqual(member["email"], "new@doe.com")
+
+        with self.assertQueryCount(self._database_engine, 5) as counter:
+            member = self.person_controller.update_member(self.member["id"], {"medical_certificate": True,
+                                                                             "lastname": "Smith",
+                                                                             "address": {"city": "Paris"}})
+        self.assertEqual(len(self._updates(counter)), 3)
+        self.assertEqual((member["lastname"], member["address"]["city"]), ("smith", "Paris"))
+        self.assertTrue(member["medical_certificate"])
+
+        # Nothing changed, nothing written
+        with self.assertQueryCount(self._database_engine, 2):
+            self.person_controller.update_member(self.member["id"], {"email": "new@doe.com"})
+
+    def test_direct_update(self):
+        with self.assertQueryCount(self._database_engine, 1):
+            self.assertIsNone(self.person_controller.update_member(self.member["id"], {"email": "new@doe.com"},
+                                                                   direct=True))
+        with self.assertQueryCount(self._database_engine, 3):
+            self.person_controller.update_member(self.member["id"], {"firstname": "Jack", "medical_certificate": True,
+                                                                    "address": {"city": "Paris"}}, direct=True)
+        member = self.person_controller.get_person(self.member["id"])
+        self.assertEqual((member["firstname"], member["email"]), ("jack", "new@doe.com"))
+        self.assertEqual(member["address"]["city"], "Paris")
+        self.assertTrue(member["medical_certificate"])
+
+        # No address yet: created
+        address = {"street": "2 rue du port", "postal_code": 44000, "city": "Nantes"}
+        self.person_controller.update_person(self.person["id"], {"address": address}, direct=True)
+        self.assertEqual(self.person_controller.get_person(self.person["id"])["address"],
+                         dict(address, country="FRANCE"))
+
+    def test_direct_update_empty_address(self):
+        with self.assertQueryCount(self._database_engine, 1) as counter:
+            self.person_controller.update_member(self.member["id"], {"address": {}}, direct=True)
+        self.assertEqual(self._updates(counter), [])
+        self.person_controller.update_person(self.person["id"], {"address": {}}, direct=True)
+        self.assertNotIn("address", self.person_controller.get_person(self.person["id"]))
+        with self.assertRaises(ResourceNotFound):
+            self.person_controller.update_member("unknown", {"address": {}}, direct=True)
+
+    def test_direct_update_not_found(self):
+        with self.assertRaises(ResourceNotFound):
+            self.person_controller.update_member("unknown", {"email": "new@doe.com"}, direct=True)
+        with self.assertRaises(ResourceNotFound):
+            # Not a member
+            self.person_controller.update_member(self.person["id"], {"email": "new@doe.com"}, direct=True)
+        with self.assertRaises(ResourceNotFound):
+            self.person_controller.update_member("unknown", {"address": {"city": "Paris"}}, direct=True)
+        with self.assertRaises(ResourceNotFound):
+            self.sport_controller.update_sport("unknown", {"description": "none"}, direct=True)
+        self.assertEqual(self.person_controller.get_person(self.person["id"])["email"], "jane@doe.com")
+
+    def test_update_sport(self):
+        with self.assertQueryCount(self._database_engine, 2) as counter:
+            sport = self.sport_controller.update_sport(self.sport["id"], {"description": "round ball"})
+        self.assertEqual(self._updates(counter), ["UPDATE sports SET description=? WHERE sports.id = ?"])
+        self.assertEqual(sport["description"], "round ball")
+        with self.assertQueryCount(self._database_engine, 1):
+            self.sport_controller.update_sport(self.sport["id"], {"description": "ball"}, direct=True)
+        self.assertEqual(self.sport_controller.get_sport(self.sport["id"])["description"], "ball")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import uuid
+
+from controller.person_controller import PersonController
+from controller.sport_controller import SportController
+from model.database import DatabaseEngine
+from model.mapping.uuid_type import uuid7, to_bytes, to_string
+
+
+class TestUUID(unittest.TestCase):
+    """
+    Keys stored as 16 bytes blobs, generated for each row
+    """
+
+    def setUp(self) -> None:
+        self._database_engine = DatabaseEngine()
+        self._database_engine.create_database()
+
+    def test_uuid7(self):
+        ids = [uuid7() for _ in range(100)]
+        self.assertTrue(all(id.version == 7 and id.variant == uuid.RFC_4122 for id in ids))
+        self.assertEqual(len(set(ids)), 100)
+        # Time ordered, up to the millisecond
+        self.assertLessEqual(ids[0].bytes[:6], ids[-1].bytes[:6])
+
+    def test_conversions(self):
+        id = str(uuid.uuid4())
+        self.assertEqual(len(to_bytes(id)), 16)
+        self.assertEqual(to_string(to_bytes(id)), id)
+        self.assertEqual(to_string(to_bytes(id.upper())), id)
+        # Not a UUID: never matches a key but is returned unchanged
+        self.assertEqual(to_string(to_bytes("test")), "test")
+
+    def test_generated_keys(self):
+        # Every row used to get the same default id
+        sport_controller = SportController(self._database_engine)
+        foot = sport_controller.create_sport({"name": "foot", "description": "ball"})
+        golf = sport_controller.create_sport({"name": "golf", "description": "club"})
+        self.assertNotEqual(foot["id"], golf["id"])
+        self.assertEqual(sport_controller.get_sport(golf["id"]), golf)
+
+        person_controller = PersonController(self._database_engine)
+        for firstname in ("anna", "bob"):
+            person_controller.create_member({"firstname": firstname, "lastname": "smith", "email": "a@b.com",
+                                             "medical_certificate": True,
+                                             "address": {"street": "rue", "postal_code": 53000, "city": "Laval"}})
+        self.assertEqual(person_controller.count_people(), 2)
+        with self._database_engine.connect() as connection:
+            keys = connection.exec_driver_sql("SELECT typeof(id), length(id) FROM people "
+                                              "UNION SELECT typeof(id), length(id) FROM addresses").all()
+        self.assertEqual(keys, [("blob", 16)])
+
+
+if __name__ == '__main__':
+    unittest.main()
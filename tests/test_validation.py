@@ -0,0 +1,66 @@
+import unittest
+
+from controller.person_controller import PersonController
+from controller.person_io import ImportRow
+from controller.validation import Schema, Field, ValidationError, MEMBER_SCHEMA, SPORT_SCHEMA
+from exceptions import InvalidData
+from model.database import DatabaseEngine
+
+
+class TestValidation(unittest.TestCase):
+    """
+    Compiled schemas report every field error at once
+    """
+
+    def setUp(self) -> None:
+        self.member = {"firstname": "john", "lastname": "doe", "email": "john@doe.com", "medical_certificate": True,
+                       "address": {"street": "1 rue du stade", "postal_code": 53000, "city": "Laval"}}
+
+    def test_valid(self):
+        self.assertEqual(MEMBER_SCHEMA.validate(self.member), {})
+        self.assertEqual(MEMBER_SCHEMA.validate({"email": "new@doe.com"}, update=True), {})
+        MEMBER_SCHEMA.check(self.member)
+
+    def test_all_errors(self):
+        data = dict(self.member, firstname="x", email=None, address={"street": "1 rue du stade", "postal_code": "53"})
+        del data["lastname"]
+        self.assertEqual(MEMBER_SCHEMA.validate(data), {
+            "firstname": "Invalid value firstname",
+            "lastname": "Missing value lastname",
+            "email": "Missing value email",
+            "address.postal_code": "Invalid type postal_code",
+            "address.city": "Missing value city",
+        })
+        with self.assertRaises(InvalidData) as context:
+            MEMBER_SCHEMA.check(data)
+        self.assertIsInstance(context.exception, ValidationError)
+        self.assertEqual(len(context.exception.errors), 5)
+
+    def test_update(self):
+        # Partial data, but present values are checked
+        self.assertEqual(SPORT_SCHEMA.validate({"name": None}, update=True), {"name": "Invalid type name"})
+        self.assertEqual(SPORT_SCHEMA.validate({"description": "ball"}, update=True), {})
+        self.assertEqual(MEMBER_SCHEMA.validate({"address": {"city": "Paris"}}, update=True), {})
+        self.assertEqual(MEMBER_SCHEMA.validate({"address": "Paris"}, update=True), {"address": "Invalid type address"})
+        self.assertEqual(MEMBER_SCHEMA.validate([]), {"data": "Invalid type data"})
+
+    def test_validate_many(self):
+        schema = Schema({"code": Field(str, "^[A-Z]{3}$"), "count": Field(int, required=False)})
+        self.assertEqual(schema.validate_many([{"code": "ABC"}, {"code": "abc", "count": "1"}, {}]),
+                         [{}, {"code": "Invalid value code", "count": "Invalid type count"},
+                          {"code": "Missing value code"}])
+
+    def test_import_report(self):
+        database_engine = DatabaseEngine()
+        database_engine.create_database()
+        rows = [ImportRow(1, self.member, None), ImportRow(2, None, "Invalid JSON"),
+                ImportRow(3, dict(self.member, firstname="x", email="none"), None)]
+        report = PersonController(database_engine).import_members(rows)
+        self.assertEqual(report["imported"], 1)
+        self.assertEqual(report["errors"][0], {"row": 2, "error": "Invalid JSON"})
+        self.assertEqual(report["errors"][1]["fields"], {"firstname": "Invalid value firstname",
+                                                         "email": "Invalid value email"})
+
+
+if __name__ == '__main__':
+    unittest.main()
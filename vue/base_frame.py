@@ -1,11 +1,23 @@
 from tkinter import Frame, Label, Entry, DISABLED
+from tkinter import messagebox
 from functools import partial
 
+from exceptions import Error
+
+
+def show_error(error):
+    if isinstance(error, Error):
+        messagebox.showerror("Error", str(error))
+    else:
+        messagebox.showerror("Error", "Unexpected error (%s)" % str(error))
+
 
 class BaseFrame(Frame):
     def __init__(self, root_frame):
         super().__init__(root_frame.master, width=300)
         self._root_frame = root_frame
+        self._pending_tasks = 0
+        self._loading_label = None
 
     def show(self):
         self.grid(padx=10, pady=10)
@@ -19,6 +31,37 @@ class BaseFrame(Frame):
     def back(self):
         self._root_frame.back()
 
+    def run_task(self, func, *args, on_success=None, on_error=None, **kwargs):
+        """
+        Call func(*args, **kwargs) in a worker thread, then on_success(result) or on_error(error)
+        in the Tk thread. The frame shows a loading state until its tasks are done.
+        """
+        if on_error is None:
+            on_error = self.show_error
+        self._set_loading(+1)
+        return self._root_frame.run_task(self, func, *args,
+                                         on_success=partial(self._task_done, on_success),
+                                         on_error=partial(self._task_done, on_error), **kwargs)
+
+    def _task_done(self, callback, result):
+        self._set_loading(-1)
+        if callback is not None:
+            callback(result)
+
+    def _set_loading(self, delta):
+        self._pending_tasks += delta
+        if self._loading_label is None:
+            self._loading_label = Label(self, text="Loading...", fg="grey")
+        if self._pending_tasks > 0:
+            self.config(cursor="watch")
+            self._loading_label.place(relx=1.0, rely=0.0, anchor="ne")
+        else:
+            self.config(cursor="")
+            self._loading_label.place_forget()
+
+    def show_error(self, error):
+        show_error(error)
+
     def create_entry(self, label, row=0, width=50, validate_callback=None, text=None,
                      disabled=False, columnspan=3, **options):
         Label(self, text=label).grid(row=row, sticky="w")
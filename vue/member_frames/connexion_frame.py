@@ -2,7 +2,6 @@ from tkinter import *
 from tkinter import messagebox
 
 from vue.base_frame import BaseFrame
-from exceptions import Error
 
 class ConnexionFrame(BaseFrame):
     def __init__(self, person_controller, master=None):
@@ -39,11 +38,9 @@ class ConnexionFrame(BaseFrame):
         if self.firstname_entry.get() == 'Admin':
             self.show_menu()
         else:
-            try:
-                member_data = self._person_controller.search_person(firstname=self.firstname_entry.get(), lastname=self.lastname_entry.get())
-                messagebox.showinfo("Success", "Member %s %s connecté !" % (member_data['firstname'], member_data['lastname']))
-                self.show_menu_membre()
-
-            except Error as e:
-                messagebox.showerror("Error", str(e))
-                return
\ No newline at end of file
+            self.run_task(self._person_controller.search_person, firstname=self.firstname_entry.get(),
+                          lastname=self.lastname_entry.get(), on_success=self._connected)
+
+    def _connected(self, member_data):
+        messagebox.showinfo("Success", "Member %s %s connecté !" % (member_data['firstname'], member_data['lastname']))
+        self.show_menu_membre()
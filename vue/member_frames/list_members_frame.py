@@ -2,6 +2,7 @@
 from tkinter import *
 
 from vue.base_frame import BaseFrame
+from vue.virtual_listbox import VirtualListbox
 from controller.person_controller import PersonController
 
 
@@ -11,7 +12,6 @@ class ListMembersFrame(BaseFrame):
         super().__init__(root_frame)
         self._person_controller = person_controller
 
-        self._members = None
         if person_type is None:
             self._person_type = 'person'
         else:
@@ -23,13 +23,11 @@ class ListMembersFrame(BaseFrame):
         self.title = Label(self, text="List %s:" % self._person_type.capitalize())
         self.title.grid(row=0, column=0)
 
-        # grille
-        yDefil = Scrollbar(self, orient='vertical')
-        self.listbox = Listbox(self, yscrollcommand=yDefil.set, width=30, selectmode='single')
-        yDefil['command'] = self.listbox.yview
-        self.listbox.bind('<<ListboxSelect>>', self.on_select)
-        yDefil.grid(row=1, column=2, sticky='ns')
-        self.listbox.grid(row=1, column=0, columnspan=2, sticky='nsew')
+        # grille: only visible rows are fetched and rendered
+        self.listbox = VirtualListbox(self, count=self._count_people, fetch_page=self._fetch_people,
+                                      format_row=self._format_person, cursor=self._person_cursor,
+                                      on_select=self.on_select, run_task=self.run_task)
+        self.listbox.grid(row=1, column=0, columnspan=3, sticky='nsew')
 
         # Return bouton
         self.new_person_button = Button(self, text="New %s" % self._person_type, command=self.new_person)
@@ -52,17 +50,26 @@ class ListMembersFrame(BaseFrame):
             self._root_frame.new_coach()
 
     def show_profile(self):
-        if len(self.listbox.curselection()) == 0:
+        # None while the page of the selected row is loading
+        member = self.listbox.selected_row()
+        if member is None:
             self.show_profile_button.grid_forget()
         else:
-            index = int(self.listbox.curselection()[0])
-            member = self._members[index]
-            self._root_frame.show_profile(member['id'])
+            self._root_frame.show_profile(member.id)
+
+    def _count_people(self):
+        return self._person_controller.count_people(person_type=self._person_type)
+
+    def _fetch_people(self, after, offset, limit):
+        return self._person_controller.list_people_summaries(person_type=self._person_type, after=after,
+                                                             offset=offset, limit=limit)
+
+    def _person_cursor(self, member):
+        return member.firstname, member.lastname, member.id
+
+    def _format_person(self, member):
+        return member.firstname.capitalize() + ' ' + member.lastname.capitalize()
 
     def show(self):
-        self._members = self._person_controller.list_people(person_type=self._person_type)
-        self.listbox.delete(0, END)
-        for index, member in enumerate(self._members):
-            text = member['firstname'].capitalize() + ' ' + member['lastname'].capitalize()
-            self.listbox.insert(index, text)
+        self.listbox.reload()
         super().show()
@@ -2,7 +2,6 @@ from tkinter import *
 from tkinter import messagebox
 
 from vue.member_frames.new_person_frame import NewPersonFrame
-from exceptions import Error
 
 
 class NewCoachFrame(NewPersonFrame):
@@ -21,13 +20,9 @@ class NewCoachFrame(NewPersonFrame):
         data['contract'] = self.contract_entry.get()
         data['degree'] = self.degree_entry.get()
 
-        try:
-            member_data = self._person_controller.create_coach(data)
-            messagebox.showinfo("Success",
-                                "Member %s %s created !" % (member_data['firstname'], member_data['lastname']))
-
-        except Error as e:
-            messagebox.showerror("Error", str(e))
-            return
+        self.run_task(self._person_controller.create_coach, data, on_success=self._created)
 
+    def _created(self, member_data):
+        messagebox.showinfo("Success",
+                            "Member %s %s created !" % (member_data['firstname'], member_data['lastname']))
         self.show_menu()
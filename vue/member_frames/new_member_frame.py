@@ -1,7 +1,6 @@
 from tkinter import *
 from tkinter import messagebox
 
-from exceptions import Error
 from vue.member_frames.new_person_frame import NewPersonFrame
 
 
@@ -24,13 +23,9 @@ class NewMemberFrame(NewPersonFrame):
         data = super().get_data()
         data['medical_certificate'] = bool(self.medical_certificate.get())
 
-        try:
-            member_data = self._person_controller.create_member(data)
-            messagebox.showinfo("Success",
-                                "Member %s %s created !" % (member_data['firstname'], member_data['lastname']))
-
-        except Error as e:
-            messagebox.showerror("Error", str(e))
-            return
+        self.run_task(self._person_controller.create_member, data, on_success=self._created)
 
+    def _created(self, member_data):
+        messagebox.showinfo("Success",
+                            "Member %s %s created !" % (member_data['firstname'], member_data['lastname']))
         self.show_menu()
@@ -2,7 +2,6 @@ from tkinter import *
 from tkinter import messagebox
 
 from vue.base_frame import BaseFrame
-from exceptions import Error
 
 
 class NewPersonFrame(BaseFrame):
@@ -71,13 +70,9 @@ class NewPersonFrame(BaseFrame):
 
     def valid(self):
         data = self.get_data()
-        try:
-            member_data = self._person_controller.create_person(data)
-            messagebox.showinfo("Success",
-                                "Member %s %s created !" % (member_data['firstname'], member_data['lastname']))
-
-        except Error as e:
-            messagebox.showerror("Error", str(e))
-            return
+        self.run_task(self._person_controller.create_person, data, on_success=self._created)
 
+    def _created(self, member_data):
+        messagebox.showinfo("Success",
+                            "Member %s %s created !" % (member_data['firstname'], member_data['lastname']))
         self.back()
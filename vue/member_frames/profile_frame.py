@@ -3,6 +3,7 @@ from tkinter import *
 from tkinter import ttk
 from tkinter import messagebox
 from vue.base_frame import BaseFrame
+from exceptions import Error
 from functools import partial
 
 
@@ -15,6 +16,11 @@ class ProfileFrame(BaseFrame):
         self._person_controller = person_controller
         self._sport_controller = sport_controller
         self._sports = []
+        # Pending changes while editing (see PersonController.edit_person) and the sports shown meanwhile
+        self._edit = None
+        self._edit_sports = []
+        # The edit is being committed by a worker: its controls are disabled meanwhile
+        self._saving = False
         self._name_pattern = re.compile("^[\S-]{2,50}$")
         self._email_pattern = re.compile("^([a-zA-Z0-9_\-\.]+)@([a-zA-Z0-9_\-\.]+)\.([a-zA-Z]{2,5})$")
         self._create_widgets()
@@ -83,7 +89,12 @@ class ProfileFrame(BaseFrame):
         else:
             entry.config(fg='black')
 
+    def _edit_type(self):
+        return 'coach' if self._person['type'] == 'coach' else 'person'
+
     def edit(self):
+        self._edit = self._person_controller.edit_person(self._person['id'], self._edit_type())
+        self._edit_sports = list(self._person.get('sports', []))
         self.edit_button.grid_forget()
         self.remove_button.grid_forget()
         entries = [self.firstname_entry, self.lastname_entry, self.email_entry, self.street_entry,
@@ -102,7 +113,8 @@ class ProfileFrame(BaseFrame):
         entry.config(state=DISABLED)
 
     def refresh(self):
-        # Restore window with person value and cancel edition
+        # Restore window with person value and cancel edition (pending changes are dropped)
+        self._edit = None
         self.cancel_button.grid_forget()
         self.update_button.grid_forget()
         self._refresh_entry(self.firstname_entry, self._person['firstname'])
@@ -131,19 +143,21 @@ class ProfileFrame(BaseFrame):
 
         Label(self.list_sports_frame, text="Sports: ", font='bold').grid(row=0, sticky="w")
         i = 1
-        if "sports" in self._person:
-            for sport in self._person['sports']:
-                self.list_sports_frame.columnconfigure(i, weight=1)
-                Label(self.list_sports_frame, text=sport['name']).grid(row=i, column=0, sticky="w")
-                Label(self.list_sports_frame, text=sport['level']).grid(row=i, column=1, sticky="w")
-                del_button = Button(self.list_sports_frame, text="-", command=partial(self.delete_sport, sport['id']))
-                del_button.grid(row=i, column=2, sticky="w")
-                i += 1
+        sports = self._edit_sports if self._edit is not None else self._person.get('sports', [])
+        state = DISABLED if self._saving else NORMAL
+        for sport in sports:
+            self.list_sports_frame.columnconfigure(i, weight=1)
+            Label(self.list_sports_frame, text=sport['name']).grid(row=i, column=0, sticky="w")
+            Label(self.list_sports_frame, text=sport['level']).grid(row=i, column=1, sticky="w")
+            del_button = Button(self.list_sports_frame, text="-", command=partial(self.delete_sport, sport['id']),
+                                state=state)
+            del_button.grid(row=i, column=2, sticky="w")
+            i += 1
 
         # Add sport
         self.choose_sport_box = ttk.Combobox(self.list_sports_frame, values=[sport['name'] for sport in self._sports])
         self.level_box = ttk.Combobox(self.list_sports_frame, values=["beginner", "high", "professional"])
-        self.add_sport_button = Button(self.list_sports_frame, text="+", command=self.add_sport)
+        self.add_sport_button = Button(self.list_sports_frame, text="+", command=self.add_sport, state=state)
 
         self.choose_sport_box.grid(row=i, column=0, stick="nsew")
         self.level_box.grid(row=i, column=1, stick="nsew")
@@ -166,19 +180,44 @@ class ProfileFrame(BaseFrame):
 
         if self._person['type'] == 'person':
             data['medical_certificate'] = bool(self.medical_certificate.get())
-            person = self._person_controller.update_person(self._person['id'], data)
         elif self._person['type'] == 'coach':
             data['contract'] = self.contract_entry.get()
             data['degree'] = self.degree_entry.get()
-            person = self._person_controller.update_coach(self._person['id'], data)
-        else:
-            person = self._person_controller.update_person(self._person['id'], data)
+        try:
+            self._edit.update(data)
+        except Error as e:
+            self.show_error(e)
+            return
+        # Fields and sport changes saved together, in one transaction
+        self._set_saving(True)
+        self.run_task(self._edit.commit, on_success=self._updated, on_error=self._update_failed)
+
+    def _set_saving(self, saving):
+        # No second commit nor change of the edit while the worker commits it
+        self._saving = saving
+        state = DISABLED if saving else NORMAL
+        self.update_button.config(state=state)
+        self.cancel_button.config(state=state)
+        self.refresh_sports()
+
+    def _updated(self, person):
         self._person = person
+        self._set_saving(False)
         self.refresh()
 
+    def _update_failed(self, error):
+        # Changes are kept, to be corrected and saved again
+        self._set_saving(False)
+        self.show_error(error)
+
+    def _sports_updated(self, person):
+        self._person = person
+        self.refresh_sports()
+
     def remove(self):
-        person_id = self._person['id']
-        self._person_controller.delete_person(person_id)
+        self.run_task(self._person_controller.delete_person, self._person['id'], on_success=self._removed)
+
+    def _removed(self, result):
         # show confirmation
         messagebox.showinfo("Success",
                             "person %s %s deleted !" % (self._person['firstname'], self._person['lastname']))
@@ -195,18 +234,32 @@ class ProfileFrame(BaseFrame):
         level = self.level_box.get()
         if sport_name != "" and level != "":
             sport_id = self.get_sport_id(sport_name)
-            if sport_id is not None:
-                self._person = self._person_controller.add_sport_person(self._person['id'], sport_id, level)
-            else:
+            if sport_id is None:
                 messagebox.showerror("Sport %s not found" % sport_name)
+            elif self._edit is not None:
+                # Saved with the other changes on update
+                self._edit.add_sport(sport_id, level)
+                self._edit_sports = [sport for sport in self._edit_sports if sport['id'] != sport_id]
+                self._edit_sports.append({"id": sport_id, "name": sport_name, "level": level})
+            else:
+                edit = self._person_controller.edit_person(self._person['id']).add_sport(sport_id, level)
+                self.run_task(edit.commit, on_success=self._sports_updated)
         self.refresh_sports()
 
     def delete_sport(self, sport_id):
+        if self._edit is not None:
+            self._edit.remove_sport(sport_id)
+            self._edit_sports = [sport for sport in self._edit_sports if sport['id'] != sport_id]
+            self.refresh_sports()
+        else:
+            edit = self._person_controller.edit_person(self._person['id']).remove_sport(sport_id)
+            self.run_task(edit.commit, on_success=self._sports_updated)
 
-        self._person = self._person_controller.delete_sport_person(self._person['id'], sport_id)
+    def _set_sports(self, sports):
+        self._sports = sports
         self.refresh_sports()
 
     def show(self):
-        self._sports = self._sport_controller.list_sports()
         self.refresh()
         super().show()
+        self.run_task(self._sport_controller.list_sports, on_success=self._set_sports)
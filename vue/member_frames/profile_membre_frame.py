@@ -161,19 +161,27 @@ class ProfileMembreFrame(BaseFrame):
 
         if self._person['type'] == 'person':
             data['medical_certificate'] = bool(self.medical_certificate.get())
-            person = self._person_controller.update_person(self._person['id'], data)
+            update = self._person_controller.update_person
         elif self._person['type'] == 'coach':
             data['contract'] = self.contract_entry.get()
             data['degree'] = self.degree_entry.get()
-            person = self._person_controller.update_coach(self._person['id'], data)
+            update = self._person_controller.update_coach
         else:
-            person = self._person_controller.update_person(self._person['id'], data)
+            update = self._person_controller.update_person
+        self.run_task(update, self._person['id'], data, on_success=self._updated)
+
+    def _updated(self, person):
         self._person = person
         self.refresh()
 
+    def _sports_updated(self, person):
+        self._person = person
+        self.refresh_sports()
+
     def remove(self):
-        person_id = self._person['id']
-        self._person_controller.delete_person(person_id)
+        self.run_task(self._person_controller.delete_person, self._person['id'], on_success=self._removed)
+
+    def _removed(self, result):
         # show confirmation
         messagebox.showinfo("Success",
                             "person %s %s deleted !" % (self._person['firstname'], self._person['lastname']))
@@ -191,17 +199,21 @@ class ProfileMembreFrame(BaseFrame):
         if sport_name != "" and level != "":
             sport_id = self.get_sport_id(sport_name)
             if sport_id is not None:
-                self._person = self._person_controller.add_sport_person(self._person['id'], sport_id, level)
+                self.run_task(self._person_controller.add_sport_person, self._person['id'], sport_id, level,
+                              on_success=self._sports_updated)
             else:
                 messagebox.showerror("Sport %s not found" % sport_name)
         self.refresh_sports()
 
     def delete_sport(self, sport_id):
+        self.run_task(self._person_controller.delete_sport_person, self._person['id'], sport_id,
+                      on_success=self._sports_updated)
 
-        self._person = self._person_controller.delete_sport_person(self._person['id'], sport_id)
+    def _set_sports(self, sports):
+        self._sports = sports
         self.refresh_sports()
 
     def show(self):
-        self._sports = self._sport_controller.list_sports()
         self.refresh()
         super().show()
+        self.run_task(self._sport_controller.list_sports, on_success=self._set_sports)
@@ -15,6 +15,8 @@ from vue.sport_frames.new_sport_frame import NewSportFrame
 from vue.sport_frames.sport_profile_frame import SportProfileFrame
 from vue.sport_frames.sport_profile_member_frame import SportProfileMemberFrame
 from vue.member_frames.connexion_frame import ConnexionFrame
+from vue.task_executor import TaskExecutor
+from vue.base_frame import show_error
 
 
 
@@ -32,6 +34,25 @@ class RootFrame(Frame):
         self._menu_membre_frame = MenuMembreFrame(self)
         self._menu_connexion_frame = MenuConnexionFrame(self)
         self._frames = []
+        self._task_executor = TaskExecutor(self)
+
+    def run_task(self, owner, func, *args, on_success=None, on_error=None, **kwargs):
+        return self._task_executor.submit(owner, func, *args, on_success=on_success, on_error=on_error, **kwargs)
+
+    def _current_frame(self):
+        return self._frames[-1] if len(self._frames) > 0 else None
+
+    def _load(self, func, *args, on_success=None):
+        # The current frame shows the loading state, if any (e.g. called from a menu)
+        frame = self._current_frame()
+        if frame is None:
+            return self.run_task(self, func, *args, on_success=on_success, on_error=show_error)
+        return frame.run_task(func, *args, on_success=on_success)
+
+    def _destroy_frame(self, frame):
+        # Results of calls still running for this frame are dropped
+        self._task_executor.cancel(frame)
+        frame.destroy()
 
     def new_member(self):
         self.hide_menu()
@@ -84,16 +105,20 @@ class RootFrame(Frame):
         list_frame.show()
 
     def show_profile(self, member_id):
+        self._load(self._person_controller.get_person, member_id, on_success=self._open_profile)
+
+    def _open_profile(self, member_data):
         self.hide_menu()
-        member_data = self._person_controller.get_person(member_id)
         self.hide_frames()
         profile_frame = ProfileFrame(self._person_controller, self._sport_controller, member_data, self)
         self._frames.append(profile_frame)
         profile_frame.show()
 
     def show_profile_membre(self, member_id):
+        self._load(self._person_controller.get_person, member_id, on_success=self._open_profile_membre)
+
+    def _open_profile_membre(self, member_data):
         self.hide_menu()
-        member_data = self._person_controller.get_person(member_id)
         self.hide_frames()
         profile_frame = ProfileMembreFrame(self._person_controller, self._sport_controller, member_data, self)
         self._frames.append(profile_frame)
@@ -112,16 +137,20 @@ class RootFrame(Frame):
         list_frame.show()
 
     def show_sport(self, sport_id):
+        self._load(self._sport_controller.get_sport, sport_id, on_success=self._open_sport)
+
+    def _open_sport(self, sport_data):
         self.hide_menu()
-        sport_data = self._sport_controller.get_sport(sport_id)
         self.hide_frames()
         profile_frame = SportProfileFrame(self._sport_controller, sport_data, self)
         self._frames.append(profile_frame)
         profile_frame.show()
 
     def show_sport_member(self, sport_id):
+        self._load(self._sport_controller.get_sport, sport_id, on_success=self._open_sport_member)
+
+    def _open_sport_member(self, sport_data):
         self.hide_menu()
-        sport_data = self._sport_controller.get_sport(sport_id)
         self.hide_frames()
         profile_frame = SportProfileMemberFrame(self._sport_controller, sport_data, self)
         self._frames.append(profile_frame)
@@ -141,21 +170,21 @@ class RootFrame(Frame):
     def show_menu(self):
         self.hide_menu()
         for frame in self._frames:
-            frame.destroy()
+            self._destroy_frame(frame)
         self._frames = []
         self._menu_frame.show()
 
     def show_menu_membre(self):
         self.hide_menu()
         for frame in self._frames:
-            frame.destroy()
+            self._destroy_frame(frame)
         self._frames = []
         self._menu_membre_frame.show()
 
     def show_menu_connexion(self):
         self.hide_menu()
         for frame in self._frames:
-            frame.destroy()
+            self._destroy_frame(frame)
         self._frames = []
         self._menu_connexion_frame.show()
 
@@ -171,7 +200,7 @@ class RootFrame(Frame):
             self.show_menu()
             return
         last_frame = self._frames[-1]
-        last_frame.destroy()
+        self._destroy_frame(last_frame)
         del(self._frames[-1])
         last_frame = self._frames[-1]
         last_frame.show()
@@ -180,4 +209,5 @@ class RootFrame(Frame):
         self.show_menu()
 
     def quit(self):
+        self._task_executor.shutdown()
         self.master.destroy()
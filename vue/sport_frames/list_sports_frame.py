@@ -47,12 +47,15 @@ class ListSportsFrame(BaseFrame):
         else:
             index = int(self.listbox.curselection()[0])
             sport = self._sports[index]
-            self._root_frame.show_sport(sport['id'])
+            self._root_frame.show_sport(sport.id)
 
-    def show(self):
-        self._sports = self._sport_controller.list_sports()
+    def _set_sports(self, sports):
+        self._sports = sports
         self.listbox.delete(0, END)
         for index, sport in enumerate(self._sports):
-            text = sport['name'].capitalize()
+            text = sport.name.capitalize()
             self.listbox.insert(index, text)
+
+    def show(self):
         super().show()
+        self.run_task(self._sport_controller.list_sport_summaries, on_success=self._set_sports)
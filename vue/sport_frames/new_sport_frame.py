@@ -2,7 +2,6 @@ from tkinter import *
 from tkinter import messagebox
 
 from vue.sport_frames.sport_formular_frame import SportFormularFrame
-from exceptions import Error
 
 
 class NewSportFrame(SportFormularFrame):
@@ -22,13 +21,9 @@ class NewSportFrame(SportFormularFrame):
 
     def valid(self):
         data = self.get_data()
-        try:
-            sport_data = self._sport_controller.create_sport(data)
-            messagebox.showinfo("Success",
-                                "Sport %s created !" % sport_data['name'])
-
-        except Error as e:
-            messagebox.showerror("Error", str(e))
-            return
+        self.run_task(self._sport_controller.create_sport, data, on_success=self._created)
 
+    def _created(self, sport_data):
+        messagebox.showinfo("Success",
+                            "Sport %s created !" % sport_data['name'])
         self.back()
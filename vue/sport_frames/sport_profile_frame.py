@@ -1,5 +1,6 @@
 from tkinter import *
 from tkinter import messagebox
+from functools import partial
 
 from vue.sport_frames.sport_formular_frame import SportFormularFrame
 from exceptions import Error
@@ -11,7 +12,9 @@ class SportProfileFrame(SportFormularFrame):
         super().__init__(master)
         self._sport_controller = sport_controller
         self._sport = sport
+        self._roster_page = 1
         self.refresh()
+        self.load_roster()
 
     def create_widgets(self):
         super().create_widgets()
@@ -25,6 +28,17 @@ class SportProfileFrame(SportFormularFrame):
         self.return_button = Button(self, text="Return", fg="red",
                                     command=self.back)
 
+        # Roster
+        Label(self, text="Participants:").grid(row=4, sticky="w")
+        self.roster_label = Label(self, text="")
+        self.roster_label.grid(row=4, column=1, columnspan=2, sticky="w")
+        self.roster_listbox = Listbox(self, height=10, width=50)
+        self.roster_listbox.grid(row=5, column=0, columnspan=3, sticky="nsew")
+        self.previous_button = Button(self, text="<", command=partial(self.change_roster_page, -1))
+        self.next_button = Button(self, text=">", command=partial(self.change_roster_page, +1))
+        self.previous_button.grid(row=6, column=0, sticky="w")
+        self.next_button.grid(row=6, column=2, sticky="e")
+
         self.return_button.grid(row=20, column=0)
         self.edit_button.grid(row=20, column=1, sticky="nsew")
         self.remove_button.grid(row=20, column=2, sticky="nsew")
@@ -58,13 +72,36 @@ class SportProfileFrame(SportFormularFrame):
     def update(self):
 
         data = self.get_data()
-        sport = self._sport_controller.update_sport(self._sport['id'], data)
+        self.run_task(self._sport_controller.update_sport, self._sport['id'], data, on_success=self._updated)
+
+    def _updated(self, sport):
         self._sport = sport
+        self._roster_page = 1
         self.refresh()
+        self.load_roster()
+
+    def load_roster(self):
+        self.run_task(self._sport_controller.get_roster, self._sport['id'], page=self._roster_page,
+                      on_success=self._set_roster)
+
+    def change_roster_page(self, delta):
+        self._roster_page = max(1, self._roster_page + delta)
+        self.load_roster()
+
+    def _set_roster(self, roster):
+        self.roster_listbox.delete(0, END)
+        for person in roster['items']:
+            text = "%s %s (%s)" % (person['firstname'].capitalize(), person['lastname'].capitalize(), person['level'])
+            self.roster_listbox.insert(END, text)
+        pages = max(1, (roster['total'] + roster['page_size'] - 1) // roster['page_size'])
+        self.roster_label.config(text="%d people, page %d/%d" % (roster['total'], roster['page'], pages))
+        self.previous_button.config(state=NORMAL if roster['page'] > 1 else DISABLED)
+        self.next_button.config(state=NORMAL if roster['page'] < pages else DISABLED)
 
     def remove(self):
-        sport_id = self._sport['id']
-        self._sport_controller.delete_sport(sport_id)
+        self.run_task(self._sport_controller.delete_sport, self._sport['id'], on_success=self._removed)
+
+    def _removed(self, result):
         # show confirmation
         messagebox.showinfo("Success",
                             "Sport %s deleted !" % self._sport['name'])
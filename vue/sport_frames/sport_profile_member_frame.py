@@ -43,13 +43,16 @@ class SportProfileMemberFrame(SportFormularFrame):
     def update(self):
 
         data = self.get_data()
-        sport = self._sport_controller.update_sport(self._sport['id'], data)
+        self.run_task(self._sport_controller.update_sport, self._sport['id'], data, on_success=self._updated)
+
+    def _updated(self, sport):
         self._sport = sport
         self.refresh()
 
     def remove(self):
-        sport_id = self._sport['id']
-        self._sport_controller.delete_sport(sport_id)
+        self.run_task(self._sport_controller.delete_sport, self._sport['id'], on_success=self._removed)
+
+    def _removed(self, result):
         # show confirmation
         messagebox.showinfo("Success",
                             "Sport %s deleted !" % self._sport['name'])
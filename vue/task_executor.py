@@ -0,0 +1,101 @@
+import logging
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Task:
+    """
+    Controller call submitted to the TaskExecutor
+    """
+
+    def __init__(self, owner, on_success=None, on_error=None):
+        self.owner = owner
+        self.on_success = on_success
+        self.on_error = on_error
+        self.cancelled = False
+        self.future = None
+
+    def cancel(self):
+        self.cancelled = True
+        if self.future is not None:
+            self.future.cancel()
+
+
+class TaskExecutor:
+    """
+    Run controller calls on a thread pool so the Tk event loop never waits on the database.
+    Tk widgets must only be used from the main thread: workers push their results in a queue
+    which is polled from the main loop with after(), where callbacks are then called.
+    """
+
+    def __init__(self, master, max_workers=4, poll_interval=20):
+        self._master = master
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bds-worker")
+        self._results = queue.Queue()
+        self._poll_interval = poll_interval
+        self._polling = False
+        # Tasks not finished yet, by owner (frame)
+        self._tasks = {}
+
+    def submit(self, owner, func, *args, on_success=None, on_error=None, **kwargs):
+        task = Task(owner, on_success=on_success, on_error=on_error)
+        self._tasks.setdefault(owner, set()).add(task)
+        task.future = self._pool.submit(self._run, task, func, args, kwargs)
+        self._schedule_poll()
+        return task
+
+    def cancel(self, owner):
+        """
+        Cancel all the tasks of an owner: queued calls are not run and callbacks of running ones are dropped
+        """
+        for task in self._tasks.pop(owner, set()):
+            task.cancel()
+
+    def shutdown(self):
+        for owner in list(self._tasks):
+            self.cancel(owner)
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, task, func, args, kwargs):
+        # Worker thread
+        if task.cancelled:
+            return
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self._results.put((task, None, e))
+        else:
+            self._results.put((task, result, None))
+
+    def _schedule_poll(self):
+        if not self._polling:
+            self._polling = True
+            self._master.after(self._poll_interval, self._poll)
+
+    def _poll(self):
+        # Main thread
+        self._polling = False
+        while True:
+            try:
+                task, result, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._finish(task, result, error)
+        if len(self._tasks) > 0:
+            self._schedule_poll()
+
+    def _finish(self, task, result, error):
+        if task.cancelled:
+            return
+        tasks = self._tasks.get(task.owner, set())
+        tasks.discard(task)
+        if len(tasks) == 0:
+            self._tasks.pop(task.owner, None)
+
+        if error is None:
+            if task.on_success is not None:
+                task.on_success(result)
+        elif task.on_error is not None:
+            task.on_error(error)
+        else:
+            logging.error("Unhandled error in background task (%s)" % str(error))
@@ -0,0 +1,193 @@
+from collections import OrderedDict
+from functools import partial
+from tkinter import Frame, Listbox, Scrollbar, END
+
+from vue.base_frame import show_error
+
+
+class VirtualListbox(Frame):
+    """
+    Listbox only rendering the visible rows of a (possibly huge) list.
+    Rows are fetched page by page when scrolling and kept in a bounded LRU cache of pages.
+
+    count(): total number of rows
+    fetch_page(after, offset, limit): rows of a page, `after` being the cursor of the previous row if known
+    cursor(row): keyset cursor of a row, given as `after` to fetch the next page
+    format_row(row): text displayed for a row
+    run_task(func, *args, on_success=..., on_error=...): runs count and fetch_page in the background
+        (see BaseFrame.run_task), rows are then rendered once their page is loaded. Called directly when not given.
+    """
+
+    def __init__(self, master, count, fetch_page, format_row, cursor=None, on_select=None,
+                 height=10, width=30, page_size=50, cache_pages=8, run_task=None):
+        super().__init__(master)
+        self._count = count
+        self._fetch_page = fetch_page
+        self._format_row = format_row
+        self._cursor = cursor
+        self._height = height
+        self._page_size = page_size
+        self._cache_pages = cache_pages
+        self._run_task = run_task
+
+        self._pages = OrderedDict()
+        # Pages being fetched in the background, and reload count to drop the results of previous loads
+        self._loading = set()
+        self._generation = 0
+        self._total = 0
+        self._top = 0
+        # Absolute index and row of the selection, kept while its row is scrolled out of view
+        self._selected = None
+        self._selected_row = None
+
+        self._on_select_callback = on_select
+        self._scrollbar = Scrollbar(self, orient='vertical', command=self.yview)
+        self._listbox = Listbox(self, height=height, width=width, selectmode='single', activestyle='none')
+        self._listbox.bind('<<ListboxSelect>>', self._on_select)
+        self._listbox.bind('<MouseWheel>', self._on_mouse_wheel)
+        self._listbox.bind('<Button-4>', self._on_mouse_wheel)
+        self._listbox.bind('<Button-5>', self._on_mouse_wheel)
+        # The Listbox moves the selection with the arrow keys, the view scrolls at its edges
+        self._listbox.bind('<Up>', lambda event: self._on_arrow(-1))
+        self._listbox.bind('<Down>', lambda event: self._on_arrow(1))
+        self._listbox.bind('<Prior>', lambda event: self._scroll(-self._height))
+        self._listbox.bind('<Next>', lambda event: self._scroll(self._height))
+        self._listbox.grid(row=0, column=0, sticky='nsew')
+        self._scrollbar.grid(row=0, column=1, sticky='ns')
+
+    def reload(self):
+        self._pages.clear()
+        self._loading.clear()
+        self._generation += 1
+        self._top = 0
+        self._selected = None
+        self._selected_row = None
+        if self._run_task is None:
+            self._total = self._count()
+        else:
+            self._total = 0
+            self._run_task(self._count, on_success=partial(self._set_total, self._generation))
+        self._render()
+
+    def _set_total(self, generation, total):
+        if generation == self._generation:
+            self._total = total
+            self._render()
+
+    def curselection(self):
+        """
+        Absolute index of the selected row, even when it is scrolled out of view
+        """
+        return () if self._selected is None else (self._selected,)
+
+    def selected_row(self):
+        return self._selected_row
+
+    def _on_select(self, event):
+        selection = self._listbox.curselection()
+        if len(selection) > 0:
+            self._selected = self._top + int(selection[0])
+            self._selected_row = self._row(self._selected)
+        if self._on_select_callback is not None:
+            self._on_select_callback(event)
+
+    def yview(self, *args):
+        # Scrollbar protocol: ('moveto', fraction) or ('scroll', number, 'units' | 'pages')
+        if args[0] == 'moveto':
+            self._top = int(float(args[1]) * self._total)
+        elif args[0] == 'scroll':
+            step = self._height if args[2] == 'pages' else 1
+            self._top += int(args[1]) * step
+        self._render()
+
+    def _scroll(self, rows):
+        self.yview('scroll', rows, 'units')
+        return "break"
+
+    def _on_arrow(self, delta):
+        edge = 0 if delta < 0 else self._listbox.size() - 1
+        if self._listbox.index('active') != edge:
+            return None
+        index = self._top + edge + delta
+        if index < 0 or index >= self._total:
+            return "break"
+        # Edge of the view: scroll one row and move the selection onto it
+        self._selected = index
+        self._selected_row = None
+        self._top += delta
+        self._render()
+        self._listbox.event_generate('<<ListboxSelect>>')
+        return "break"
+
+    def _on_mouse_wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            return self._scroll(-1)
+        return self._scroll(1)
+
+    def _render(self):
+        self._top = max(0, min(self._top, self._total - self._height))
+        bottom = min(self._top + self._height, self._total)
+        self._listbox.delete(0, END)
+        for index in range(self._top, bottom):
+            row = self._row(index)
+            if row is None:
+                break
+            self._listbox.insert(END, self._format_row(row))
+            if index == self._selected:
+                self._selected_row = row
+                self._listbox.selection_set(index - self._top)
+                self._listbox.activate(index - self._top)
+        if self._total == 0:
+            self._scrollbar.set(0, 1)
+        else:
+            self._scrollbar.set(self._top / self._total, bottom / self._total)
+
+    def _row(self, index):
+        rows = self._page(index // self._page_size)
+        position = index % self._page_size
+        if rows is None or position >= len(rows):
+            return None
+        return rows[position]
+
+    def _page(self, page):
+        """
+        Rows of a page, None while it is fetched in the background
+        """
+        if page in self._pages:
+            self._pages.move_to_end(page)
+            return self._pages[page]
+
+        previous = self._pages.get(page - 1)
+        if self._cursor is not None and previous is not None and len(previous) == self._page_size:
+            # Continue from the previous page: index seek instead of OFFSET
+            args = (self._cursor(previous[-1]), 0, self._page_size)
+        else:
+            args = (None, page * self._page_size, self._page_size)
+
+        if self._run_task is None:
+            rows = self._fetch_page(*args)
+            self._store_page(page, rows)
+            return rows
+        if page not in self._loading:
+            self._loading.add(page)
+            self._run_task(self._fetch_page, *args, on_success=partial(self._page_loaded, self._generation, page),
+                           on_error=partial(self._page_failed, self._generation, page))
+        return None
+
+    def _page_loaded(self, generation, page, rows):
+        if generation != self._generation:
+            return
+        self._loading.discard(page)
+        self._store_page(page, rows)
+        self._render()
+
+    def _page_failed(self, generation, page, error):
+        if generation == self._generation:
+            # Fetched again by the next render
+            self._loading.discard(page)
+        show_error(error)
+
+    def _store_page(self, page, rows):
+        self._pages[page] = rows
+        while len(self._pages) > self._cache_pages:
+            self._pages.popitem(last=False)